@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import base64
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urljoin
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from automation.deadline import Deadline, clamp_timeout
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ApiSettings:
+    """Backend endpoints the PF web app itself calls, used to skip rendering the timeline UI.
+
+    timeline_documents_url is a template with {patient_id} and {view} (pendingdocuments/signeddocuments),
+    relative to the current page's origin. Leave it unset to always use the DOM path.
+    """
+
+    timeline_documents_url: Optional[str] = None
+    # Dotted path to the document list inside the JSON response ("" = the response is the list)
+    documents_path: str = ""
+    document_type_field: str = "documentType"
+    document_id_field: str = "id"
+    download_url_field: str = "downloadUrl"
+    # Used when documents carry no download URL; a template with {document_id} and {patient_id}
+    download_url_template: Optional[str] = None
+    # localStorage key holding the bearer token the app sends (plain or JSON with access_token); None = cookies only
+    auth_token_storage_key: Optional[str] = None
+    timeout_seconds: float = 15.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.timeline_documents_url)
+
+
+_SETTINGS = ApiSettings()
+
+
+def configure_api(settings: ApiSettings) -> None:
+    global _SETTINGS
+    _SETTINGS = settings
+
+
+def get_api_settings() -> ApiSettings:
+    return _SETTINGS
+
+
+# fetch() from inside the page, so the request carries the app's own cookies (and token, when configured).
+# Calls back with {status, body} where body is parsed JSON, or base64 for binary responses.
+_FETCH_JS = """
+var url = arguments[0], binary = arguments[1], tokenKey = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var headers = {'Accept': binary ? '*/*' : 'application/json'};
+if (tokenKey) {
+    var raw = window.localStorage.getItem(tokenKey);
+    if (raw) {
+        var token = raw;
+        try { var parsed = JSON.parse(raw); token = parsed.access_token || parsed.token || (parsed.authenticated || {}).access_token || raw; } catch (e) {}
+        headers['Authorization'] = 'Bearer ' + token;
+    }
+}
+var ctrl = new AbortController();
+var timer = setTimeout(function () { ctrl.abort(); }, timeoutMs);
+fetch(url, {credentials: 'include', headers: headers, signal: ctrl.signal}).then(function (resp) {
+    if (!resp.ok) { clearTimeout(timer); done({status: resp.status}); return; }
+    if (!binary) {
+        return resp.json().then(function (body) { clearTimeout(timer); done({status: resp.status, body: body}); });
+    }
+    return resp.arrayBuffer().then(function (buf) {
+        clearTimeout(timer);
+        var bytes = new Uint8Array(buf), chunks = [];
+        for (var i = 0; i < bytes.length; i += 0x8000) {
+            chunks.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+        }
+        done({status: resp.status, body: btoa(chunks.join(''))});
+    });
+}).catch(function (err) { clearTimeout(timer); done({status: 0, error: String(err)}); });
+"""
+
+
+def fetch_in_page(driver: WebDriver, url: str, binary: bool = False, deadline: Optional[Deadline] = None) -> Optional[Any]:
+    """GET url with the page's own auth; returns parsed JSON (or bytes when binary), None on any failure.
+
+    The fetch is aborted after [api] timeout_seconds or deadline's remaining budget, whichever is less.
+    """
+    settings = _SETTINGS
+    timeout = clamp_timeout(settings.timeout_seconds, deadline)
+    if timeout <= 0:
+        LOGGER.info("In-page fetch of %s skipped: patient time budget exhausted.", url)
+        return None
+    full_url = urljoin(driver.current_url, url)
+    # The script timeout is session-wide; put back the previous one so other async scripts keep theirs
+    try:
+        previous_timeout = driver.timeouts.script
+    except Exception:
+        previous_timeout = None
+    try:
+        driver.set_script_timeout(timeout + 5)
+        result = driver.execute_async_script(
+            _FETCH_JS, full_url, binary, settings.auth_token_storage_key, int(timeout * 1000)
+        ) or {}
+    except Exception:
+        LOGGER.debug("In-page fetch failed for %s", full_url, exc_info=True)
+        return None
+    finally:
+        if previous_timeout is not None:
+            try:
+                driver.set_script_timeout(previous_timeout)
+            except Exception:
+                LOGGER.debug("Could not restore the script timeout.", exc_info=True)
+    if result.get("status") != 200 or "body" not in result:
+        LOGGER.info("In-page fetch %s -> status=%s %s", full_url, result.get("status"), result.get("error") or "")
+        return None
+    if binary:
+        return base64.b64decode(result["body"])
+    return result["body"]
+
+
+def _dig(data: Any, path: str) -> Any:
+    for key in [k for k in (path or "").split(".") if k]:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def find_intake_document(driver: WebDriver, patient_id: str, view: str, deadline: Optional[Deadline] = None) -> Optional[dict]:
+    """First document in the timeline view whose type contains 'intake', as {"id", "type", "download_url"}.
+
+    view is "pending" or "signed". Returns None when the API isn't configured, the call fails, or no
+    intake document is listed (callers fall back to the DOM path).
+    """
+    settings = _SETTINGS
+    if not settings.enabled or not patient_id:
+        return None
+    view_segment = "pendingdocuments" if view == "pending" else "signeddocuments"
+    url = settings.timeline_documents_url.format(patient_id=patient_id, view=view_segment)
+    documents = _dig(fetch_in_page(driver, url, deadline=deadline), settings.documents_path)
+    if not isinstance(documents, list):
+        return None
+    for doc in documents:
+        if not isinstance(doc, dict):
+            continue
+        doc_type = str(_dig(doc, settings.document_type_field) or "")
+        if "intake" not in doc_type.lower():
+            continue
+        doc_id = _dig(doc, settings.document_id_field)
+        download_url = _dig(doc, settings.download_url_field)
+        if not download_url and settings.download_url_template and doc_id is not None:
+            download_url = settings.download_url_template.format(document_id=doc_id, patient_id=patient_id)
+        if download_url:
+            return {"id": doc_id, "type": doc_type, "download_url": str(download_url)}
+    return None
+
+
+def download_document(
+    driver: WebDriver, download_url: str, dest: Path, expect_pdf: bool = True, deadline: Optional[Deadline] = None
+) -> bool:
+    """Fetch a document with the page's auth and write it straight to dest (no Downloads folder round trip)."""
+    data = fetch_in_page(driver, download_url, binary=True, deadline=deadline)
+    if not data:
+        return False
+    if expect_pdf and not data.startswith(b"%PDF"):
+        LOGGER.info("In-page download from %s is not a PDF (%s bytes); ignoring.", download_url, len(data))
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(dest.suffix + ".part")
+    tmp.write_bytes(data)
+    tmp.replace(dest)
+    LOGGER.info("Downloaded %s bytes to %s via in-page fetch.", len(data), dest)
+    return True
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import json
 import logging
 import os
 import sys
 import tempfile
 import shutil
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from selenium import webdriver
@@ -28,6 +29,46 @@ class EdgeConfig:
     cleanup_user_data_dir: bool = False
     disable_fallback: bool = False
     suppress_browser_logs: bool = True
+    # Snapshot made by snapshot_profile_template; headless runs clone it instead of starting from an empty profile
+    profile_template: Optional[str] = None
+    # Copy the template's HTTP/code/GPU caches into each clone too. Warm caches, but without copy-on-write
+    # (always the case on Windows) every launch pays a full byte copy of them
+    profile_template_caches: bool = False
+    # host:port of an Edge already started with --remote-debugging-port; attach instead of launching
+    debugger_address: Optional[str] = None
+    # URL patterns (CDP Network.setBlockedURLs wildcards) the browser should never fetch
+    blocked_urls: list[str] = field(default_factory=list)
+    # Preset: block image requests and disable image loading
+    block_images: bool = False
+    # WebDriver page load strategy: normal (wait for load), eager (DOMContentLoaded) or none
+    page_load_strategy: str = "normal"
+
+
+# Patterns added by the block_images preset
+IMAGE_URL_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"]
+
+
+@dataclass
+class NetworkStats:
+    """Per-run network counters gathered from the performance log when request blocking is on."""
+    requests: int = 0
+    bytes_loaded: int = 0
+    blocked: int = 0
+    blocked_by_type: dict = field(default_factory=dict)
+    # encoded bytes and count per resource type, used to estimate what blocked requests would have cost
+    loaded_by_type: dict = field(default_factory=dict)
+    request_types: dict = field(default_factory=dict)
+
+    def estimated_bytes_saved(self) -> Optional[int]:
+        """Blocked requests x average loaded size of the same resource type; None when no sample exists."""
+        total = 0
+        have_sample = False
+        for rtype, count in self.blocked_by_type.items():
+            size, n = self.loaded_by_type.get(rtype, (0, 0))
+            if n:
+                total += int(count * size / n)
+                have_sample = True
+        return total if have_sample else None
 
 
 def get_default_edge_user_data_dir() -> str:
@@ -41,13 +82,253 @@ def get_default_edge_user_data_dir() -> str:
     return os.path.join(local_app_data, "Microsoft", "Edge", "User Data")
 
 
+# Marks a directory written by snapshot_profile_template, the only kind of existing directory it replaces
+_TEMPLATE_MARKER = ".pf-profile-template"
+# Files that belong to a running browser instance and must never be copied into a template or clone
+_PROFILE_SKIP_NAMES = {"SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "Crashpad", "BrowserMetrics", _TEMPLATE_MARKER}
+# Cache directories the browser rebuilds on its own; left out of clones unless profile_template_caches is set
+_PROFILE_CACHE_DIRS = {"Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "DawnCache"}
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Copy-on-write clone (Linux FICLONE, e.g. btrfs/XFS). Returns False where unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        FICLONE = 0x40049409
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except Exception:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+
+
+def _copy_profile_tree(src_root: str, dst_root: str, include_caches: bool = True) -> tuple[int, int]:
+    """Copy a profile tree, skipping lock files (and cache directories unless include_caches).
+
+    Returns (copied, skipped) file counts.
+
+    Uses copy-on-write where the filesystem supports it and a plain copy otherwise. Never hardlinks: the
+    browser rewrites cache files in place, which would write through a link into the source.
+    """
+    copied = skipped = 0
+    for dirpath, dirnames, filenames in os.walk(src_root):
+        dirnames[:] = [
+            d for d in dirnames
+            if d not in _PROFILE_SKIP_NAMES and (include_caches or d not in _PROFILE_CACHE_DIRS)
+        ]
+        rel = os.path.relpath(dirpath, src_root)
+        out_dir = dst_root if rel == "." else os.path.join(dst_root, rel)
+        os.makedirs(out_dir, exist_ok=True)
+        for name in filenames:
+            if name in _PROFILE_SKIP_NAMES:
+                continue
+            src = os.path.join(dirpath, name)
+            dst = os.path.join(out_dir, name)
+            try:
+                if not _reflink(src, dst):
+                    shutil.copy2(src, dst)
+                copied += 1
+            except Exception:
+                # Typically a file held open by a running browser; the profile still works without it
+                skipped += 1
+                LOGGER.debug("Skipped profile file: %s", src, exc_info=True)
+    return copied, skipped
+
+
+def snapshot_profile_template(user_data_dir: str, profile_directory: str, template_dir: str) -> str:
+    """Snapshot a trusted Edge profile into template_dir (as its 'Default' profile) for later cloning.
+
+    Close Edge on that profile first so cookie/login databases are consistent. Returns template_dir.
+    An existing template_dir is replaced only if it is an earlier template (it has the marker file) or an
+    empty directory, and it may not overlap user_data_dir.
+    """
+    src_profile = os.path.join(user_data_dir, profile_directory)
+    if not os.path.isdir(src_profile):
+        raise RuntimeError(f"Edge profile not found: {src_profile}")
+    source, target = os.path.realpath(user_data_dir), os.path.realpath(template_dir)
+    try:
+        overlap = os.path.commonpath([source, target]) in (source, target)
+    except ValueError:
+        overlap = False  # different drives
+    if overlap:
+        raise RuntimeError(f"Template directory {template_dir} overlaps the Edge user data dir {user_data_dir}")
+    if os.path.exists(template_dir):
+        if not os.path.isdir(template_dir) or (
+            os.listdir(template_dir) and not os.path.isfile(os.path.join(template_dir, _TEMPLATE_MARKER))
+        ):
+            raise RuntimeError(f"Refusing to replace {template_dir}: it exists and is not a profile template")
+        shutil.rmtree(template_dir)
+    os.makedirs(template_dir)
+    # 'Local State' holds the key that decrypts the profile's cookies; it must travel with the profile
+    local_state = os.path.join(user_data_dir, "Local State")
+    if os.path.isfile(local_state):
+        shutil.copy2(local_state, os.path.join(template_dir, "Local State"))
+    copied, skipped = _copy_profile_tree(src_profile, os.path.join(template_dir, "Default"))
+    with open(os.path.join(template_dir, _TEMPLATE_MARKER), "w", encoding="utf-8") as f:
+        f.write(f"{user_data_dir}\n{profile_directory}\n")
+    LOGGER.info("Profile template created at %s (files copied=%s, skipped=%s)", template_dir, copied, skipped)
+    return template_dir
+
+
+def clone_profile_template(template_dir: str, include_caches: bool = False) -> str:
+    """Clone a profile template into a fresh temp user-data-dir and return its path.
+
+    Cache directories are left out unless include_caches: without copy-on-write they are a full byte copy
+    on every launch, and the browser rebuilds them as it goes.
+    """
+    if not os.path.isdir(template_dir):
+        raise RuntimeError(f"Profile template not found: {template_dir}")
+    clone_dir = tempfile.mkdtemp(prefix="edge-profile-")
+    copied, skipped = _copy_profile_tree(template_dir, clone_dir, include_caches=include_caches)
+    LOGGER.debug("Cloned profile template %s -> %s (copied=%s, skipped=%s)", template_dir, clone_dir, copied, skipped)
+    return clone_dir
+
+
+def _blocked_patterns(config: EdgeConfig) -> list[str]:
+    patterns = [p for p in (config.blocked_urls or []) if p]
+    if config.block_images:
+        patterns += [p for p in IMAGE_URL_PATTERNS if p not in patterns]
+    return patterns
+
+
+def _enable_network_log(options: EdgeOptions, config: EdgeConfig) -> None:
+    """Turn on the performance log (used for blocked/loaded request stats) when blocking is configured."""
+    if _blocked_patterns(config):
+        options.set_capability("ms:loggingPrefs", {"performance": "ALL"})
+
+
+def _apply_request_blocking(driver: webdriver.Edge, config: EdgeConfig) -> None:
+    patterns = _blocked_patterns(config)
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        setattr(driver, "_network_stats", NetworkStats())
+        setattr(driver, "_blocked_url_patterns", patterns)
+        LOGGER.info("Request blocking enabled for %s URL pattern(s).", len(patterns))
+    except Exception:
+        LOGGER.warning("Failed to enable request blocking via CDP; continuing without it.", exc_info=True)
+
+
+def reapply_request_blocking(driver: webdriver.Edge) -> None:
+    """Block the configured URL patterns in the current tab too; CDP blocking is per tab."""
+    patterns = getattr(driver, "_blocked_url_patterns", None)
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception:
+        LOGGER.debug("Failed to apply request blocking to the current tab.", exc_info=True)
+
+
+def collect_network_stats(driver: webdriver.Edge) -> Optional[NetworkStats]:
+    """Drain the performance log into the driver's NetworkStats. Cheap; call between patients to keep the log small."""
+    stats: Optional[NetworkStats] = getattr(driver, "_network_stats", None)
+    if stats is None:
+        return None
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        LOGGER.debug("Performance log unavailable.", exc_info=True)
+        return stats
+    for entry in entries:
+        try:
+            msg = json.loads(entry.get("message") or "{}").get("message") or {}
+            method = msg.get("method")
+            params = msg.get("params") or {}
+            if method == "Network.requestWillBeSent":
+                stats.requests += 1
+                stats.request_types[params.get("requestId")] = params.get("type") or "Other"
+            elif method == "Network.loadingFinished":
+                size = int(params.get("encodedDataLength") or 0)
+                stats.bytes_loaded += size
+                rtype = stats.request_types.pop(params.get("requestId"), "Other")
+                prev = stats.loaded_by_type.get(rtype, (0, 0))
+                stats.loaded_by_type[rtype] = (prev[0] + size, prev[1] + 1)
+            elif method == "Network.loadingFailed":
+                rtype = params.get("type") or stats.request_types.get(params.get("requestId")) or "Other"
+                stats.request_types.pop(params.get("requestId"), None)
+                if params.get("blockedReason"):
+                    stats.blocked += 1
+                    stats.blocked_by_type[rtype] = stats.blocked_by_type.get(rtype, 0) + 1
+        except Exception:
+            continue
+    return stats
+
+
+def report_network_stats(driver: webdriver.Edge) -> None:
+    """Log requests/bytes loaded and requests blocked (with estimated bytes saved) for this run."""
+    stats = collect_network_stats(driver)
+    if stats is None:
+        return
+    saved = stats.estimated_bytes_saved()
+    LOGGER.info(
+        "Network | requests=%s | loaded=%.1f MB | blocked=%s %s | est. saved=%s",
+        stats.requests,
+        stats.bytes_loaded / 1e6,
+        stats.blocked,
+        dict(sorted(stats.blocked_by_type.items())),
+        f"{saved / 1e6:.1f} MB" if saved is not None else "n/a",
+    )
+
+
+def _build_service(config: EdgeConfig):
+    """Return an EdgeService for config.driver_path (or prepend it to PATH); None to use Selenium Manager."""
+    service = None
+    if config.driver_path:
+        LOGGER.debug("Using provided msedgedriver path: %s", config.driver_path)
+        if EdgeService:
+            service = EdgeService(executable_path=config.driver_path)  # type: ignore
+        else:
+            # Fallback: prepend driver directory to PATH so webdriver.Edge can find it
+            driver_dir = os.path.dirname(config.driver_path)
+            os.environ["PATH"] = driver_dir + os.pathsep + os.environ.get("PATH", "")
+            LOGGER.debug("Prepended driver dir to PATH: %s", driver_dir)
+    return service
+
+
+def attach_edge_driver(config: EdgeConfig) -> webdriver.Edge:
+    """Attach to an Edge instance already running with --remote-debugging-port (config.debugger_address).
+
+    The browser keeps its own profile, caches and logged-in session; nothing is launched and quit_driver
+    only ends the WebDriver session, leaving the browser running.
+    """
+    options = EdgeOptions()
+    options.add_experimental_option("debuggerAddress", config.debugger_address)  # type: ignore
+    options.page_load_strategy = config.page_load_strategy
+    _enable_network_log(options, config)
+    LOGGER.debug("Attaching to running Edge at %s", config.debugger_address)
+    try:
+        driver = webdriver.Edge(options=options, service=_build_service(config))
+    except Exception as exc:
+        LOGGER.error("Failed to attach to Edge at %s: %s", config.debugger_address, exc)
+        raise
+    setattr(driver, "_attached", True)
+    _apply_request_blocking(driver, config)
+    return driver
+
+
 def build_edge_driver(config: Optional[EdgeConfig] = None) -> webdriver.Edge:
     """Create and return a Selenium Edge WebDriver configured to use the default profile.
 
-    Uses Selenium Manager to resolve the driver automatically.
+    Uses Selenium Manager to resolve the driver automatically. When config.debugger_address is set,
+    attaches to that running browser instead of launching one.
     """
     config = config or EdgeConfig()
+    if config.debugger_address:
+        return attach_edge_driver(config)
     options = EdgeOptions()
+    # eager/none: navigation returns early and callers gate on the elements they need
+    options.page_load_strategy = config.page_load_strategy
     # Reduce noisy Chromium stderr logs unless explicitly disabled
     if config.suppress_browser_logs:
         try:
@@ -62,8 +343,14 @@ def build_edge_driver(config: Optional[EdgeConfig] = None) -> webdriver.Edge:
     temp_user_data_dir: Optional[str] = None
     if config.headless:
         # Headless + existing real profile often crashes on Windows.
-        # Use a temporary clean profile for headless stability.
-        temp_user_data_dir = tempfile.mkdtemp(prefix="edge-profile-")
+        # Use a temporary profile for headless stability: a clone of the template when configured
+        # (warm caches, trusted cookies), else a clean one.
+        if config.profile_template:
+            temp_user_data_dir = clone_profile_template(
+                config.profile_template, include_caches=config.profile_template_caches
+            )
+        else:
+            temp_user_data_dir = tempfile.mkdtemp(prefix="edge-profile-")
         options.add_argument(f"--user-data-dir={temp_user_data_dir}")
         options.add_argument(f"--profile-directory=Default")
         # New Edge headless mode
@@ -83,29 +370,26 @@ def build_edge_driver(config: Optional[EdgeConfig] = None) -> webdriver.Edge:
     options.add_argument("--no-first-run")
     options.add_argument("--no-default-browser-check")
     options.add_argument("--remote-debugging-port=0")
+    if config.block_images:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})  # type: ignore
+    _enable_network_log(options, config)
 
     LOGGER.debug("Launching Edge with user-data-dir=%s, profile=%s, headless=%s",
                  temp_user_data_dir or default_user_data_dir, config.profile_directory, config.headless)
 
     # If a driver_path is provided (via config or env), use it to avoid network fetches
-    service = None
-    if config.driver_path:
-        LOGGER.debug("Using provided msedgedriver path: %s", config.driver_path)
-        if EdgeService:
-            service = EdgeService(executable_path=config.driver_path)  # type: ignore
-        else:
-            # Fallback: prepend driver directory to PATH so webdriver.Edge can find it
-            driver_dir = os.path.dirname(config.driver_path)
-            os.environ["PATH"] = driver_dir + os.pathsep + os.environ.get("PATH", "")
-            LOGGER.debug("Prepended driver dir to PATH: %s", driver_dir)
+    service = _build_service(config)
 
     try:
         driver = webdriver.Edge(options=options, service=service)
     except Exception as exc:
         LOGGER.error("Failed to start Edge WebDriver: %s", exc)
+        if temp_user_data_dir:
+            shutil.rmtree(temp_user_data_dir, ignore_errors=True)
         raise
 
     driver.set_window_size(1366, 900)
+    _apply_request_blocking(driver, config)
 
     # Attach temp profile path for cleanup on quit
     if temp_user_data_dir:
@@ -117,6 +401,7 @@ def build_edge_driver(config: Optional[EdgeConfig] = None) -> webdriver.Edge:
 
 
 def quit_driver(driver: webdriver.Edge) -> None:
+    # For an attached browser this only ends the WebDriver session; msedgedriver leaves the browser running
     try:
         driver.quit()
     except Exception:
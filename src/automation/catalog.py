@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from automation.state import default_state_dir
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_dir TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    started TEXT NOT NULL,
+    finished TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS facilities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT PRIMARY KEY,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS visits (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    patient_id TEXT NOT NULL REFERENCES patients(patient_id),
+    facility_id INTEGER REFERENCES facilities(id),
+    date TEXT,
+    href TEXT,
+    PRIMARY KEY (run_id, patient_id)
+);
+CREATE INDEX IF NOT EXISTS visits_patient ON visits(patient_id);
+CREATE INDEX IF NOT EXISTS visits_date ON visits(date);
+CREATE TABLE IF NOT EXISTS stages (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    patient_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seconds REAL,
+    detail TEXT,
+    at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stages_patient ON stages(patient_id, at);
+CREATE INDEX IF NOT EXISTS stages_at ON stages(at);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    patient_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    bytes INTEGER,
+    at TEXT NOT NULL,
+    PRIMARY KEY (run_id, patient_id, name)
+);
+CREATE INDEX IF NOT EXISTS artifacts_patient ON artifacts(patient_id);
+CREATE INDEX IF NOT EXISTS artifacts_sha ON artifacts(sha256);
+"""
+
+
+def default_catalog_path() -> Path:
+    return default_state_dir() / "catalog.sqlite"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _sha256(path: Path) -> Optional[str]:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    path = path or default_catalog_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class Catalog:
+    """Cross-run index of Processing history in .state/catalog.sqlite.
+
+    One row per run, per patient seen in it (visits: facility, date, summary href), per stage outcome
+    (harvest/extract/populate with status and duration) and per artifact (current path, SHA-256, size).
+    Lookups by patient id and by date go through indexes, so "when did we last process X" doesn't walk
+    Processing/. Writes are best effort: a catalog error is logged and never stops the run.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, run_id: int) -> None:
+        self.conn = conn
+        self.run_id = run_id
+        self._lock = threading.Lock()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(sql, params)
+        except sqlite3.Error:
+            LOGGER.warning("Catalog write failed: %s", sql.split("(")[0].strip(), exc_info=True)
+
+    def visit(self, patient_id: str, facility: Optional[str] = None, date: Optional[str] = None, href: Optional[str] = None) -> None:
+        now = _now()
+        try:
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO patients (patient_id, first_seen, last_seen) VALUES (?, ?, ?) "
+                    "ON CONFLICT(patient_id) DO UPDATE SET last_seen = excluded.last_seen",
+                    (patient_id, now, now),
+                )
+                facility_id = None
+                if facility:
+                    self.conn.execute("INSERT OR IGNORE INTO facilities (name) VALUES (?)", (facility,))
+                    facility_id = self.conn.execute("SELECT id FROM facilities WHERE name = ?", (facility,)).fetchone()[0]
+                self.conn.execute(
+                    "INSERT INTO visits (run_id, patient_id, facility_id, date, href) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(run_id, patient_id) DO UPDATE SET "
+                    "facility_id = COALESCE(excluded.facility_id, facility_id), date = COALESCE(excluded.date, date), "
+                    "href = COALESCE(excluded.href, href)",
+                    (self.run_id, patient_id, facility_id, date, href),
+                )
+        except sqlite3.Error:
+            LOGGER.warning("Catalog write failed: visit %s", patient_id, exc_info=True)
+
+    def stage(self, patient_id: str, stage: str, status: str, seconds: Optional[float] = None, detail: str = "") -> None:
+        self._write(
+            "INSERT INTO stages (run_id, patient_id, stage, status, seconds, detail, at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.run_id, patient_id, stage, status, round(seconds, 2) if seconds is not None else None, detail or None, _now()),
+        )
+
+    def artifact(self, patient_id: str, path: Path, sha256: Optional[str] = None) -> None:
+        """Record (or re-point, after a move) one of the patient's files; hashes it unless sha256 is given."""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        self._write(
+            "INSERT INTO artifacts (run_id, patient_id, name, path, sha256, bytes, at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(run_id, patient_id, name) DO UPDATE SET path = excluded.path, sha256 = excluded.sha256, "
+            "bytes = excluded.bytes, at = excluded.at",
+            (self.run_id, patient_id, path.name, str(path), sha256 or _sha256(path), size, _now()),
+        )
+
+    def finish(self, status: str) -> None:
+        self._write("UPDATE runs SET finished = ?, status = ? WHERE id = ?", (_now(), status, self.run_id))
+
+
+# Catalog of the current run; None when not configured (e.g. helpers used on their own)
+_CATALOG: Optional[Catalog] = None
+
+
+def configure_catalog(run_dir: Path, phase: str, path: Optional[Path] = None) -> Optional[Catalog]:
+    """Open the catalog and register this run; returns None (catalog off for the run) if it can't be opened."""
+    global _CATALOG
+    try:
+        conn = connect(path)
+        with conn:
+            cur = conn.execute("INSERT INTO runs (run_dir, phase, started) VALUES (?, ?, ?)", (str(run_dir), phase, _now()))
+        _CATALOG = Catalog(conn, cur.lastrowid)
+    except sqlite3.Error:
+        LOGGER.warning("Run catalog unavailable; continuing without it.", exc_info=True)
+        _CATALOG = None
+    return _CATALOG
+
+
+def get_catalog() -> Optional[Catalog]:
+    return _CATALOG
+
+
+def finish_catalog(status: str) -> None:
+    if _CATALOG is not None:
+        _CATALOG.finish(status)
+
+
+# --- Query CLI: python -m automation.catalog ... ---
+
+
+def _print_rows(rows: list[sqlite3.Row]) -> None:
+    if not rows:
+        print("(no rows)")
+        return
+    cols = rows[0].keys()
+    widths = [max(len(c), *(len(str(r[c] if r[c] is not None else "")) for r in rows)) for c in cols]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for r in rows:
+        print("  ".join(str(r[c] if r[c] is not None else "").ljust(w) for c, w in zip(cols, widths)))
+
+
+def query_patient(conn: sqlite3.Connection, patient_id: str) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT s.at, r.run_dir, f.name AS facility, v.date, s.stage, s.status, s.seconds, s.detail "
+        "FROM stages s JOIN runs r ON r.id = s.run_id "
+        "LEFT JOIN visits v ON v.run_id = s.run_id AND v.patient_id = s.patient_id "
+        "LEFT JOIN facilities f ON f.id = v.facility_id "
+        "WHERE s.patient_id = ? ORDER BY s.at DESC",
+        (patient_id,),
+    ).fetchall()
+
+
+def query_artifacts(conn: sqlite3.Connection, patient_id: str) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT a.at, a.name, a.path, a.bytes, a.sha256 FROM artifacts a WHERE a.patient_id = ? ORDER BY a.at DESC",
+        (patient_id,),
+    ).fetchall()
+
+
+def query_date(conn: sqlite3.Connection, date: str) -> list[sqlite3.Row]:
+    """Latest status per stage for every patient seen on an appointment date (YYYY-MM-DD)."""
+    return conn.execute(
+        "SELECT v.patient_id, f.name AS facility, r.run_dir, "
+        "(SELECT status FROM stages s WHERE s.run_id = v.run_id AND s.patient_id = v.patient_id AND s.stage = 'harvest' ORDER BY s.id DESC LIMIT 1) AS harvest, "
+        "(SELECT status FROM stages s WHERE s.run_id = v.run_id AND s.patient_id = v.patient_id AND s.stage = 'extract' ORDER BY s.id DESC LIMIT 1) AS extract, "
+        "(SELECT status FROM stages s WHERE s.run_id = v.run_id AND s.patient_id = v.patient_id AND s.stage = 'populate' ORDER BY s.id DESC LIMIT 1) AS populate "
+        "FROM visits v JOIN runs r ON r.id = v.run_id LEFT JOIN facilities f ON f.id = v.facility_id "
+        "WHERE v.date = ? ORDER BY v.patient_id, r.started",
+        (date,),
+    ).fetchall()
+
+
+def query_runs(conn: sqlite3.Connection, limit: int) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT r.id, r.run_dir, r.phase, r.started, r.finished, r.status, "
+        "(SELECT COUNT(*) FROM visits v WHERE v.run_id = r.id) AS patients "
+        "FROM runs r ORDER BY r.id DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m automation.catalog", description="Query the run catalog")
+    parser.add_argument("--db", type=Path, default=None, help="Catalog file (default: .state/catalog.sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("patient", help="Stage history (and with --files, artifacts) of one patient, newest first")
+    p.add_argument("patient_id")
+    p.add_argument("--files", action="store_true")
+    d = sub.add_parser("date", help="Patients seen for an appointment date (YYYY-MM-DD) and their stage outcomes")
+    d.add_argument("date")
+    r = sub.add_parser("runs", help="Most recent runs")
+    r.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = args.db or default_catalog_path()
+    if not db.exists():
+        print(f"No catalog at {db}")
+        return 1
+    conn = connect(db)
+    try:
+        if args.command == "patient":
+            _print_rows(query_patient(conn, args.patient_id))
+            if args.files:
+                print()
+                _print_rows(query_artifacts(conn, args.patient_id))
+        elif args.command == "date":
+            _print_rows(query_date(conn, args.date))
+        else:
+            _print_rows(query_runs(conn, args.limit))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
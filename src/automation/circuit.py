@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class BreakerSettings:
+    enabled: bool = True
+    # Consecutive failures that open a breaker
+    failure_threshold: int = 3
+    # An open breaker lets one probe through after this many patients
+    probe_every_patients: int = 10
+
+
+@dataclass
+class CircuitBreaker:
+    name: str
+    state: str = "closed"  # closed | open | half_open
+    consecutive_failures: int = 0
+    opened_at_patient: int = 0
+    trips: int = 0
+    skipped: int = 0
+    last_error: str = ""
+
+
+@dataclass
+class BreakerBoard:
+    """Circuit breakers for UI paths (a summary section, one of its selectors) within one run.
+
+    A breaker opens after failure_threshold consecutive failures; while open, the path is skipped instead
+    of paying its full wait for every patient. Every probe_every_patients patients it goes half-open and
+    lets one attempt through: success closes it, failure re-opens it.
+    """
+
+    settings: BreakerSettings = field(default_factory=BreakerSettings)
+    breakers: dict[str, CircuitBreaker] = field(default_factory=dict)
+    patient_no: int = 0
+
+    def begin_patient(self) -> None:
+        self.patient_no += 1
+
+    def _get(self, name: str) -> CircuitBreaker:
+        b = self.breakers.get(name)
+        if b is None:
+            b = self.breakers[name] = CircuitBreaker(name)
+        return b
+
+    def allow(self, *names: str) -> bool:
+        """False when any of names is open (and not due for a probe); the skip is counted on it."""
+        if not self.settings.enabled:
+            return True
+        blocked: Optional[CircuitBreaker] = None
+        for name in names:
+            b = self.breakers.get(name)
+            if b is None or b.state == "closed":
+                continue
+            if b.state == "open" and self.patient_no - b.opened_at_patient >= self.settings.probe_every_patients:
+                b.state = "half_open"
+                LOGGER.info("Circuit %s half-open; probing.", name)
+            if b.state == "open" and blocked is None:
+                blocked = b
+        if blocked is not None:
+            blocked.skipped += 1
+            return False
+        return True
+
+    def success(self, *names: str) -> None:
+        for name in names:
+            b = self.breakers.get(name)
+            if b is None:
+                continue
+            if b.state != "closed":
+                LOGGER.info("Circuit %s closed after successful probe.", name)
+            b.state = "closed"
+            b.consecutive_failures = 0
+
+    def failure(self, name: str, error: str = "") -> None:
+        if not self.settings.enabled:
+            return
+        b = self._get(name)
+        b.consecutive_failures += 1
+        b.last_error = error
+        if b.state == "half_open" or (b.state == "closed" and b.consecutive_failures >= self.settings.failure_threshold):
+            b.state = "open"
+            b.opened_at_patient = self.patient_no
+            b.trips += 1
+            LOGGER.warning(
+                "Circuit %s open after %s consecutive failure(s) (%s); skipping for %s patient(s).",
+                name, b.consecutive_failures, error or "no detail", self.settings.probe_every_patients,
+            )
+
+    def report(self) -> list[str]:
+        lines = []
+        for b in sorted(self.breakers.values(), key=lambda b: b.name):
+            if b.trips:
+                lines.append(
+                    f"{b.name}: {b.state}, tripped {b.trips}x, skipped {b.skipped}x, last error: {b.last_error or 'n/a'}"
+                )
+        return lines
+
+
+# Process-wide board; reset per run by configure_breakers()
+_BOARD = BreakerBoard()
+
+
+def configure_breakers(settings: BreakerSettings) -> BreakerBoard:
+    global _BOARD
+    _BOARD = BreakerBoard(settings)
+    return _BOARD
+
+
+def get_breaker_board() -> BreakerBoard:
+    return _BOARD
+
+
+def report_breakers() -> list[str]:
+    """Log and return a line per breaker that tripped during the run."""
+    lines = _BOARD.report()
+    for line in lines:
+        LOGGER.warning("Circuit | %s", line)
+    return lines
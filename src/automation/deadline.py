@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class BudgetSettings:
+    """Time budgets for one patient and one facility; None means unbounded."""
+    patient_seconds: Optional[float] = None
+    facility_seconds: Optional[float] = None
+    # Optional summary sections are skipped once a patient has less than this many seconds left
+    shed_below_seconds: float = 60.0
+    optional_sections: tuple[str, ...] = ("nutrition_history", "preventive_care")
+
+
+_SETTINGS = BudgetSettings()
+
+
+def configure_budgets(settings: BudgetSettings) -> None:
+    global _SETTINGS
+    _SETTINGS = settings
+
+
+def get_budget_settings() -> BudgetSettings:
+    return _SETTINGS
+
+
+class Deadline:
+    """A point in time after which waits should give up, optionally nested in a parent (facility) deadline.
+
+    Every wait takes the smaller of its own timeout and remaining(); an unbounded deadline never shortens
+    anything.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None, label: str = ""):
+        self.label = label
+        self.parent = parent
+        self.expires_at = time.monotonic() + seconds if seconds and seconds > 0 else None
+
+    def remaining(self) -> float:
+        own = math.inf if self.expires_at is None else max(0.0, self.expires_at - time.monotonic())
+        if self.parent is not None:
+            return min(own, self.parent.remaining())
+        return own
+
+    def clamp(self, timeout: float) -> float:
+        return max(0.0, min(float(timeout), self.remaining()))
+
+    @contextmanager
+    def paused(self):
+        """Stop this deadline's clock for the block (e.g. CPU-bound extraction), so only browser work spends it.
+
+        A parent (facility) deadline keeps running: it is a wall-clock limit for the whole facility.
+        """
+        started = time.monotonic()
+        try:
+            yield self
+        finally:
+            if self.expires_at is not None:
+                self.expires_at += time.monotonic() - started
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def should_shed(self, section_key: str) -> bool:
+        """True when section_key is optional and the remaining budget is below the shedding threshold."""
+        return section_key in _SETTINGS.optional_sections and self.remaining() < _SETTINGS.shed_below_seconds
+
+
+def facility_deadline(label: str = "") -> Deadline:
+    return Deadline(_SETTINGS.facility_seconds, label=label)
+
+
+def patient_deadline(parent: Optional[Deadline] = None, label: str = "") -> Deadline:
+    return Deadline(_SETTINGS.patient_seconds, parent=parent, label=label)
+
+
+def clamp_timeout(timeout: float, deadline: Optional[Deadline]) -> float:
+    """timeout limited by deadline's remaining budget (unchanged when deadline is None)."""
+    return timeout if deadline is None else deadline.clamp(timeout)
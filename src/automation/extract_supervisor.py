@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import os
+import signal
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from automation.state import default_state_dir, load_json, save_json_atomic
+
+LOGGER = logging.getLogger(__name__)
+
+OK = "ok"
+FAILED = "failed"  # extractor ran and reported failure
+TIMEOUT = "timeout"
+CRASH = "crash"  # worker died (segfault in native OCR code, killed by the OS, ...)
+MEMORY = "memory"  # worker went over memory_limit_mb
+
+
+@dataclass
+class ExtractionOutcome:
+    status: str
+    seconds: float
+    exit_code: Optional[int] = None
+    detail: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+def _worker_main(conn) -> None:
+    """Supervised worker: runs extraction jobs sent over conn until it receives None.
+
+    The memory limit is enforced by the supervisor polling the tree's resident memory, not by an rlimit
+    here: RLIMIT_AS counts reserved address space, which OCR libraries and thread stacks inflate far
+    beyond what they actually use, and would turn ordinary allocations into MemoryErrors.
+    """
+    if os.name == "posix":
+        # Own process group, so the supervisor can kill the worker together with its OCR pool
+        os.setpgrp()
+    from automation.extraction import run_intake_extractor
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        pdf_path, output_json, log_file, settings = job
+        try:
+            ok = run_intake_extractor(Path(pdf_path), Path(output_json), Path(log_file), settings=settings)
+            conn.send((OK if ok else FAILED, ""))
+        except MemoryError:
+            conn.send((MEMORY, "MemoryError"))
+        except Exception as e:
+            conn.send((FAILED, repr(e)))
+
+
+def _tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of pid and its children in MB; None without psutil."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        proc = psutil.Process(pid)
+        procs = [proc] + proc.children(recursive=True)
+        total = 0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 2**20
+    except psutil.Error:
+        return None
+
+
+_WARNED_NO_PSUTIL = False
+
+
+def _warn_if_unenforced(memory_limit_mb: int) -> None:
+    """Warn once when a memory limit is configured but psutil (needed to poll RSS) isn't installed."""
+    global _WARNED_NO_PSUTIL
+    if memory_limit_mb <= 0 or _WARNED_NO_PSUTIL:
+        return
+    try:
+        import psutil  # noqa: F401
+    except ImportError:
+        _WARNED_NO_PSUTIL = True
+        LOGGER.warning("[extractor] memory_limit_mb=%s is not enforced: psutil is not installed (pip install psutil).", memory_limit_mb)
+
+
+def _kill_tree(pid: int) -> None:
+    try:
+        import psutil
+        proc = psutil.Process(pid)
+        for child in proc.children(recursive=True):
+            try:
+                child.kill()
+            except psutil.Error:
+                pass
+        proc.kill()
+        return
+    except ImportError:
+        pass
+    except Exception:
+        LOGGER.debug("psutil kill of extraction worker %s failed.", pid, exc_info=True)
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"], capture_output=True, check=False)
+        else:
+            os.killpg(pid, signal.SIGKILL)
+    except Exception:
+        LOGGER.debug("Kill of extraction worker %s failed.", pid, exc_info=True)
+
+
+class ExtractionSupervisor:
+    """Runs run_intake_extractor in a long-lived worker process with a wall-clock timeout and memory limit.
+
+    The worker (and the OCR pool it owns) stays warm between documents. A document that times out, goes
+    over the memory limit or crashes the worker gets the whole process tree killed; the next document
+    starts a fresh worker.
+    """
+
+    def __init__(self, timeout_seconds: float, memory_limit_mb: int = 0) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mb = memory_limit_mb
+        _warn_if_unenforced(memory_limit_mb)
+        self._proc = None
+        self._conn = None
+        self.restarts = 0
+
+    def _start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_worker_main, args=(child_conn,), name="intake-extractor", daemon=False
+        )
+        self._proc.start()
+        child_conn.close()
+        self._conn = parent_conn
+        LOGGER.info("Started extraction worker pid=%s.", self._proc.pid)
+
+    def _kill(self) -> Optional[int]:
+        if self._proc is None:
+            return None
+        if self._proc.is_alive():
+            _kill_tree(self._proc.pid)
+        self._proc.join(5)
+        code = self._proc.exitcode
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._proc = None
+        self._conn = None
+        self.restarts += 1
+        return code
+
+    def run(self, pdf_path: Path, output_json: Path, log_file: Path, settings=None) -> ExtractionOutcome:
+        """Extract one document; settings (an ExtractorSettings) overrides config/settings.ini in the worker."""
+        start = time.monotonic()
+        for attempt in range(2):
+            if self._proc is None or not self._proc.is_alive():
+                if self._proc is not None:
+                    self._kill()
+                self._start()
+            try:
+                self._conn.send((str(pdf_path), str(output_json), str(log_file), settings))
+                break
+            except (BrokenPipeError, OSError):
+                # Worker died between documents; start a new one and resend once
+                self._kill()
+                if attempt:
+                    return ExtractionOutcome(CRASH, time.monotonic() - start, detail="worker not accepting jobs")
+
+        while True:
+            elapsed = time.monotonic() - start
+            try:
+                if self._conn.poll(0.5):
+                    status, detail = self._conn.recv()
+                    return ExtractionOutcome(status, time.monotonic() - start, detail=detail)
+            except (EOFError, OSError):
+                pass  # worker gone; classified below
+            if not self._proc.is_alive():
+                code = self._kill()
+                return self._fail(log_file, ExtractionOutcome(CRASH, elapsed, code, f"worker exited with code {code}"))
+            if elapsed > self.timeout_seconds:
+                code = self._kill()
+                return self._fail(log_file, ExtractionOutcome(TIMEOUT, elapsed, code, f"no result after {self.timeout_seconds:.0f}s"))
+            if self.memory_limit_mb > 0:
+                rss = _tree_rss_mb(self._proc.pid)
+                if rss is not None and rss > self.memory_limit_mb:
+                    code = self._kill()
+                    return self._fail(log_file, ExtractionOutcome(MEMORY, elapsed, code, f"{rss:.0f}MB > {self.memory_limit_mb}MB"))
+
+    @staticmethod
+    def _fail(log_file: Path, outcome: ExtractionOutcome) -> ExtractionOutcome:
+        """Note a killed/crashed run at the end of the document's extractor log."""
+        try:
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(f"\nSupervisor: {outcome.status} after {outcome.seconds:.1f}s ({outcome.detail}); worker killed\n")
+        except OSError:
+            pass
+        LOGGER.warning("Extraction of %s: %s after %.1fs (%s).", log_file.name, outcome.status, outcome.seconds, outcome.detail)
+        return outcome
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        try:
+            self._conn.send(None)
+            self._proc.join(10)
+        except Exception:
+            pass
+        if self._proc.is_alive():
+            _kill_tree(self._proc.pid)
+            self._proc.join(5)
+        self._proc = None
+        self._conn = None
+
+
+_SUPERVISOR: Optional[ExtractionSupervisor] = None
+
+
+def get_supervisor(timeout_seconds: float, memory_limit_mb: int = 0) -> ExtractionSupervisor:
+    global _SUPERVISOR
+    if _SUPERVISOR is None:
+        _SUPERVISOR = ExtractionSupervisor(timeout_seconds, memory_limit_mb)
+    _SUPERVISOR.timeout_seconds = timeout_seconds
+    _SUPERVISOR.memory_limit_mb = memory_limit_mb
+    _warn_if_unenforced(memory_limit_mb)
+    return _SUPERVISOR
+
+
+def shutdown_supervisor() -> None:
+    global _SUPERVISOR
+    if _SUPERVISOR is not None:
+        _SUPERVISOR.close()
+    _SUPERVISOR = None
+
+
+atexit.register(shutdown_supervisor)
+
+
+def _outcomes_path() -> Path:
+    return default_state_dir() / "extraction-outcomes.json"
+
+
+def record_outcome(patient_id: str, pdf_path: Path, outcome: ExtractionOutcome) -> None:
+    """Keep the latest extraction outcome per patient in .state/extraction-outcomes.json."""
+    path = _outcomes_path()
+    data = load_json(path, {}) or {}
+    data[patient_id] = {
+        **asdict(outcome),
+        "seconds": round(outcome.seconds, 1),
+        "pdf": str(pdf_path),
+        "at": datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        save_json_atomic(path, data)
+    except Exception:
+        LOGGER.warning("Failed to record extraction outcome for %s", patient_id, exc_info=True)
@@ -2,7 +2,16 @@ from __future__ import annotations
 
 from pathlib import Path
 import sys
+import argparse
 import contextlib
+import dataclasses
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
 
 
 import logging
@@ -16,44 +25,363 @@ except ImportError as e:
     LOGGER.error("Please install the missing dependency with: pip install pdf2image")
     raise
 
+from automation import ocr_pool, pdf_text
 
-def get_extractor_repo_path_from_config(config_path: Path = Path("config/settings.ini")) -> Path:
+
+@dataclass
+class ExtractorSettings:
+    repo_path: Path
+    # Build pages with a usable text layer / filled form fields directly; only image-only pages go to OCR
+    text_layer_fast_path: bool = True
+    # Fewer characters than this on a page without form fields means it is treated as image-only
+    min_text_chars: int = 200
+    # OCR pages are extracted one per worker process; 0 = one worker per core
+    ocr_workers: int = 0
+    # Resolution pages are rasterized at for OCR
+    dpi: int = 300
+    # Documents with fewer OCR pages than this go to the extractor in a single run
+    parallel_min_pages: int = 2
+    # Run extraction in a supervised worker process that is killed on timeout, memory limit or crash
+    isolate: bool = True
+    timeout_seconds: float = 600.0
+    # Memory limit for the worker and its OCR pool; 0 = no limit
+    memory_limit_mb: int = 0
+
+
+def get_extractor_settings(config_path: Path = Path("config/settings.ini")) -> ExtractorSettings:
     import configparser
     cfg = configparser.ConfigParser()
     cfg.read(config_path, encoding="utf-8")
-    if cfg.has_section("extractor") and cfg["extractor"].get("repo_path"):
-        return Path(cfg["extractor"].get("repo_path"))
-    return Path(r"C:\Users\raghu\Documents\Python Projects\pdf-parser")
+    settings = ExtractorSettings(repo_path=Path(r"C:\Users\raghu\Documents\Python Projects\pdf-parser"))
+    if cfg.has_section("extractor"):
+        sec = cfg["extractor"]
+        if sec.get("repo_path"):
+            settings.repo_path = Path(sec.get("repo_path"))
+        try:
+            settings.text_layer_fast_path = sec.getboolean("text_layer_fast_path", fallback=True)
+            settings.min_text_chars = sec.getint("min_text_chars", fallback=200)
+            settings.ocr_workers = sec.getint("ocr_workers", fallback=0)
+            settings.dpi = sec.getint("dpi", fallback=300)
+            settings.parallel_min_pages = sec.getint("parallel_min_pages", fallback=2)
+            settings.isolate = sec.getboolean("isolate", fallback=True)
+            settings.timeout_seconds = sec.getfloat("timeout_seconds", fallback=600.0)
+            settings.memory_limit_mb = sec.getint("memory_limit_mb", fallback=0)
+        except ValueError:
+            LOGGER.warning("Invalid [extractor] settings; using defaults for the rest.")
+    return settings
+
+
+def get_extractor_repo_path_from_config(config_path: Path = Path("config/settings.ini")) -> Path:
+    return get_extractor_settings(config_path).repo_path
+
+
+def _run_external_extractor(repo_path: Path, pdf_path: Path, output_json: Path) -> Optional[dict]:
+    """Run the OCR extractor from the external repo; returns its data, None on failure (details printed)."""
+    sys.path.insert(0, str(repo_path))
+    try:
+        from extractor import run_extractor_from_config  # type: ignore
+    except Exception as e:
+        print(f"Failed to import extractor from {repo_path}: {e}")
+        return None
+    try:
+        return run_extractor_from_config(
+            pdf_path=str(pdf_path),
+            output_path=str(output_json),
+        ) or {}
+    except Exception as e:
+        print(f"Extractor run failed: {e}")
+        return None
+
+
+def _route_pages(pdf_path: Path, settings: ExtractorSettings) -> Optional[list[pdf_text.PageRoute]]:
+    if not settings.text_layer_fast_path:
+        return None
+    if not pdf_text.available():
+        print("Text-layer fast path unavailable (pypdfium2 not installed); all pages go to OCR.")
+        return None
+    try:
+        routes = pdf_text.route_pages(pdf_path, min_text_chars=settings.min_text_chars)
+    except Exception as e:
+        print(f"Text-layer pre-stage failed; all pages go to OCR: {e}")
+        return None
+    for r in routes:
+        print("Route |", r.describe())
+        LOGGER.info("%s | %s", pdf_path.name, r.describe())
+    return routes
+
+
+def _fast_page(route: pdf_text.PageRoute) -> dict:
+    return {"page_number": route.index + 1, "extraction": route.route, "sections": route.sections, "responses": []}
+
+
+def _write_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _all_ocr_routes(pdf_path: Path) -> Optional[list[pdf_text.PageRoute]]:
+    """Every page routed to OCR (fast path off), so the document can still be split across the pool."""
+    if not pdf_text.available():
+        return None
+    try:
+        return [pdf_text.PageRoute(i, "ocr") for i in range(pdf_text.page_count(pdf_path))]
+    except Exception as e:
+        print(f"Could not open PDF with pdfium: {e}")
+        return None
+
+
+def _ocr_subset(pdf_path: Path, indices: list[int], repo_path: Path, scratch: Path) -> Optional[tuple[dict, dict[int, list]]]:
+    """One extractor run over a PDF of just the given pages; returns (data, {index: [pages]})."""
+    subset = pdf_text.write_page_subset(pdf_path, indices, scratch / "ocr-pages.pdf")
+    print(f"OCR subset: pages {[i + 1 for i in indices]}")
+    data = _run_external_extractor(repo_path, subset, scratch / "ocr-pages.json")
+    if data is None:
+        return None
+    ocr_pages = list(data.get("pages", []) or [])
+    by_index: dict[int, list] = {i: [] for i in indices}
+    for k, page in enumerate(ocr_pages):
+        # Extractor returned more pages than it was given (e.g. split pages): keep them with the last page
+        by_index[indices[min(k, len(indices) - 1)]].append(page)
+    return data, by_index
+
+
+def _ocr_parallel(
+    pdf_path: Path, indices: list[int], repo_path: Path, scratch: Path, settings: ExtractorSettings
+) -> tuple[dict, dict[int, list]]:
+    """Extract pages across the OCR pool; returns (first page's data, {index: [pages]}) for the pages that succeeded."""
+    workers = ocr_pool.resolve_workers(settings.ocr_workers)
+    print(f"OCR pool: {len(indices)} page(s) on {workers} worker(s) at {settings.dpi} dpi")
+    results = ocr_pool.extract_pages(pdf_path, indices, repo_path, scratch, workers, settings.dpi)
+    by_index = {i: list(results[i].get("pages", []) or []) for i in indices if i in results}
+    first = results[min(results)] if results else {}
+    return first, by_index
+
+
+def _label_pages(index: int, pages: list) -> list:
+    labelled = []
+    for page in pages:
+        if isinstance(page, dict):
+            page = {**page, "page_number": index + 1, "extraction": "ocr"}
+        labelled.append(page)
+    return labelled
+
 
 def run_intake_extractor(
     pdf_path: Path,
     output_json: Path,
     log_file: Path,
     repo_path: Path | None = None,
+    settings: Optional[ExtractorSettings] = None,
 ) -> bool:
     """Run external extractor from another repo and capture logs to a file.
 
-    Reads repo_path from config/settings.ini [extractor] section if not provided.
+    Reads repo_path from config/settings.ini [extractor] section if not provided. Pages with a usable text
+    layer or filled form fields are built directly with pdfium; the remaining image-only pages are OCR'd,
+    one page per worker process when there are enough of them, otherwise as one subset PDF, and merged
+    back in page order. The per-page routing is logged.
     """
+    settings = settings or get_extractor_settings()
     if repo_path is None:
-        repo_path = get_extractor_repo_path_from_config()
-    success = False
+        repo_path = settings.repo_path
     log_file.parent.mkdir(parents=True, exist_ok=True)
     with open(log_file, "w", encoding="utf-8", errors="ignore") as lf:
         with contextlib.redirect_stdout(lf), contextlib.redirect_stderr(lf):
-            sys.path.insert(0, str(repo_path))
-            try:
-                from extractor import run_extractor_from_config  # type: ignore
-            except Exception as e:
-                print(f"Failed to import extractor from {repo_path}: {e}")
-                return False
-            try:
-                data = run_extractor_from_config(
-                    pdf_path=str(pdf_path),
-                    output_path=str(output_json),
-                )
-                print("Done; pages:", len((data or {}).get("pages", [])))
-                success = True
-            except Exception as e:
-                print(f"Extractor run failed: {e}")
-    return success
+            routes = _route_pages(pdf_path, settings) or _all_ocr_routes(pdf_path)
+            ocr_indices = [r.index for r in routes if r.route == "ocr"] if routes else []
+            parallel = (
+                ocr_pool.available()
+                and ocr_pool.resolve_workers(settings.ocr_workers) > 1
+                and len(ocr_indices) >= max(2, settings.parallel_min_pages)
+            )
+            if not routes or (len(ocr_indices) == len(routes) and not parallel):
+                data = _run_external_extractor(repo_path, pdf_path, output_json)
+                if data is None:
+                    return False
+                print("Done; pages:", len(data.get("pages", [])))
+                return True
+
+            pages: dict[int, list] = {r.index: [_fast_page(r)] for r in routes if r.route != "ocr"}
+            data = {}
+            if ocr_indices:
+                with tempfile.TemporaryDirectory(prefix="intake-ocr-") as tmp:
+                    scratch = Path(tmp)
+                    remaining = list(ocr_indices)
+                    if parallel:
+                        data, done = _ocr_parallel(pdf_path, remaining, repo_path, scratch, settings)
+                        for index, ocr_pages in done.items():
+                            pages[index] = _label_pages(index, ocr_pages)
+                        remaining = [i for i in remaining if i not in done]
+                        if remaining:
+                            print(f"Retrying {len(remaining)} failed page(s) in one extractor run")
+                    if remaining:
+                        subset = _ocr_subset(pdf_path, remaining, repo_path, scratch)
+                        if subset is None:
+                            return False
+                        subset_data, done = subset
+                        data = data or subset_data
+                        for index, ocr_pages in done.items():
+                            pages[index] = _label_pages(index, ocr_pages)
+            data = {**data, "pages": [page for i in sorted(pages) for page in pages[i]]}
+            _write_json(output_json, data)
+            print("Done; pages:", len(data["pages"]), "| ocr pages:", len(ocr_indices))
+    return True
+
+
+def extract_intake(pdf_path: Path, output_json: Path, log_file: Path):
+    """run_intake_extractor with isolation: returns an ExtractionOutcome (ok/failed/timeout/crash/memory).
+
+    With [extractor] isolate on, the run happens in a supervised worker process, so a hung OCR call or a
+    native crash costs one document instead of the browser session.
+    """
+    from automation.extract_supervisor import FAILED, OK, ExtractionOutcome, get_supervisor
+
+    settings = get_extractor_settings()
+    if settings.isolate:
+        return get_supervisor(settings.timeout_seconds, settings.memory_limit_mb).run(pdf_path, output_json, log_file)
+    return _extract_in_process(pdf_path, output_json, log_file)
+
+
+def _extract_in_process(pdf_path: Path, output_json: Path, log_file: Path, settings: Optional[ExtractorSettings] = None):
+    """run_intake_extractor in this process (isolate off), as an ExtractionOutcome."""
+    from automation.extract_supervisor import FAILED, OK, ExtractionOutcome
+
+    start = time.monotonic()
+    try:
+        ok = run_intake_extractor(pdf_path, output_json, log_file, settings=settings)
+        return ExtractionOutcome(OK if ok else FAILED, time.monotonic() - start)
+    except Exception as e:
+        return ExtractionOutcome(FAILED, time.monotonic() - start, detail=repr(e))
+
+
+def _newest_code_mtime(repo_path: Path) -> float:
+    """Newest .py mtime across the extractor repo and this package's extraction code."""
+    newest = 0.0
+    own = [Path(__file__), Path(pdf_text.__file__), Path(ocr_pool.__file__)]
+    for path in own + list(repo_path.rglob("*.py")):
+        if any(part in (".git", ".venv", "venv", "__pycache__") for part in path.parts):
+            continue
+        try:
+            newest = max(newest, path.stat().st_mtime)
+        except OSError:
+            continue
+    return newest
+
+
+def _outputs_for(pdf_path: Path) -> tuple[Path, Path]:
+    return pdf_path.with_name(f"{pdf_path.stem}-intake-details.json"), pdf_path.with_name(f"{pdf_path.stem}-intake-log.txt")
+
+
+def is_up_to_date(pdf_path: Path, code_mtime: float) -> bool:
+    """True when the PDF's JSON output exists and is newer than both the PDF and the extractor code."""
+    output_json, _ = _outputs_for(pdf_path)
+    try:
+        out_mtime = output_json.stat().st_mtime
+        return out_mtime >= pdf_path.stat().st_mtime and out_mtime >= code_mtime
+    except OSError:
+        return False
+
+
+def find_staged_pdfs(root: Path) -> list[Path]:
+    """Intake PDFs under root, e.g. a Processing/<timestamp>/{staging,processed} tree or one of its folders."""
+    return sorted(p for p in root.rglob("*.pdf") if p.is_file())
+
+
+def _print_progress(done: int, total: int, counts: dict[str, int], started: float) -> None:
+    width = 30
+    filled = int(width * done / total) if total else width
+    elapsed = time.monotonic() - started
+    eta = f"{elapsed / done * (total - done):.0f}s" if done else "?"
+    summary = " ".join(f"{k}={v}" for k, v in sorted(counts.items()) if v)
+    sys.stderr.write(f"\r[{'#' * filled}{'.' * (width - filled)}] {done}/{total} {summary} eta {eta}   ")
+    sys.stderr.flush()
+
+
+def run_batch(
+    root: Path,
+    workers: int = 0,
+    force: bool = False,
+    config_path: Path = Path("config/settings.ini"),
+    on_outcome: Optional[Callable[[Path, object], None]] = None,
+) -> int:
+    """Extract every intake PDF under root without a browser; returns the number of documents that failed.
+
+    Documents run concurrently, one supervised worker per slot (so a hung or crashing document costs only
+    its slot), with the per-page OCR pool off inside each worker since the documents already fill the
+    cores. Outputs are the same <patient_id>-intake-details.json / -intake-log.txt files next to each PDF.
+    on_outcome(pdf_path, outcome) is called for each extracted document (e.g. to update a run manifest).
+    With [extractor] isolate off there are no worker processes: documents run one at a time in this
+    process, each with the configured per-page OCR pool.
+    """
+    from automation.extract_supervisor import ExtractionSupervisor, record_outcome
+
+    settings = get_extractor_settings(config_path)
+    # Whole documents are the unit of parallelism here
+    doc_settings = dataclasses.replace(settings, ocr_workers=1)
+    slots = ocr_pool.resolve_workers(workers) if settings.isolate else 1
+    pdfs = find_staged_pdfs(root)
+    code_mtime = _newest_code_mtime(settings.repo_path)
+    todo = [p for p in pdfs if force or not is_up_to_date(p, code_mtime)]
+    print(f"Batch | {root} | pdfs={len(pdfs)} | up to date={len(pdfs) - len(todo)} | to extract={len(todo)} | workers={slots}")
+    if not todo:
+        return 0
+
+    idle: list[ExtractionSupervisor] = [
+        ExtractionSupervisor(settings.timeout_seconds, settings.memory_limit_mb) for _ in range(min(slots, len(todo)) if settings.isolate else 0)
+    ]
+    counts: dict[str, int] = {}
+    failures: list[str] = []
+
+    def _one(pdf_path: Path):
+        if not settings.isolate:
+            return pdf_path, _extract_in_process(pdf_path, *_outputs_for(pdf_path), settings=settings)
+        supervisor = idle.pop()
+        try:
+            output_json, log_file = _outputs_for(pdf_path)
+            return pdf_path, supervisor.run(pdf_path, output_json, log_file, settings=doc_settings)
+        finally:
+            idle.append(supervisor)
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=len(idle) or 1) as pool:
+            futures = [pool.submit(_one, p) for p in todo]
+            for done, fut in enumerate(as_completed(futures), start=1):
+                pdf_path, outcome = fut.result()
+                counts[outcome.status] = counts.get(outcome.status, 0) + 1
+                record_outcome(pdf_path.stem, pdf_path, outcome)
+                if on_outcome is not None:
+                    on_outcome(pdf_path, outcome)
+                if not outcome.ok:
+                    failures.append(f"{pdf_path}: {outcome.status} {outcome.detail}".rstrip())
+                _print_progress(done, len(todo), counts, started)
+    finally:
+        for supervisor in idle:
+            supervisor.close()
+    sys.stderr.write("\n")
+    for line in failures:
+        print(f"FAILED | {line}")
+    print(f"Batch done in {time.monotonic() - started:.0f}s | " + " | ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    return len(failures)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m automation.extraction", description="Offline intake extraction")
+    sub = parser.add_subparsers(dest="command", required=True)
+    batch = sub.add_parser("batch", help="Extract all intake PDFs under DIR (e.g. Processing or one run's staging/processed)")
+    batch.add_argument("dir", type=Path)
+    batch.add_argument("--workers", type=int, default=0, help="Documents extracted at once (default: one per core)")
+    batch.add_argument("--force", action="store_true", help="Re-extract even when the JSON output is up to date")
+    batch.add_argument("--config", type=Path, default=Path("config/settings.ini"))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not args.dir.is_dir():
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Not a directory: {args.dir}")
+        return 2
+    failed = run_batch(args.dir, workers=args.workers, force=args.force, config_path=args.config)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
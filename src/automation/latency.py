@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from automation.deadline import Deadline, clamp_timeout
+from automation.state import load_json, save_json_atomic
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LatencyStore:
+    """Observed durations of named wait sites, persisted across runs, used to derive adaptive timeouts.
+
+    A site's timeout is its recent p99 times a factor plus a fixed margin, never above the site's
+    hard-coded ceiling and never below floor_seconds. Until min_samples successes have been seen the
+    ceiling is used unchanged. Only successful waits are recorded. So the estimate can grow back on slow
+    days, every retry_every-th wait per site that runs out its learned timeout keeps waiting up to the
+    ceiling, and a success there is recorded; the other timeouts still fail fast.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        window: int = 200,
+        min_samples: int = 20,
+        factor: float = 1.5,
+        margin_seconds: float = 1.0,
+        floor_seconds: float = 2.0,
+        enabled: bool = True,
+        retry_every: int = 5,
+    ):
+        self.path = path
+        self.enabled = enabled
+        self.window = window
+        self.min_samples = min_samples
+        self.factor = factor
+        self.margin_seconds = margin_seconds
+        self.floor_seconds = floor_seconds
+        self.retry_every = retry_every
+        self.samples: dict[str, list[float]] = {}
+        self._timeouts: dict[str, int] = {}
+        self._dirty = False
+        if path is not None:
+            raw = load_json(path, default={}) or {}
+            for name, values in (raw.get("samples") or {}).items():
+                try:
+                    self.samples[name] = [float(v) for v in values][-window:]
+                except Exception:
+                    continue
+
+    def record(self, name: str, seconds: float) -> None:
+        values = self.samples.setdefault(name, [])
+        values.append(round(float(seconds), 3))
+        if len(values) > self.window:
+            del values[: len(values) - self.window]
+        self._dirty = True
+
+    def note_timeout(self, name: str) -> bool:
+        """Count a wait that ran out its learned timeout; True when this one should continue to the ceiling."""
+        count = self._timeouts.get(name, 0) + 1
+        self._timeouts[name] = count
+        return self.retry_every > 0 and count % self.retry_every == 0
+
+    def p99(self, name: str) -> Optional[float]:
+        values = self.samples.get(name) or []
+        if len(values) < self.min_samples:
+            return None
+        ordered = sorted(values)
+        return ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)]
+
+    def timeout(self, name: str, ceiling: float) -> float:
+        if not self.enabled:
+            return ceiling
+        p = self.p99(name)
+        if p is None:
+            return ceiling
+        return min(ceiling, max(self.floor_seconds, p * self.factor + self.margin_seconds))
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        try:
+            save_json_atomic(self.path, {"samples": self.samples})
+            self._dirty = False
+        except Exception:
+            LOGGER.warning("Failed to persist latency store to %s", self.path, exc_info=True)
+
+
+# Process-wide store; in-memory until configure_latency_store() points it at a file
+_STORE = LatencyStore()
+
+
+def configure_latency_store(path: Optional[Path], **kwargs: Any) -> LatencyStore:
+    global _STORE
+    _STORE = LatencyStore(path, **kwargs)
+    return _STORE
+
+
+def get_latency_store() -> LatencyStore:
+    return _STORE
+
+
+def adaptive_timeout(name: str, ceiling: float) -> float:
+    """Timeout for the named wait site: learned from recent p99, capped by ceiling."""
+    return _STORE.timeout(name, ceiling)
+
+
+def record_latency(name: str, seconds: float) -> None:
+    _STORE.record(name, seconds)
+
+
+def note_wait_timeout(name: str) -> bool:
+    return _STORE.note_timeout(name)
+
+
+def save_latency_store() -> None:
+    _STORE.save()
+
+
+def timed_wait(
+    driver: WebDriver,
+    name: str,
+    ceiling: float,
+    condition: Callable[[WebDriver], Any],
+    deadline: Optional[Deadline] = None,
+) -> Any:
+    """WebDriverWait(...).until(condition) with an adaptive timeout; records the duration on success.
+
+    The timeout is also limited by deadline's remaining budget. When the learned timeout runs out, the
+    wait normally fails right away; every retry_every-th such timeout of the site continues for the rest
+    of the ceiling instead, so a slower success gets recorded and the learned timeout can grow again.
+    Raises TimeoutException like WebDriverWait when the condition isn't met in time.
+    """
+    start = time.monotonic()
+    learned = adaptive_timeout(name, ceiling)
+    try:
+        result = WebDriverWait(driver, clamp_timeout(learned, deadline)).until(condition)
+    except TimeoutException:
+        rest = ceiling - (time.monotonic() - start)
+        if learned >= ceiling or rest <= 0 or (deadline is not None and deadline.expired) or not note_wait_timeout(name):
+            raise
+        LOGGER.info("Wait %s outlived its learned timeout (%.1fs); retrying up to the %.0fs ceiling.", name, learned, ceiling)
+        result = WebDriverWait(driver, clamp_timeout(rest, deadline)).until(condition)
+    record_latency(name, time.monotonic() - start)
+    return result
@@ -12,6 +12,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import TimeoutException
 
+from automation.session_store import SessionStore
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -44,10 +46,18 @@ class LoginSelectors:
 
 
 class LoginAutomation:
-    def __init__(self, driver: WebDriver, base_url: str, selectors: LoginSelectors, timeout: int = 20):
+    def __init__(
+        self,
+        driver: WebDriver,
+        base_url: str,
+        selectors: LoginSelectors,
+        timeout: int = 20,
+        session_store: Optional[SessionStore] = None,
+    ):
         self.driver = driver
         self.base_url = base_url
         self.selectors = selectors
+        self.session_store = session_store
         self.wait = WebDriverWait(driver, timeout)
         self.short_wait = WebDriverWait(driver, 3)
 
@@ -88,7 +98,45 @@ class LoginAutomation:
         except Exception:
             return False
 
+    def _login_from_store(self, username: str) -> bool:
+        """Restore stored cookies/localStorage and verify with the post-login indicator.
+
+        Waits (full timeout) for either the post-login indicator or the login form. Only the login form
+        coming up means the server rejected the session, and only then is it cleared; a slow page that
+        shows neither falls back to the login form with the stored session kept for the next run.
+        """
+        if not self.session_store or not self.selectors.post_login_check:
+            return False
+        try:
+            if not self.session_store.restore(self.driver, username, self.base_url):
+                return False
+            self.driver.get(self.base_url)
+            logged_in = EC.presence_of_element_located((self.selectors.post_login_check.by(), self.selectors.post_login_check.value))
+            rejected = [EC.presence_of_element_located((self.selectors.username.by(), self.selectors.username.value))]
+            if self.selectors.login_iframe:
+                rejected.append(EC.presence_of_element_located((self.selectors.login_iframe.by(), self.selectors.login_iframe.value)))
+            try:
+                self.wait.until(EC.any_of(logged_in, *rejected))
+            except TimeoutException:
+                LOGGER.info("Stored session not confirmed in time; falling back to full login (session kept).")
+                return False
+            if self.is_logged_in():
+                LOGGER.info("Logged in from stored session; skipping credential entry.")
+                return True
+            LOGGER.info("Stored session no longer valid; falling back to full login.")
+            self.session_store.clear(username, self.base_url)
+        except Exception:
+            LOGGER.debug("Stored session restore failed; falling back to full login.", exc_info=True)
+        return False
+
+    def _save_session(self, username: str) -> None:
+        if self.session_store:
+            self.session_store.save(self.driver, username, self.base_url)
+
     def login(self, username: str, password: str) -> None:
+        if self._login_from_store(username):
+            return
+
         LOGGER.info("Opening %s", self.base_url)
         self.driver.get(self.base_url)
 
@@ -123,6 +171,7 @@ class LoginAutomation:
             LOGGER.debug("Login form detected; proceeding with credential entry.")
         elif self.is_logged_in():
             LOGGER.info("Already logged in; skipping credential entry.")
+            self._save_session(username)
             return
         else:
             LOGGER.debug("Login form not detected yet; continuing and waiting for fields.")
@@ -179,6 +228,7 @@ class LoginAutomation:
                     )
                 )
                 LOGGER.info("Login appears successful.")
+                self._save_session(username)
             except TimeoutException:
                 LOGGER.warning(
                     "Post-login indicator not found within timeout. Verify selectors or try non-headless to inspect."
@@ -44,24 +44,27 @@ def build_preventive_care_summary(intake_json):
         return "No preventive care details found."
     return "\n".join(lines)
 
-def populate_preventive_care(driver, summary_text, timeout=15):
+def populate_preventive_care(driver, summary_text, timeout=15, deadline=None):
     from automation.ui_selectors import UI_SELECTORS
-    return populate_section_generic(driver, summary_text, "preventive_care", timeout)
+    return populate_section_generic(driver, summary_text, "preventive_care", timeout, deadline=deadline)
 
-def process_preventive_care_if_female(driver, intake_json, timeout=15):
+def process_preventive_care_if_female(driver, intake_json, timeout=15, deadline=None):
     """
     If global GENDER_IS_FEMALE is True, extract and populate preventive care summary.
+    Returns whether it was written, or None when there was nothing to write (not female, empty summary).
     """
     global GENDER_IS_FEMALE
     if GENDER_IS_FEMALE:
         summary = build_preventive_care_summary(intake_json)
         print(f"[PREVENTIVE] Summary for female patient: {summary}")
-        filled = False
-        if summary:
-            filled = populate_preventive_care(driver, summary, timeout)
+        if not summary:
+            print("[PREVENTIVE] UI action: Failure")
+            return None
+        filled = populate_preventive_care(driver, summary, timeout, deadline=deadline)
         print(f"[PREVENTIVE] UI action: {'Success' if filled else 'Failure'}")
-    else:
-        print("[PREVENTIVE] Skipped: Not a female patient.")
+        return bool(filled)
+    print("[PREVENTIVE] Skipped: Not a female patient.")
+    return None
 import json
 from pathlib import Path
 
@@ -108,17 +111,17 @@ def set_global_gender_flag(intake_json):
     global GENDER_IS_FEMALE
     gender = detect_gender_from_intake(intake_json)
     GENDER_IS_FEMALE = (gender == "Female")
-def _populate_family_history(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "family_history", timeout)
+def _populate_family_history(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "family_history", timeout, deadline=deadline)
 
-def _populate_social_history(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "social_history", timeout)
+def _populate_social_history(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "social_history", timeout, deadline=deadline)
 
-def _populate_major_events(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "major_events", timeout)
+def _populate_major_events(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "major_events", timeout, deadline=deadline)
 
-def _populate_ongoing_medical_problems(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout)
+def _populate_ongoing_medical_problems(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout, deadline=deadline)
 
 def _build_family_history_summary(intake_json):
     import json
@@ -517,9 +520,9 @@ def _build_nutrition_history_summary(intake_json: Path) -> str:
     lines.extend(qa_lines)
     return "\n".join(lines).strip()
 
-def _populate_nutrition_history(driver, summary_text, timeout=15) -> bool:
+def _populate_nutrition_history(driver, summary_text, timeout=15, deadline=None) -> bool:
     """Open nutrition history editor, populate textarea, and save."""
-    return populate_section_generic(driver, summary_text, "nutrition_history", timeout, debug_capture=_capture_nutrition_debug)
+    return populate_section_generic(driver, summary_text, "nutrition_history", timeout, debug_capture=_capture_nutrition_debug, deadline=deadline)
 
 def _capture_nutrition_debug(driver, reason: str):
     """Capture screenshot and page source for nutrition history debug."""
@@ -568,8 +571,8 @@ def _build_ongoing_medical_problems_summary(intake_json: Path) -> str:
         return "Ticked Problems: " + ", ".join(ticked_labels)
     return ""
 
-def _populate_ongoing_medical_problems(driver: WebDriver, summary_text: str, timeout: int = 15) -> bool:
-    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout)
+def _populate_ongoing_medical_problems(driver: WebDriver, summary_text: str, timeout: int = 15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout, deadline=deadline)
 
 # --- Major Events Summary Helper ---
 def _build_major_events_summary(intake_json: Path) -> str:
@@ -653,17 +656,29 @@ def _build_major_events_summary(intake_json: Path) -> str:
         lines.append(f"{q}: {a}")
     return "\n".join(lines)
 
-def _populate_major_events(driver: WebDriver, summary_text: str, timeout: int = 15) -> bool:
-    return populate_section_generic(driver, summary_text, "major_events", timeout)
+def _populate_major_events(driver: WebDriver, summary_text: str, timeout: int = 15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "major_events", timeout, deadline=deadline)
 
 import logging
-from typing import Optional, List, Dict
+import re
+from datetime import date, timedelta
+from typing import Any, Optional, List, Dict
 import time
 import os
 import shutil
 from pathlib import Path
 import json
-from automation.extraction import run_intake_extractor
+from automation.api import download_document, find_intake_document, get_api_settings
+from automation.browser import collect_network_stats, reapply_request_blocking
+from automation.catalog import get_catalog
+from automation.circuit import get_breaker_board
+from automation.deadline import Deadline, clamp_timeout, facility_deadline, get_budget_settings, patient_deadline
+from automation.extraction import extract_intake
+from automation.extract_supervisor import record_outcome
+from automation.latency import adaptive_timeout, note_wait_timeout, record_latency, save_latency_store, timed_wait
+from automation.run_manifest import ALL, EXTRACT, HARVEST, OK, POPULATE, get_run_manifest
+from automation.state import default_state_dir, load_json, save_json_atomic
+from automation.view_state import SCHEDULE, SUMMARY, TIMELINE, set_view, view_state
 
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
@@ -676,8 +691,25 @@ from selenium.webdriver.common.keys import Keys
 LOGGER = logging.getLogger(__name__)
 
 
-def click_schedule(driver: WebDriver, timeout: int = 30) -> None:
-    """Click the Schedule item after login (element id='ember43')."""
+def _schedule_view_active(driver: WebDriver) -> bool:
+    """Tracked view is the scheduler and its toolbar is on the page (one lookup, no wait)."""
+    if view_state(driver).view != SCHEDULE:
+        return False
+    try:
+        return bool(driver.find_elements(By.CSS_SELECTOR, UI_SELECTORS["date_picker"]["button"]))
+    except Exception:
+        return False
+
+
+def click_schedule(driver: WebDriver, timeout: int = 30, force: bool = False) -> None:
+    """Click the Schedule item after login (element id='ember43').
+
+    Skipped when the scheduler is already showing (see _schedule_view_active) unless force=True, e.g. to
+    reload server-side changes.
+    """
+    if not force and _schedule_view_active(driver):
+        LOGGER.info("Already on 'Schedule'; skipping click.")
+        return
     def _wait_for_idle(max_wait: int = timeout) -> None:
         wait_idle = WebDriverWait(driver, max_wait)
         # Common overlay/spinner selectors to wait to disappear
@@ -707,6 +739,7 @@ def click_schedule(driver: WebDriver, timeout: int = 30) -> None:
         LOGGER.info("Clicked on 'Schedule' (id=ember43).")
         # Wait for potential loading spinner after navigation
         _wait_for_idle()
+        set_view(driver, SCHEDULE)
     except TimeoutException:
         LOGGER.warning("'Schedule' (id=ember43) not found/clickable within %ss; skipping.", timeout)
     except Exception:
@@ -796,14 +829,227 @@ def ensure_filter_button_checked(driver: WebDriver, timeout: int = 20) -> None:
         LOGGER.debug("Error while ensuring Filter button checked.", exc_info=True)
 
 
+_DATE_FORMATS = (
+    "%m/%d/%Y",
+    "%Y-%m-%d",
+    "%a, %b %d, %Y",
+    "%A, %B %d, %Y",
+    "%a %b %d, %Y",
+    "%A %B %d, %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%a %m/%d/%Y",
+    "%m/%d/%y",
+)
+
+
+def _parse_display_date(text: str) -> Optional[date]:
+    """Parse a date shown in the scheduler toolbar (several common US formats)."""
+    t = " ".join((text or "").replace("\u00a0", " ").split())
+    if not t:
+        return None
+    candidates = [t]
+    # Also try date-looking substrings (labels often carry extra words like "Today")
+    candidates += re.findall(r"\d{1,2}/\d{1,2}/\d{2,4}|\d{4}-\d{2}-\d{2}", t)
+    candidates += re.findall(r"(?:[A-Za-z]+,?\s+)?[A-Za-z]{3,9}\.?\s+\d{1,2},\s+\d{4}", t)
+    for cand in candidates:
+        cand = cand.replace(".", "").strip()
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(cand, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _read_datepicker_date(driver: WebDriver) -> Optional[date]:
+    """Return the date currently shown by the date picker button, or None when it can't be parsed."""
+    try:
+        sel = (UI_SELECTORS.get("date_picker") or {}).get("button", "#date-picker-button")
+        els = driver.find_elements(By.CSS_SELECTOR, sel)
+        if not els:
+            return None
+        el = els[0]
+        for source in (el.text, el.get_attribute("aria-label"), el.get_attribute("title"), el.get_attribute("data-date")):
+            parsed = _parse_display_date(source or "")
+            if parsed:
+                return parsed
+    except Exception:
+        LOGGER.debug("Could not read date picker date.", exc_info=True)
+    return None
+
+
+def _format_like(sample: str, target: date) -> str:
+    """Format target using the same format as an existing input value; defaults to MM/DD/YYYY."""
+    s = (sample or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            datetime.strptime(s, fmt)
+            return target.strftime(fmt)
+        except ValueError:
+            continue
+    return target.strftime("%m/%d/%Y")
+
+
+def _jump_via_route(driver: WebDriver, target: date) -> bool:
+    """If the scheduler route carries a date, rewrite it and load the route once."""
+    try:
+        url = driver.current_url or ""
+    except Exception:
+        return False
+    if not re.search(r"\d{4}-\d{2}-\d{2}", url):
+        return False
+    new_url = re.sub(r"\d{4}-\d{2}-\d{2}", target.isoformat(), url, count=1)
+    if new_url == url:
+        return False
+    driver.get(new_url)
+    return True
+
+
+def _jump_via_input(driver: WebDriver, target: date) -> bool:
+    """Open the picker and type the target date into its input, if it has one."""
+    sel = UI_SELECTORS.get("date_picker") or {}
+    try:
+        btn = driver.find_element(By.CSS_SELECTOR, sel.get("button", "#date-picker-button"))
+        driver.execute_script("arguments[0].click();", btn)
+    except Exception:
+        return False
+    inputs = []
+    try:
+        WebDriverWait(driver, 2).until(lambda d: d.find_elements(By.CSS_SELECTOR, sel.get("input", "input[type='date']")))
+        inputs = [e for e in driver.find_elements(By.CSS_SELECTOR, sel.get("input", "input[type='date']")) if e.is_displayed()]
+    except Exception:
+        inputs = []
+    if not inputs:
+        return False
+    field = inputs[0]
+    try:
+        if (field.get_attribute("type") or "").lower() == "date":
+            value = target.isoformat()
+        else:
+            value = _format_like(field.get_attribute("value") or "", target)
+        # Set value and notify the framework in one round trip, then commit with Enter
+        driver.execute_script(
+            "arguments[0].value = arguments[1];"
+            "arguments[0].dispatchEvent(new Event('input', { bubbles: true }));"
+            "arguments[0].dispatchEvent(new Event('change', { bubbles: true }));",
+            field,
+            value,
+        )
+        field.send_keys(Keys.ENTER)
+        return True
+    except Exception:
+        LOGGER.debug("Setting date picker input failed.", exc_info=True)
+        return False
+
+
+def _jump_via_calendar(driver: WebDriver, target: date, max_months: int = 24) -> bool:
+    """Open the picker and click the target day cell, paging months inside the popover if needed.
+
+    Month paging only changes the popover; the schedule reloads once, when the day is clicked.
+    """
+    sel = UI_SELECTORS.get("date_picker") or {}
+    cells_css = sel.get("day_cells", "[data-date]")
+    labels = {
+        target.isoformat(),
+        target.strftime("%m/%d/%Y"),
+        target.strftime("%B %d, %Y").replace(" 0", " "),
+        target.strftime("%A, %B %d, %Y").replace(" 0", " "),
+    }
+    find_cell_js = """
+        var cells = document.querySelectorAll(arguments[0]);
+        var labels = arguments[1];
+        for (var i = 0; i < cells.length; i++) {
+            var c = cells[i];
+            if (!(c.offsetWidth || c.offsetHeight)) continue;
+            var v = [c.getAttribute('data-date'), c.getAttribute('aria-label'), c.getAttribute('title')];
+            for (var j = 0; j < v.length; j++) {
+                if (!v[j]) continue;
+                for (var k = 0; k < labels.length; k++) {
+                    if (v[j] === labels[k] || v[j].indexOf(labels[k]) === 0) return c;
+                }
+            }
+        }
+        return null;
+    """
+    try:
+        btn = driver.find_element(By.CSS_SELECTOR, sel.get("button", "#date-picker-button"))
+        if not driver.find_elements(By.CSS_SELECTOR, cells_css):
+            driver.execute_script("arguments[0].click();", btn)
+            WebDriverWait(driver, 2).until(lambda d: d.find_elements(By.CSS_SELECTOR, cells_css))
+    except Exception:
+        return False
+    current = _read_datepicker_date(driver) or date.today()
+    month_css = sel.get("prev_month") if target < current else sel.get("next_month")
+    for _ in range(max_months + 1):
+        try:
+            cell = driver.execute_script(find_cell_js, cells_css, sorted(labels))
+        except Exception:
+            cell = None
+        if cell is not None:
+            try:
+                driver.execute_script("arguments[0].click();", cell)
+                return True
+            except Exception:
+                return False
+        try:
+            nav = driver.find_element(By.CSS_SELECTOR, month_css) if month_css else None
+        except Exception:
+            nav = None
+        if nav is None:
+            return False
+        try:
+            driver.execute_script("arguments[0].click();", nav)
+        except Exception:
+            return False
+    return False
+
+
+def select_date_in_datepicker(driver: WebDriver, target: date, timeout: int = 30) -> bool:
+    """Jump the scheduler straight to target (route, picker input, or calendar cell) with a single confirm wait.
+
+    Returns True once the date picker button shows target; False if no direct strategy worked
+    (callers fall back to the day-step buttons).
+    """
+    current = _read_datepicker_date(driver)
+    if current is None:
+        LOGGER.info("Date picker date not readable; direct date jump unavailable.")
+        return False
+    if current == target:
+        LOGGER.info("Date picker already on %s; no action needed.", target.isoformat())
+        view_state(driver).date = target.isoformat()
+        return True
+    for method, strategy in (("route", _jump_via_route), ("input", _jump_via_input), ("calendar", _jump_via_calendar)):
+        try:
+            if not strategy(driver, target):
+                continue
+            WebDriverWait(driver, min(timeout, 8)).until(lambda d: _read_datepicker_date(d) == target)
+        except Exception:
+            LOGGER.debug("Date jump via %s did not land on %s.", method, target.isoformat(), exc_info=True)
+            try:
+                driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+            except Exception:
+                pass
+            continue
+        _wait_for_data_load(driver, timeout=timeout)
+        view_state(driver).date = target.isoformat()
+        LOGGER.info("Date jump | from=%s | to=%s | method=%s", current.isoformat(), target.isoformat(), method)
+        return True
+    return False
+
+
 def select_relative_date_in_datepicker(driver: WebDriver, offset_days: int = -1, timeout: int = 30) -> None:
-    """Shift the date by clicking the two day-nav buttons adjacent to the date picker.
+    """Shift the date shown by the scheduler by offset_days.
 
-    offset_days: 0=today, -1=yesterday, 1=tomorrow, etc.
-    Ensures we target the buttons right next to the date picker to avoid other .btn-sm on the page.
+    offset_days: 0=today, -1=yesterday, 1=tomorrow, etc. (relative to the date currently shown).
+    Jumps directly to the target date when possible (see select_date_in_datepicker); otherwise clicks the
+    two day-nav buttons adjacent to the date picker, targeting the buttons right next to it to avoid
+    other .btn-sm on the page.
     """
     if offset_days == 0:
         LOGGER.info("Date shift offset is 0; no action needed.")
+        shown = _read_datepicker_date(driver)
+        view_state(driver).date = shown.isoformat() if shown else date.today().isoformat()
         return
 
     wait = WebDriverWait(driver, timeout)
@@ -831,6 +1077,14 @@ def select_relative_date_in_datepicker(driver: WebDriver, offset_days: int = -1,
         except Exception:
             pass
 
+        # Prefer a direct jump: one schedule load instead of one per day
+        current = _read_datepicker_date(driver)
+        if current is not None:
+            if select_date_in_datepicker(driver, current + timedelta(days=offset_days), timeout=timeout):
+                return
+            LOGGER.info("Direct date jump failed; falling back to day-step buttons.")
+            date_btn = wait.until(EC.presence_of_element_located((By.ID, "date-picker-button")))
+
         def resolve_adjacent_buttons() -> tuple[Optional[WebElement], Optional[WebElement]]:
             """Get strictly-adjacent prev/next sibling buttons to the date picker button.
 
@@ -1003,7 +1257,10 @@ def select_relative_date_in_datepicker(driver: WebDriver, offset_days: int = -1,
             pass
         if last_err:
             LOGGER.debug("Date shift completed with last error: %s", repr(last_err))
-        LOGGER.info("Date shift complete | offset=%s | attempted steps=%s", offset_days, steps)
+        # Record the day the picker actually shows (None if unreadable), not the day the steps aimed for
+        shown = _read_datepicker_date(driver)
+        view_state(driver).date = shown.isoformat() if shown else None
+        LOGGER.info("Date shift complete | offset=%s | attempted steps=%s | shown=%s", offset_days, steps, view_state(driver).date)
     except TimeoutException:
         LOGGER.warning("Date picker button (id=date-picker-button) not present within %ss; skipping date shift.", timeout)
     except Exception:
@@ -1059,7 +1316,7 @@ def print_patient_links_from_table(driver: WebDriver, timeout: int = 6) -> list[
 
             try:
                 # Use a short timeout on pendingdocuments so we can fall back quickly
-                clicked = _click_first_intake_document_type(driver, timeout=4)
+                clicked = _click_first_intake_document_type(driver, timeout=4, name="intake.pending")
     - href must contain "/PF/charts/patients/"
     - route must end with "summary" (supports SPA hash routes; ignores query and trailing slash)
 
@@ -1119,9 +1376,16 @@ def print_patient_links_from_table(driver: WebDriver, timeout: int = 6) -> list[
         return []
 
 
-def _wait_for_data_load(driver: WebDriver, timeout: int = 30) -> None:
-    """Wait for common spinners/overlays to disappear after date selection."""
-    wait_idle = WebDriverWait(driver, timeout)
+def _wait_for_data_load(driver: WebDriver, timeout: int = 30, name: str = "data_load", deadline: Optional[Deadline] = None) -> None:
+    """Wait for common spinners/overlays to disappear after date selection.
+
+    name identifies the wait site for adaptive timeouts: timeout is the ceiling, the effective timeout is
+    learned from this site's recent latencies and limited by deadline's remaining budget. As in
+    timed_wait, an occasional wait that runs out the learned timeout keeps going up to the ceiling, so
+    the learned value can grow back.
+    """
+    site = f"idle.{name}"
+    start = time.monotonic()
     overlay_selectors = [
         ".spinner-overlay.is-active",
         ".spinner-overlay",
@@ -1129,11 +1393,62 @@ def _wait_for_data_load(driver: WebDriver, timeout: int = 30) -> None:
         ".busy",
         ".pf-spinner",
     ]
-    for sel in overlay_selectors:
+
+    def wait_idle(seconds: float) -> bool:
+        waiter = WebDriverWait(driver, seconds)
+        idle = True
+        for sel in overlay_selectors:
+            try:
+                waiter.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, sel)))
+            except Exception:
+                idle = False
+        return idle
+
+    learned = adaptive_timeout(site, timeout)
+    idle = wait_idle(clamp_timeout(learned, deadline))
+    if not idle:
+        rest = timeout - (time.monotonic() - start)
+        if learned < timeout and rest > 0 and not (deadline is not None and deadline.expired) and note_wait_timeout(site):
+            LOGGER.info("Wait %s outlived its learned timeout (%.1fs); retrying up to the %.0fs ceiling.", site, learned, timeout)
+            idle = wait_idle(clamp_timeout(rest, deadline))
+    if idle:
+        record_latency(site, time.monotonic() - start)
+
+
+# _open_page names -> tracked view
+_PAGE_VIEWS = {"timeline": TIMELINE, "signed": TIMELINE, "summary": SUMMARY}
+
+# Any patient summary section the populate step needs; the summary page is usable once one renders
+_SUMMARY_READY_CSS = ", ".join(
+    v["section_container"] for v in UI_SELECTORS.values() if isinstance(v, dict) and v.get("section_container")
+)
+
+
+def _open_page(
+    driver: WebDriver,
+    url: str,
+    ready_css: Optional[str] = None,
+    timeout: int = 30,
+    name: str = "page",
+    deadline: Optional[Deadline] = None,
+) -> bool:
+    """Navigate and gate on explicit readiness instead of the page's load event.
+
+    With an eager/none page-load strategy driver.get returns before late resources finish, and spinners
+    may not be attached yet, so the element the next step needs (ready_css) is awaited first, then the
+    usual spinner wait. Returns False when ready_css didn't appear within timeout.
+    """
+    driver.get(url)
+    set_view(driver, _PAGE_VIEWS.get(name))
+    ready = True
+    if ready_css:
         try:
-            wait_idle.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, sel)))
-        except Exception:
-            pass
+            timed_wait(driver, f"ready.{name}", timeout, EC.presence_of_element_located((By.CSS_SELECTOR, ready_css)), deadline=deadline)
+        except TimeoutException:
+            ready = False
+            LOGGER.info("Readiness gate not met for %s", url)
+    _wait_for_data_load(driver, timeout=timeout, name=name, deadline=deadline)
+    return ready
 
 
 def _to_timeline_url(href: str) -> str:
@@ -1157,7 +1472,17 @@ def navigate_after_login(
     staging_dir: Optional[Path] = None,
     skip_click_schedule: bool = False,
     skip_tabs_and_date: bool = False,
+    processed_patients: Optional[set[str]] = None,
 ) -> None:
+    """Collect the appointments table's patient links and run the per-patient flow for each.
+
+    processed_patients: optional set shared across calls (e.g. a multi-day backfill); patients already
+    in it are skipped, and a patient id is added once its flow succeeded, so a failed patient is tried
+    again when it turns up later in the run.
+
+    Patients share the facility time budget ([run] facility_budget_seconds); once it is spent the
+    remaining patients are skipped and reported.
+    """
     # Always attempt to click the 'Schedule' item once we believe we're logged in (unless already on it)
     if not skip_click_schedule:
         click_schedule(driver)
@@ -1185,218 +1510,703 @@ def navigate_after_login(
         print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [INFO] Patient IDs:")
         for pid in patient_ids:
             print(f"  {pid}")
+        facility_budget = facility_deadline(label="facility")
         for idx, href in enumerate(links, start=1):
             patient_id = _extract_patient_id(href)
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PATIENT] {patient_id} | Start flow [{idx}/{len(links)}]")
-            timeline_href = _to_timeline_url(href)
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Opened timeline link: {timeline_href}")
-            driver.get(timeline_href)
-            _wait_for_data_load(driver, timeout=30)
-
-            # Try pending view first
-            found_in = None
-            clicked = False
-            try:
-                clicked = _click_first_intake_document_type(driver, timeout=4)
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Intake document link clicked in pending: {'Success' if clicked else 'Failure'}")
-                dest_pdf = None
-                if clicked:
-                    try:
-                        dest_pdf = _download_intake_document_if_available(driver, timeout=15, staging_dir=staging_dir, patient_id=patient_id)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Downloaded intake PDF: {'Success' if dest_pdf else 'Failure'}")
-                        if dest_pdf and patient_id and staging_dir:
-                            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [STAGING] {patient_id} | PDF moved to staging: {dest_pdf}")
-                            output_json = staging_dir / f"{patient_id}-intake-details.json"
-                            log_file = staging_dir / f"{patient_id}-intake-log.txt"
-                            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | Starting PDF parser...")
-                            parser_success = run_intake_extractor(dest_pdf, output_json, log_file)
-                            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | PDF parser finished: {'Success' if parser_success else 'Failure'}")
-                        found_in = "pending"
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Download error: {e}")
-                else:
-                    # Try signed view if not found in pending
-                    found_in = "signed"
-                    signed_href = _to_timeline_url_with_view(href, 'signeddocuments')
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Tried signed documents view: {signed_href}")
-                    driver.get(signed_href)
-                    _wait_for_data_load(driver, timeout=30)
-                    try:
-                        clicked2 = _click_first_intake_document_type(driver, timeout=20)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Intake document link clicked in signed: {'Success' if clicked2 else 'Failure'}")
-                        dest_pdf = None
-                        if clicked2:
-                            try:
-                                dest_pdf = _download_intake_document_if_available(driver, timeout=15, staging_dir=staging_dir, patient_id=patient_id)
-                                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Downloaded intake PDF (signed): {'Success' if dest_pdf else 'Failure'}")
-                                if dest_pdf and patient_id and staging_dir:
-                                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [STAGING] {patient_id} | PDF moved to staging (signed): {dest_pdf}")
-                                    output_json = staging_dir / f"{patient_id}-intake-details.json"
-                                    log_file = staging_dir / f"{patient_id}-intake-log.txt"
-                                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | Starting PDF parser (signed)...")
-                                    parser_success = run_intake_extractor(dest_pdf, output_json, log_file)
-                                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | PDF parser finished (signed): {'Success' if parser_success else 'Failure'}")
-                            except Exception as e:
-                                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Download error (signed): {e}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Signed view download error: {e}")
-            except Exception as e:
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Intake document navigation error: {e}")
+            if facility_budget.expired:
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SKIP] {len(links) - idx + 1} patient(s) from {patient_id} on | Facility time budget exhausted")
+                break
+            if processed_patients is not None and patient_id in processed_patients:
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SKIP] {patient_id} | Already processed in this run [{idx}/{len(links)}]")
+                continue
+            next_href = next(
+                (h for h in links[idx:] if processed_patients is None or _extract_patient_id(h) not in processed_patients),
+                None,
+            )
+            done = _process_patient(driver, href, idx, len(links), staging_dir=staging_dir, facility_budget=facility_budget, next_href=next_href)
+            if done and processed_patients is not None and patient_id:
+                processed_patients.add(patient_id)
+        _discard_prefetched_timeline(driver)
 
-            # Return to summary page and dismiss popups
-            if href:
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Returned to summary page: {href}")
-                driver.get(href)
-                _wait_for_data_load(driver, timeout=30)
-                try:
-                    dismissed = _dismiss_any_popups(driver)
-                    if dismissed:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Dismissed {dismissed} popup/modal(s) on summary load.")
-                except Exception as e:
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Popup dismiss error: {e}")
-
-            # Intake JSON summary extraction
-            if staging_dir and patient_id:
-                intake_json = staging_dir / f"{patient_id}-intake-details.json"
-                if not intake_json.exists():
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Intake JSON does not exist: {intake_json}")
-                else:
-                    # Family History
-                    try:
-                        fam_text = _build_family_history_summary(intake_json)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Family History summary: {fam_text}")
-                        fam_filled = False
-                        if fam_text:
-                            fam_filled = _populate_family_history(driver, fam_text)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Family History UI action: {'Success' if fam_filled else 'Failure'}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Family History: {e}")
-                    # Social History
-                    try:
-                        soc_text = _build_social_history_summary(intake_json)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Social History summary: {soc_text}")
-                        soc_filled = False
-                        if soc_text:
-                            soc_filled = _populate_social_history(driver, soc_text)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Social History UI action: {'Success' if soc_filled else 'Failure'}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Social History: {e}")
-                    # Ongoing Medical Problems
-                    try:
-                        ongoing_text = _build_ongoing_medical_problems_summary(intake_json)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Ongoing Medical Problems summary: {ongoing_text}")
-                        ongoing_filled = False
-                        if ongoing_text:
-                            ongoing_filled = _populate_ongoing_medical_problems(driver, ongoing_text)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Ongoing Medical Problems UI action: {'Success' if ongoing_filled else 'Failure'}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Ongoing Medical Problems: {e}")
-                    # Major Events
-                    try:
-                        major_text = _build_major_events_summary(intake_json)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Major Events summary: {major_text}")
-                        major_filled = False
-                        if major_text:
-                            major_filled = _populate_major_events(driver, major_text)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Major Events UI action: {'Success' if major_filled else 'Failure'}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Major Events: {e}")
-                    # Nutrition History
-                    try:
-                        nutrition_text = _build_nutrition_history_summary(intake_json)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Nutrition History summary: {nutrition_text}")
-                        nutrition_filled = False
-                        if nutrition_text:
-                            nutrition_filled = _populate_nutrition_history(driver, nutrition_text)
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Nutrition History UI action: {'Success' if nutrition_filled else 'Failure'}")
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Nutrition History: {e}")
 
-                    # Preventive Care (Female only)
-                    try:
-                        from automation.navigation import set_global_gender_flag, process_preventive_care_if_female
-                        set_global_gender_flag(intake_json)
-                        process_preventive_care_if_female(driver, intake_json, timeout=15)
-                    except Exception as e:
-                        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Preventive Care: {e}")
+# Background-tab prefetch of the next patient's timeline ([run] prefetch_next_timeline)
+_PREFETCH_TIMELINE = False
 
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [END] End patient loop idx={idx}, patient_id={patient_id}")
 
-            # Move all files for this patient from staging to processed using patient id wildcard
-            import shutil
-            if staging_dir and patient_id:
-                processed_dir = staging_dir.parent / "processed"
-                processed_dir.mkdir(exist_ok=True)
-                for file in staging_dir.glob(f"{patient_id}*"):
-                    if file.is_file():
-                        shutil.move(str(file), str(processed_dir / file.name))
+def configure_timeline_prefetch(enabled: bool) -> None:
+    global _PREFETCH_TIMELINE
+    _PREFETCH_TIMELINE = bool(enabled)
 
 
-# --- Facility (Hormone Center) helpers ---
-def _open_facility_dropdown(driver: WebDriver, timeout: int = 10) -> bool:
-    """Open the scheduler toolbar's facility dropdown with multiple strategies and verify it opened.
+def _close_window(driver: WebDriver, handle: str) -> None:
+    """Close a background tab without losing the current one."""
+    try:
+        current = driver.current_window_handle
+        if handle == current or handle not in driver.window_handles:
+            return
+        driver.switch_to.window(handle)
+        driver.close()
+        driver.switch_to.window(current)
+    except Exception:
+        LOGGER.debug("Failed to close tab %s.", handle, exc_info=True)
 
-    Success criteria:
-      - Visible options found, or
-      - The trigger element reports aria-expanded=true, or
-      - The container has an 'open' class (e.g., composable-select--open, is-open)
+
+def _open_background_tab(driver: WebDriver, url: str) -> Optional[str]:
+    """Open url in a new unfocused tab and return its window handle (None if no tab appeared).
+
+    Uses CDP Target.createTarget with background=true, so the foreground tab keeps focus and isn't
+    throttled; window.open is the fallback where CDP isn't available.
     """
+    before = set(driver.window_handles)
     try:
-        from automation.ui_selectors import UI_SELECTORS
-        sel = UI_SELECTORS.get("facility_select", {})
-        btn_css = sel.get("button")
-        container_css = sel.get("container")
-        selection_text_css = sel.get("selection_text")
-        if not btn_css:
+        driver.execute_cdp_cmd("Target.createTarget", {"url": url, "background": True})
+    except Exception:
+        LOGGER.debug("Target.createTarget unavailable; opening the tab with window.open.", exc_info=True)
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+    opened = [h for h in driver.window_handles if h not in before]
+    return opened[0] if opened else None
+
+
+def _prefetch_timeline(driver: WebDriver, next_href: Optional[str]) -> None:
+    """Start loading next_href's timeline in a background tab while the current patient is populated.
+
+    The tab opens without taking focus (see _open_background_tab), so the page loads while the foreground
+    tab keeps working; the driver stays on the current tab. _adopt_prefetched_timeline switches to it when
+    that patient starts.
+    """
+    # With the documents API configured the next patient's timeline usually isn't rendered at all
+    if not _PREFETCH_TIMELINE or not next_href or get_api_settings().enabled:
+        return
+    _discard_prefetched_timeline(driver)
+    url = _timeline_url_for_view(next_href, _cached_intake_view(_extract_patient_id(next_href)) or "pending")
+    try:
+        handle = _open_background_tab(driver, url)
+        if handle:
+            setattr(driver, "_prefetched_timeline", (url, handle))
+            LOGGER.info("Prefetching next timeline in background tab: %s", url)
+    except Exception:
+        LOGGER.debug("Timeline prefetch failed for %s", url, exc_info=True)
+
+
+def _discard_prefetched_timeline(driver: WebDriver) -> None:
+    pre = getattr(driver, "_prefetched_timeline", None)
+    if not pre:
+        return
+    setattr(driver, "_prefetched_timeline", None)
+    _close_window(driver, pre[1])
+
+
+def _adopt_prefetched_timeline(driver: WebDriver, timeline_href: str, deadline: Optional[Deadline] = None) -> bool:
+    """Switch to the background tab prefetched for timeline_href, closing the previous patient's tab.
+
+    Returns False (after discarding any unrelated prefetch) when the caller has to navigate itself.
+    """
+    pre = getattr(driver, "_prefetched_timeline", None)
+    if not pre:
+        return False
+    url, handle = pre
+    if url != timeline_href:
+        _discard_prefetched_timeline(driver)
+        return False
+    setattr(driver, "_prefetched_timeline", None)
+    try:
+        if handle not in driver.window_handles:
             return False
+        driver.close()
+        driver.switch_to.window(handle)
+    except Exception:
+        LOGGER.debug("Failed to switch to prefetched timeline tab.", exc_info=True)
+        try:
+            driver.switch_to.window(driver.window_handles[-1])
+        except Exception:
+            pass
+        return False
+    reapply_request_blocking(driver)
+    set_view(driver, TIMELINE)
+    _wait_for_data_load(driver, timeout=30, name="timeline", deadline=deadline)
+    return True
 
-        # Helper to validate menu visibility by checking for any displayed option
-        def _options_visible(short_wait: int = 2) -> bool:
-            try:
-                # Use a short poll for options to appear
-                end = time.time() + short_wait
-                while time.time() < end:
-                    opts = _list_facility_options(driver, timeout=1)
-                    if opts:
-                        return True
-                return False
-            except Exception:
-                return False
 
-        def _is_open_state(btn_el: WebElement | None, container_el: WebElement | None) -> bool:
+# Timeline view each patient's intake was last found in, persisted across runs (.state/intake-locations.json)
+_INTAKE_LOCATIONS: Optional[dict] = None
+
+
+def _intake_locations_path() -> Path:
+    return default_state_dir() / "intake-locations.json"
+
+
+def _cached_intake_view(patient_id: Optional[str]) -> Optional[str]:
+    global _INTAKE_LOCATIONS
+    if not patient_id:
+        return None
+    if _INTAKE_LOCATIONS is None:
+        _INTAKE_LOCATIONS = load_json(_intake_locations_path(), default={}) or {}
+    view = ((_INTAKE_LOCATIONS.get("patients") or {}).get(patient_id) or {}).get("view")
+    return view if view in ("pending", "signed") else None
+
+
+def _remember_intake_view(patient_id: Optional[str], view: str) -> None:
+    global _INTAKE_LOCATIONS
+    if not patient_id or _cached_intake_view(patient_id) == view:
+        return
+    _INTAKE_LOCATIONS.setdefault("patients", {})[patient_id] = {"view": view, "seen": date.today().isoformat()}
+    try:
+        save_json_atomic(_intake_locations_path(), _INTAKE_LOCATIONS)
+    except Exception:
+        LOGGER.warning("Failed to persist intake locations.", exc_info=True)
+
+
+def _timeline_url_for_view(href: str, view: str) -> str:
+    return _to_timeline_url(href) if view == "pending" else _to_timeline_url_with_view(href, "signeddocuments")
+
+
+def _probe_intake_views(driver: WebDriver, href: str, timeout: int = 20, deadline: Optional[Deadline] = None) -> Optional[str]:
+    """Look for an intake row in the pending view (current tab) and the signed view (background tab) at once.
+
+    Returns the view that showed one first and leaves the driver on that tab (the other is closed), or None
+    when neither did within timeout. Costs roughly the latency of one view instead of pending's full miss
+    followed by signed.
+    """
+    pending_handle = driver.current_window_handle
+    signed_url = _timeline_url_for_view(href, "signed")
+    try:
+        before = set(driver.window_handles)
+        driver.execute_script("window.open(arguments[0], '_blank');", signed_url)
+        opened = [h for h in driver.window_handles if h not in before]
+    except Exception:
+        opened = []
+    if not opened:
+        LOGGER.info("Could not open a second tab for the signed view; probing pending, then signed.")
+        return _probe_intake_views_in_turn(driver, href, timeout, deadline)
+    signed_handle = opened[0]
+    tabs = (("pending", pending_handle), ("signed", signed_handle))
+    winner: Optional[str] = None
+    start = time.monotonic()
+    end = start + clamp_timeout(timeout, deadline)
+    try:
+        while winner is None and time.monotonic() < end:
+            for view, handle in tabs:
+                driver.switch_to.window(handle)
+                if driver.find_elements(By.XPATH, _INTAKE_ROW_XPATH):
+                    winner = view
+                    break
+            else:
+                time.sleep(0.25)
+    except Exception:
+        LOGGER.debug("Intake probe interrupted.", exc_info=True)
+    keep, drop = (signed_handle, pending_handle) if winner == "signed" else (pending_handle, signed_handle)
+    try:
+        driver.switch_to.window(drop)
+        driver.close()
+    except Exception:
+        LOGGER.debug("Failed to close probe tab.", exc_info=True)
+    driver.switch_to.window(keep)
+    if winner == "signed":
+        reapply_request_blocking(driver)
+        set_view(driver, TIMELINE)
+    if winner:
+        record_latency("probe.intake", time.monotonic() - start)
+    LOGGER.info("Intake probe | winner=%s | %.1fs", winner, time.monotonic() - start)
+    return winner
+
+
+def _probe_intake_views_in_turn(driver: WebDriver, href: str, timeout: int, deadline: Optional[Deadline]) -> Optional[str]:
+    """_probe_intake_views without a second tab: wait on pending (the current page), then open signed and wait there."""
+    row = EC.presence_of_element_located((By.XPATH, _INTAKE_ROW_XPATH))
+    try:
+        timed_wait(driver, "probe.intake.pending", 4, row, deadline=deadline)
+        return "pending"
+    except TimeoutException:
+        pass
+    _open_page(driver, _timeline_url_for_view(href, "signed"), name="signed", deadline=deadline)
+    try:
+        timed_wait(driver, "probe.intake.signed", timeout, row, deadline=deadline)
+        return "signed"
+    except TimeoutException:
+        return None
+
+
+def _download_intake_via_api(
+    driver: WebDriver,
+    patient_id: Optional[str],
+    staging_dir: Path,
+    cached_view: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> Optional[tuple[str, Path]]:
+    """Find and download the intake via the timeline documents API ([api] section); (view, staged pdf) or None.
+
+    No timeline page is rendered and no Downloads folder round trip happens; None means the DOM path runs.
+    Each request is limited by deadline's remaining budget.
+    """
+    if not patient_id or not get_api_settings().enabled:
+        return None
+    views = [cached_view, "signed" if cached_view == "pending" else "pending"] if cached_view else ["pending", "signed"]
+    for view in views:
+        doc = find_intake_document(driver, patient_id, view, deadline=deadline)
+        if not doc:
+            continue
+        dest = _unique_destination(staging_dir, _safe_patient_filename(patient_id))
+        if download_document(driver, doc["download_url"], dest, deadline=deadline):
+            return view, dest
+    return None
+
+
+# Which part of the per-patient flow this run does ([run] phases, --phase); "all" interleaves them per patient
+_PHASE = ALL
+
+
+def configure_phase(phase: str) -> None:
+    global _PHASE
+    _PHASE = phase
+
+
+def _extract_intake(patient_id: Optional[str], staging_dir: Optional[Path], dest_pdf: Optional[Path], view: str) -> bool:
+    """Run the intake extractor on a staged PDF, writing <patient_id>-intake-details.json next to it.
+
+    Returns whether a PDF was staged. In the harvest phase the PDF is only recorded in the run manifest
+    and extraction is left to the extract phase.
+    """
+    if not (dest_pdf and patient_id and staging_dir):
+        return False
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [STAGING] {patient_id} | PDF moved to staging ({view}): {dest_pdf}")
+    manifest = get_run_manifest()
+    if manifest is not None:
+        manifest.stage(patient_id, HARVEST, OK, pdf=dest_pdf.name, view=view)
+        manifest.add_artifacts(patient_id, dest_pdf.name)
+    catalog = get_catalog()
+    if catalog is not None:
+        catalog.artifact(patient_id, dest_pdf)
+    if _PHASE == HARVEST:
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | Extraction deferred to the extract phase.")
+        return True
+    output_json = staging_dir / f"{patient_id}-intake-details.json"
+    log_file = staging_dir / f"{patient_id}-intake-log.txt"
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | Starting PDF parser ({view})...")
+    outcome = extract_intake(dest_pdf, output_json, log_file)
+    record_outcome(patient_id, dest_pdf, outcome)
+    if manifest is not None:
+        manifest.stage(patient_id, EXTRACT, outcome.status)
+        manifest.add_artifacts(patient_id, *(p.name for p in (output_json, log_file) if p.exists()))
+    if catalog is not None:
+        catalog.stage(patient_id, EXTRACT, outcome.status, outcome.seconds, outcome.detail)
+        for path in (output_json, log_file):
+            if path.exists():
+                catalog.artifact(patient_id, path)
+    detail = f" - {outcome.detail}" if outcome.detail else ""
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PARSER] {patient_id} | PDF parser finished ({view}): {'Success' if outcome.ok else 'Failure'} [{outcome.status}, {outcome.seconds:.1f}s]{detail}")
+    return True
+
+
+def _shed_section(section_key: str, patient_id: Optional[str], deadline: Deadline) -> bool:
+    """True (and logged) when an optional section should be skipped to stay within the patient budget."""
+    if not deadline.should_shed(section_key):
+        return False
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SHED] {patient_id} | Skipped {section_key}: {deadline.remaining():.0f}s left in patient budget")
+    return True
+
+
+def _process_patient(
+    driver: WebDriver,
+    href: str,
+    idx: int,
+    total: int,
+    staging_dir: Optional[Path] = None,
+    facility_budget: Optional[Deadline] = None,
+    next_href: Optional[str] = None,
+) -> bool:
+    """Run the full flow for one patient: intake lookup/download, extraction, summary population, move to processed.
+
+    Every wait is limited by the patient's time budget (nested in facility_budget), so one slow chart
+    can't eat the whole run; optional sections are shed when the budget runs low. With timeline prefetch
+    on, next_href's timeline loads in a background tab while this patient's summary is populated.
+
+    In the harvest phase only the intake lookup/download runs (patients already harvested into
+    staging_dir are skipped); the run manifest records each step for the later phases.
+
+    Returns True when the patient is done for this phase: harvested (harvest phase) or its summary
+    populated. Callers that remember processed patients only record those.
+    """
+    patient_id = _extract_patient_id(href)
+    manifest = get_run_manifest()
+    if manifest is not None and patient_id:
+        state = view_state(driver)
+        if _PHASE == HARVEST and staging_dir:
+            entry = manifest.get(patient_id)
+            if entry.get(HARVEST) == OK and entry.get("pdf") and (staging_dir / entry["pdf"]).exists():
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SKIP] {patient_id} | Already harvested [{idx}/{total}]")
+                return True
+        manifest.update(patient_id, href=href, facility=state.facility, date=state.date)
+    catalog = get_catalog()
+    if catalog is not None and patient_id:
+        state = view_state(driver)
+        catalog.visit(patient_id, facility=state.facility, date=state.date, href=href)
+    started = time.monotonic()
+    deadline = patient_deadline(parent=facility_budget, label=patient_id or "")
+    get_breaker_board().begin_patient()
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PATIENT] {patient_id} | Start flow [{idx}/{total}]")
+    harvested = False
+    # Open the view the intake was last found in (pending unless cached as signed)
+    cached_view = _cached_intake_view(patient_id)
+    found_in = None
+
+    # Fast path: list the timeline documents and download the intake through the app's own API
+    api_hit = _download_intake_via_api(driver, patient_id, staging_dir, cached_view, deadline=deadline) if staging_dir else None
+    if api_hit:
+        found_in, dest_pdf = api_hit
+        _remember_intake_view(patient_id, found_in)
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Downloaded intake PDF via API ({found_in}): {dest_pdf}")
+        try:
+            # Extraction has its own timeout ([extractor] timeout_seconds); keep it out of the patient budget
+            with deadline.paused():
+                harvested = _extract_intake(patient_id, staging_dir, dest_pdf, found_in)
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Parser error ({found_in}): {e}")
+    else:
+        current_view = "signed" if cached_view == "signed" else "pending"
+        timeline_href = _timeline_url_for_view(href, current_view)
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Opened timeline link: {timeline_href}")
+        if not _adopt_prefetched_timeline(driver, timeline_href, deadline=deadline):
+            _open_page(driver, timeline_href, name="timeline" if current_view == "pending" else "signed", deadline=deadline)
+
+        # Known location: try it, then the other view. Unknown: probe both views at once; the first hit wins.
+        try:
+            if cached_view:
+                candidates = [cached_view, "signed" if cached_view == "pending" else "pending"]
+            else:
+                probed = _probe_intake_views(driver, href, deadline=deadline)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Intake probe (pending+signed): {probed or 'not found'}")
+                candidates = [probed] if probed else []
+                current_view = probed or current_view
+            for view in candidates:
+                if view != current_view:
+                    view_href = _timeline_url_for_view(href, view)
+                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Tried {view} documents view: {view_href}")
+                    _open_page(driver, view_href, name="timeline" if view == "pending" else "signed", deadline=deadline)
+                    current_view = view
+                clicked = _click_first_intake_document_type(driver, timeout=4 if view == "pending" else 20, name=f"intake.{view}", deadline=deadline)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Intake document link clicked in {view}: {'Success' if clicked else 'Failure'}")
+                if not clicked:
+                    continue
+                found_in = view
+                _remember_intake_view(patient_id, view)
+                try:
+                    dest_pdf = _download_intake_document_if_available(driver, timeout=15, staging_dir=staging_dir, patient_id=patient_id, deadline=deadline)
+                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [DOC] {patient_id} | Downloaded intake PDF ({view}): {'Success' if dest_pdf else 'Failure'}")
+                    # Extraction has its own timeout ([extractor] timeout_seconds); keep it out of the patient budget
+                    with deadline.paused():
+                        harvested = _extract_intake(patient_id, staging_dir, dest_pdf, view)
+                except Exception as e:
+                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Download error ({view}): {e}")
+                break
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Intake document navigation error: {e}")
+
+    if manifest is not None and patient_id and not harvested:
+        manifest.stage(patient_id, HARVEST, "no_intake")
+    if catalog is not None and patient_id:
+        # Includes extraction in the all phase
+        catalog.stage(patient_id, HARVEST, OK if harvested else "no_intake", time.monotonic() - started)
+    if _PHASE == HARVEST:
+        # Summary population and the move to processed happen in the populate phase
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [END] End patient loop idx={idx}, patient_id={patient_id} (harvest)")
+        collect_network_stats(driver)
+        save_latency_store()
+        return harvested
+
+    intake_json = staging_dir / f"{patient_id}-intake-details.json" if staging_dir and patient_id else None
+    status = _populate_summary(driver, patient_id, href, intake_json, deadline, next_href=next_href)
+    populated = status == OK
+
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [END] End patient loop idx={idx}, patient_id={patient_id}")
+
+    # Anything short of a fully written summary (failed extraction, partial populate) keeps its files in
+    # staging, where --phase extract / --phase populate on this run dir pick them up again
+    if status == OK:
+        _finish_patient(staging_dir, patient_id)
+
+    # Drain the performance log (request blocking stats) so it doesn't grow across patients
+    collect_network_stats(driver)
+    save_latency_store()
+    return harvested and populated
+
+
+def _patient_artifacts(patient_id: str) -> list[str]:
+    """Names of the patient's files in staging: as recorded in the run manifest, else the standard names."""
+    manifest = get_run_manifest()
+    recorded = manifest.get(patient_id).get("artifacts") if manifest is not None else None
+    return list(recorded or [f"{patient_id}.pdf", f"{patient_id}-intake-details.json", f"{patient_id}-intake-log.txt"])
+
+
+def _finish_patient(staging_dir: Optional[Path], patient_id: Optional[str]) -> None:
+    """Move this patient's artifacts from staging to processed.
+
+    Only the patient's own files are touched (no scan of staging, so no prefix matches with other ids), and
+    each is moved with os.replace, an atomic rename since staging and processed share the run directory.
+    """
+    if not (staging_dir and patient_id):
+        return
+    processed_dir = staging_dir.parent / "processed"
+    processed_dir.mkdir(exist_ok=True)
+    moved = 0
+    catalog = get_catalog()
+    for name in _patient_artifacts(patient_id):
+        try:
+            os.replace(staging_dir / name, processed_dir / name)
+            moved += 1
+            if catalog is not None:
+                catalog.artifact(patient_id, processed_dir / name)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Could not move {name} to processed: {e}")
+    manifest = get_run_manifest()
+    if manifest is not None and moved:
+        manifest.update(patient_id, location="processed")
+
+
+def _populate_summary(
+    driver: WebDriver,
+    patient_id: Optional[str],
+    href: Optional[str],
+    intake_json: Optional[Path],
+    deadline: Deadline,
+    next_href: Optional[str] = None,
+) -> str:
+    """Open the patient's summary page and write each section from the intake JSON (populate step).
+
+    Returns the populate status recorded in the run manifest: "ok" when every required section that had
+    text was written, "partial" when some of them failed, "failed" when all of them did, and "no_json"
+    when there was nothing to write. Sections listed in [run] optional_sections (whether shed or failed)
+    don't count against it; the manifest still lists every section that wasn't written.
+    """
+    started = time.monotonic()
+    attempted: list[str] = []
+    failed: list[str] = []
+    # Return to summary page and dismiss popups; without an intake JSON there is nothing to populate, so the
+    # next step (next patient's timeline or the scheduler) navigates straight from here
+    if href and intake_json is not None and not intake_json.exists():
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | No intake JSON; skipped summary page.")
+    elif href:
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Returned to summary page: {href}")
+        _open_page(driver, href, ready_css=_SUMMARY_READY_CSS, name="summary", deadline=deadline)
+        _prefetch_timeline(driver, next_href)
+        try:
+            dismissed = _dismiss_any_popups(driver)
+            if dismissed:
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [NAV] {patient_id} | Dismissed {dismissed} popup/modal(s) on summary load.")
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Popup dismiss error: {e}")
+
+    # Intake JSON summary extraction
+    if intake_json is not None:
+        if not intake_json.exists():
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Intake JSON does not exist: {intake_json}")
+        else:
+            # Family History
             try:
-                if btn_el is not None:
-                    expanded = (btn_el.get_attribute("aria-expanded") or "").lower()
-                    if expanded == "true":
-                        return True
-            except Exception:
-                pass
+                fam_text = _build_family_history_summary(intake_json)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Family History summary: {fam_text}")
+                fam_filled = False
+                if fam_text:
+                    attempted.append("family_history")
+                    fam_filled = _populate_family_history(driver, fam_text, deadline=deadline)
+                    if not fam_filled:
+                        failed.append("family_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Family History UI action: {'Success' if fam_filled else 'Failure'}")
+            except Exception as e:
+                if "family_history" not in failed:
+                    failed.append("family_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Family History: {e}")
+            # Social History
             try:
-                if container_el is not None:
-                    cls = (container_el.get_attribute("class") or "").lower()
-                    if any(tok in cls for tok in ("is-open", "open", "composable-select--open")):
-                        return True
-            except Exception:
-                pass
-            return False
+                soc_text = _build_social_history_summary(intake_json)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Social History summary: {soc_text}")
+                soc_filled = False
+                if soc_text:
+                    attempted.append("social_history")
+                    soc_filled = _populate_social_history(driver, soc_text, deadline=deadline)
+                    if not soc_filled:
+                        failed.append("social_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Social History UI action: {'Success' if soc_filled else 'Failure'}")
+            except Exception as e:
+                if "social_history" not in failed:
+                    failed.append("social_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Social History: {e}")
+            # Ongoing Medical Problems
+            try:
+                ongoing_text = _build_ongoing_medical_problems_summary(intake_json)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Ongoing Medical Problems summary: {ongoing_text}")
+                ongoing_filled = False
+                if ongoing_text:
+                    attempted.append("ongoing_medical_problems")
+                    ongoing_filled = _populate_ongoing_medical_problems(driver, ongoing_text, deadline=deadline)
+                    if not ongoing_filled:
+                        failed.append("ongoing_medical_problems")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Ongoing Medical Problems UI action: {'Success' if ongoing_filled else 'Failure'}")
+            except Exception as e:
+                if "ongoing_medical_problems" not in failed:
+                    failed.append("ongoing_medical_problems")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Ongoing Medical Problems: {e}")
+            # Major Events
+            try:
+                major_text = _build_major_events_summary(intake_json)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Major Events summary: {major_text}")
+                major_filled = False
+                if major_text:
+                    attempted.append("major_events")
+                    major_filled = _populate_major_events(driver, major_text, deadline=deadline)
+                    if not major_filled:
+                        failed.append("major_events")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Major Events UI action: {'Success' if major_filled else 'Failure'}")
+            except Exception as e:
+                if "major_events" not in failed:
+                    failed.append("major_events")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Major Events: {e}")
+            # Nutrition History
+            try:
+                nutrition_text = _build_nutrition_history_summary(intake_json)
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Nutrition History summary: {nutrition_text}")
+                nutrition_filled = False
+                if nutrition_text and not _shed_section("nutrition_history", patient_id, deadline):
+                    attempted.append("nutrition_history")
+                    nutrition_filled = _populate_nutrition_history(driver, nutrition_text, deadline=deadline)
+                    if not nutrition_filled:
+                        failed.append("nutrition_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [UI] {patient_id} | Nutrition History UI action: {'Success' if nutrition_filled else 'Failure'}")
+            except Exception as e:
+                if "nutrition_history" not in failed:
+                    failed.append("nutrition_history")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Nutrition History: {e}")
 
-        # Locate container and candidate trigger elements
-        cont = None
+            # Preventive Care (Female only)
+            try:
+                from automation.navigation import set_global_gender_flag, process_preventive_care_if_female
+                set_global_gender_flag(intake_json)
+                if not _shed_section("preventive_care", patient_id, deadline):
+                    preventive_filled = process_preventive_care_if_female(driver, intake_json, timeout=15, deadline=deadline)
+                    if preventive_filled is not None:
+                        attempted.append("preventive_care")
+                        if not preventive_filled:
+                            failed.append("preventive_care")
+            except Exception as e:
+                if "preventive_care" not in failed:
+                    failed.append("preventive_care")
+                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Preventive Care: {e}")
+
+    optional = set(get_budget_settings().optional_sections)
+    required_failed = [s for s in failed if s not in optional]
+    if intake_json is None or not intake_json.exists():
+        status = "no_json"
+    elif not required_failed:
+        status = OK
+    else:
+        status = "partial" if {s for s in attempted if s not in optional} - set(required_failed) else "failed"
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [SUMMARY] {patient_id} | Populate {status}; sections not written: {', '.join(failed)}")
+    manifest = get_run_manifest()
+    if manifest is not None and patient_id and intake_json is not None:
+        manifest.stage(patient_id, POPULATE, status, failed_sections=failed)
+    catalog = get_catalog()
+    if catalog is not None and patient_id and intake_json is not None:
+        catalog.stage(patient_id, POPULATE, status, time.monotonic() - started, detail=", ".join(failed))
+    return status
+
+
+# --- Facility (Hormone Center) helpers ---
+# Winning UI strategies per UI fingerprint, persisted across runs (.state/ui-strategies.json)
+_UI_STRATEGIES: Optional[dict] = None
+
+
+def _ui_strategies_path() -> Path:
+    return default_state_dir() / "ui-strategies.json"
+
+
+def _remembered_strategy(widget: str, fingerprint: str) -> Optional[str]:
+    global _UI_STRATEGIES
+    if _UI_STRATEGIES is None:
+        _UI_STRATEGIES = load_json(_ui_strategies_path(), default={}) or {}
+    entry = (_UI_STRATEGIES.get(widget) or {}).get(fingerprint) or {}
+    return entry.get("strategy")
+
+
+def _remember_strategy(widget: str, fingerprint: str, strategy: Optional[str]) -> None:
+    """Record (or with strategy=None forget) the strategy that worked for widget under fingerprint."""
+    global _UI_STRATEGIES
+    if _UI_STRATEGIES is None:
+        _UI_STRATEGIES = load_json(_ui_strategies_path(), default={}) or {}
+    entries = _UI_STRATEGIES.setdefault(widget, {})
+    if strategy is None:
+        if entries.pop(fingerprint, None) is None:
+            return
+    else:
+        if (entries.get(fingerprint) or {}).get("strategy") == strategy:
+            return
+        entries[fingerprint] = {"strategy": strategy, "recorded": datetime.now().isoformat(timespec="seconds")}
+    try:
+        save_json_atomic(_ui_strategies_path(), _UI_STRATEGIES)
+    except Exception:
+        LOGGER.warning("Failed to persist UI strategies.", exc_info=True)
+
+
+def _ui_fingerprint(driver: WebDriver, *elements: Optional[WebElement]) -> str:
+    """Short hash of the elements' structure (tag, class, role, data-element, child count), not their text.
+
+    Changes when a PF UI release reshapes the widget, so a remembered strategy is only reused on the
+    markup it was learned on.
+    """
+    import hashlib
+    # One round trip for all elements
+    try:
+        parts = driver.execute_script(
+            "return Array.prototype.map.call(arguments, function (e) { return e ? [e.tagName, e.getAttribute('class') || '',"
+            " e.getAttribute('role') || '', e.getAttribute('data-element') || '', e.children.length].join('|') : '-'; });",
+            *elements,
+        ) or []
+    except Exception:
+        parts = ["?"] * len(elements)
+    return hashlib.sha1("#".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class _FacilityDropdown:
+    """Elements of the facility dropdown that the opening strategies act on.
+
+    Only the button and container are looked up up front; the fallback trigger candidates are scanned
+    the first time triggers is used, i.e. only when the remembered strategy didn't open the menu.
+    """
+
+    def __init__(self, driver: WebDriver, timeout: int):
+        from automation.ui_selectors import UI_SELECTORS
+        sel = UI_SELECTORS.get("facility_select", {})
+        self.btn_css = sel.get("button")
+        self.container_css = sel.get("container")
+        self.selection_text_css = sel.get("selection_text")
+        self.cont: Optional[WebElement] = None
+        self.btn: Optional[WebElement] = None
+        self._driver = driver
+        self._triggers: Optional[list[WebElement]] = None
+        if not self.btn_css:
+            return
         try:
-            if container_css:
-                cont = WebDriverWait(driver, min(timeout, 4)).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, container_css))
+            if self.container_css:
+                self.cont = WebDriverWait(driver, min(timeout, 4)).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self.container_css))
                 )
         except Exception:
-            cont = None
-        # Build a set of trigger candidates (primary first, then fallbacks inside container)
-        trigger_candidates: list[WebElement] = []
-        btn = None
+            self.cont = None
         try:
-            btn = WebDriverWait(driver, min(timeout, 4)).until(EC.presence_of_element_located((By.CSS_SELECTOR, btn_css)))
-            trigger_candidates.append(btn)
+            self.btn = WebDriverWait(driver, min(timeout, 4)).until(EC.presence_of_element_located((By.CSS_SELECTOR, self.btn_css)))
         except Exception:
-            btn = None
+            self.btn = None
+
+    @property
+    def triggers(self) -> list[WebElement]:
+        """Trigger candidates: primary button first, then fallbacks inside the container (scanned once)."""
+        if self._triggers is not None:
+            return self._triggers
+        driver = self._driver
+        triggers: list[WebElement] = [self.btn] if self.btn is not None else []
+        self._triggers = triggers
+        if not self.btn_css:
+            return triggers
         # Fallbacks commonly used by composable/select UIs
         fallback_selectors = [
             ".composable-select__control",
@@ -1406,123 +2216,180 @@ def _open_facility_dropdown(driver: WebDriver, timeout: int = 10) -> bool:
         ]
         for css in fallback_selectors:
             try:
-                scope = cont if cont is not None else driver
-                els = scope.find_elements(By.CSS_SELECTOR, css)
-                for e in els:
-                    if e not in trigger_candidates:
-                        trigger_candidates.append(e)
+                scope = self.cont if self.cont is not None else driver
+                for e in scope.find_elements(By.CSS_SELECTOR, css):
+                    if e not in triggers:
+                        triggers.append(e)
             except Exception:
                 continue
         # Ensure we have at least the container itself as last resort
-        if cont is not None and cont not in trigger_candidates:
-            trigger_candidates.append(cont)
+        if self.cont is not None and self.cont not in triggers:
+            triggers.append(self.cont)
+        return triggers
 
-        # Scroll first candidate into view
-        if trigger_candidates:
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", trigger_candidates[0])
-            except Exception:
-                pass
+    @property
+    def primary(self) -> Optional[WebElement]:
+        return self.btn or (self.triggers[0] if self.triggers else None)
 
-        # Attempt 1: regular click on first candidate
+    def is_open(self, driver: WebDriver, short_wait: int = 1) -> bool:
+        """Visible options found, trigger aria-expanded=true, or container has an 'open' class."""
         try:
-            if btn is not None:
-                WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.CSS_SELECTOR, btn_css)))
+            end = time.time() + short_wait
+            while time.time() < end:
+                if _list_facility_options(driver, timeout=1):
+                    return True
         except Exception:
             pass
         try:
-            (btn or trigger_candidates[0]).click()
-        except Exception:
-            try:
-                driver.execute_script("arguments[0].click();", (btn or trigger_candidates[0]))
-            except Exception:
-                pass
-        if _options_visible(2) or _is_open_state(btn, cont):
-            LOGGER.info("Facilities dropdown opened via click.")
-            return True
-
-        # Attempt 2: focus + SPACE
-        try:
-            (btn or trigger_candidates[0]).send_keys(Keys.SPACE)
+            if self.btn is not None and (self.btn.get_attribute("aria-expanded") or "").lower() == "true":
+                return True
         except Exception:
             pass
-        if _options_visible(1) or _is_open_state(btn, cont):
-            LOGGER.info("Facilities dropdown opened via SPACE on button.")
-            return True
-
-        # Attempt 3: focus + ENTER
         try:
-            (btn or trigger_candidates[0]).send_keys(Keys.ENTER)
+            if self.cont is not None:
+                cls = (self.cont.get_attribute("class") or "").lower()
+                if any(tok in cls for tok in ("is-open", "open", "composable-select--open")):
+                    return True
         except Exception:
             pass
-        if _options_visible(1) or _is_open_state(btn, cont):
-            LOGGER.info("Facilities dropdown opened via ENTER on button.")
-            return True
+        return False
+
+
+def _click_element(driver: WebDriver, el: WebElement) -> None:
+    try:
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", el)
+    except Exception:
+        pass
+    try:
+        el.click()
+    except Exception:
+        driver.execute_script("arguments[0].click();", el)
+
+
+def _facility_open_click(driver: WebDriver, dd: _FacilityDropdown) -> None:
+    try:
+        if dd.btn is not None:
+            WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.CSS_SELECTOR, dd.btn_css)))
+    except Exception:
+        pass
+    _click_element(driver, dd.primary)
+
+
+def _facility_open_key(key: str):
+    def _open(driver: WebDriver, dd: _FacilityDropdown) -> None:
+        dd.primary.send_keys(key)
+    return _open
+
+
+def _facility_open_selection_text(driver: WebDriver, dd: _FacilityDropdown) -> None:
+    if dd.selection_text_css:
+        _click_element(driver, driver.find_element(By.CSS_SELECTOR, dd.selection_text_css))
+
 
-        # Attempt 3b: ARROW_DOWN often opens listboxes
+def _facility_open_trigger(index: int):
+    def _open(driver: WebDriver, dd: _FacilityDropdown) -> None:
+        if index < len(dd.triggers):
+            _click_element(driver, dd.triggers[index])
+    return _open
+
+
+def _facility_open_strategy(name: str) -> Optional[tuple[str, Any, int]]:
+    """The named strategy on its own, without scanning trigger candidates (None for an unknown name)."""
+    if name.startswith("trigger:"):
         try:
-            (btn or trigger_candidates[0]).send_keys(Keys.ARROW_DOWN)
-        except Exception:
-            pass
-        if _options_visible(1) or _is_open_state(btn, cont):
-            LOGGER.info("Facilities dropdown opened via ARROW_DOWN on button.")
-            return True
+            return (name, _facility_open_trigger(int(name.split(":", 1)[1])), 1)
+        except ValueError:
+            return None
+    return next((s for s in _facility_open_strategies(None) if s[0] == name), None)
+
+
+def _facility_open_strategies(dd: Optional[_FacilityDropdown]) -> list[tuple[str, Any, int]]:
+    """(name, action, check seconds) in cascade order; names are what gets remembered.
 
-        # Attempt 4: click selection text element
-        if selection_text_css:
+    With dd None only the button strategies are listed (no trigger candidate scan).
+    """
+    strategies = [
+        ("click", _facility_open_click, 2),
+        ("space", _facility_open_key(Keys.SPACE), 1),
+        ("enter", _facility_open_key(Keys.ENTER), 1),
+        # ARROW_DOWN often opens listboxes
+        ("arrow_down", _facility_open_key(Keys.ARROW_DOWN), 1),
+        ("selection_text", _facility_open_selection_text, 1),
+    ]
+    if dd is not None:
+        for i in range(1, len(dd.triggers)):
+            strategies.append((f"trigger:{i}", _facility_open_trigger(i), 1))
+    return strategies
+
+
+def _open_facility_dropdown(driver: WebDriver, timeout: int = 10) -> bool:
+    """Open the scheduler toolbar's facility dropdown and verify it opened.
+
+    The strategy that last worked for this dropdown's markup (see _ui_fingerprint) is tried first, so
+    the usual case is one click plus one check; the full cascade (click, SPACE/ENTER/ARROW_DOWN on the
+    button, selection text, other trigger candidates) runs only when it fails, and its winner is
+    remembered in .state/ui-strategies.json.
+
+    Success criteria:
+      - Visible options found, or
+      - The trigger element reports aria-expanded=true, or
+      - The container has an 'open' class (e.g., composable-select--open, is-open)
+    """
+    try:
+        dd = _FacilityDropdown(driver, timeout)
+        if not dd.btn_css or dd.primary is None:
+            return False
+        fingerprint = _ui_fingerprint(driver, dd.btn, dd.cont)
+        remembered = _remembered_strategy("facility_dropdown", fingerprint)
+        # Remembered strategy alone first; trigger candidates are only scanned for the cascade
+        first = _facility_open_strategy(remembered) if remembered else None
+        if first:
+            name, action, check_seconds = first
             try:
-                sel_el = driver.find_element(By.CSS_SELECTOR, selection_text_css)
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", sel_el)
-                except Exception:
-                    pass
-                try:
-                    sel_el.click()
-                except Exception:
-                    driver.execute_script("arguments[0].click();", sel_el)
-                if _options_visible(1) or _is_open_state(btn, cont):
-                    LOGGER.info("Facilities dropdown opened via selection text click.")
-                    return True
+                action(driver, dd)
             except Exception:
                 pass
-
-        # Attempt 5: iterate other trigger candidates and try clicking each
-        for cand in trigger_candidates[1:]:
+            if dd.is_open(driver, check_seconds):
+                LOGGER.info("Facilities dropdown opened via %s (remembered).", name)
+                # The indexed selection script reuses it without re-fingerprinting
+                setattr(driver, "_facility_open_strategy", name)
+                return True
+            LOGGER.info("Remembered facility dropdown strategy '%s' failed; trying the full cascade.", name)
+        for name, action, check_seconds in _facility_open_strategies(dd):
+            if first and name == first[0]:
+                continue
             try:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", cand)
-                except Exception:
-                    pass
-                try:
-                    cand.click()
-                except Exception:
-                    driver.execute_script("arguments[0].click();", cand)
-                if _options_visible(1) or _is_open_state(btn, cont):
-                    LOGGER.info("Facilities dropdown opened via fallback trigger.")
-                    return True
+                action(driver, dd)
             except Exception:
-                continue
-
+                pass
+            if dd.is_open(driver, check_seconds):
+                LOGGER.info("Facilities dropdown opened via %s.", name)
+                _remember_strategy("facility_dropdown", fingerprint, name)
+                setattr(driver, "_facility_open_strategy", name)
+                return True
+
+        if remembered:
+            _remember_strategy("facility_dropdown", fingerprint, None)
         # Dump minimal element diagnostics to aid selector fixes
         try:
-            btn_html = (btn.get_attribute("outerHTML") or "")[:1000]
+            btn_html = (dd.btn.get_attribute("outerHTML") or "")[:1000] if dd.btn else "(none)"
         except Exception:
             btn_html = "(error)"
         try:
-            cont_html = (cont.get_attribute("outerHTML") or "")[:1000] if cont else "(none)"
+            cont_html = (dd.cont.get_attribute("outerHTML") or "")[:1000] if dd.cont else "(none)"
         except Exception:
             cont_html = "(error)"
         try:
-            btn_expanded = (btn.get_attribute("aria-expanded") if btn else None)
+            btn_expanded = (dd.btn.get_attribute("aria-expanded") if dd.btn else None)
         except Exception:
             btn_expanded = None
         try:
-            cont_class = (cont.get_attribute("class") if cont else None)
+            cont_class = (dd.cont.get_attribute("class") if dd.cont else None)
         except Exception:
             cont_class = None
         LOGGER.info(
             "Facilities dropdown did not open. candidates=%s | btn aria-expanded=%s | container class=%s",
-            len(trigger_candidates), btn_expanded, cont_class,
+            len(dd.triggers), btn_expanded, cont_class,
         )
         LOGGER.debug("Facilities btn HTML: %s", btn_html)
         LOGGER.debug("Facilities container HTML: %s", cont_html)
@@ -1590,14 +2457,191 @@ def _get_current_facility_text(driver: WebDriver) -> str:
         return ""
 
 
+def _normalize_label(text: Optional[str]) -> str:
+    return " ".join((text or "").split()).lower()
+
+
+# Visible facility option texts in DOM order, collected in one round trip
+_FACILITY_OPTIONS_JS = """
+var opts = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < opts.length; i++) {
+    var e = opts[i];
+    if (e.offsetParent !== null || e.getClientRects().length > 0) {
+        out.push((e.innerText || e.textContent || '').trim());
+    }
+}
+return out;
+"""
+
+# Open the menu if needed, click the option at the indexed position (verifying its label), and wait for the
+# selection text to show exactly that label. The menu is opened in-script only with the session's known
+# opening strategy when it is a plain click ('click' on the button, 'selection_text'); otherwise the script
+# reports 'closed' and the caller opens it. Calls back with {ok, reason, selection, labels}.
+_FACILITY_SELECT_JS = """
+var btnCss = arguments[0], optCss = arguments[1], selCss = arguments[2], idx = arguments[3];
+var label = arguments[4], openMode = arguments[5], timeoutMs = arguments[6], done = arguments[arguments.length - 1];
+function norm(t) { return (t || '').replace(/\\s+/g, ' ').trim().toLowerCase(); }
+function text(e) { return (e.innerText || e.textContent || '').trim(); }
+function visibleOptions() {
+    return Array.prototype.filter.call(document.querySelectorAll(optCss), function (e) {
+        return e.offsetParent !== null || e.getClientRects().length > 0;
+    });
+}
+function selection() { var s = selCss ? document.querySelector(selCss) : null; return s ? text(s) : ''; }
+var start = Date.now();
+var btn = document.querySelector(btnCss);
+if (!btn) { done({ok: false, reason: 'no-button'}); return; }
+if (!visibleOptions().length) {
+    var trigger = openMode === 'click' ? btn : (openMode === 'selection_text' && selCss ? document.querySelector(selCss) : null);
+    if (!trigger) { done({ok: false, reason: 'closed'}); return; }
+    trigger.click();
+}
+(function waitOptions() {
+    var opts = visibleOptions();
+    if (!opts.length) {
+        if (Date.now() - start > timeoutMs) { done({ok: false, reason: 'no-options'}); return; }
+        setTimeout(waitOptions, 50);
+        return;
+    }
+    var target = opts[idx];
+    if (!target || norm(text(target)) !== label) {
+        target = null;
+        for (var i = 0; i < opts.length; i++) { if (norm(text(opts[i])) === label) { target = opts[i]; break; } }
+    }
+    if (!target) { done({ok: false, reason: 'option-moved', labels: opts.map(text)}); return; }
+    target.scrollIntoView({block: 'center'});
+    target.click();
+    (function waitSelection() {
+        var current = norm(selection());
+        if (current === label) { done({ok: true, selection: selection()}); return; }
+        if (Date.now() - start > timeoutMs) { done({ok: false, reason: 'selection-not-updated', selection: selection()}); return; }
+        setTimeout(waitSelection, 50);
+    })();
+})();
+"""
+
+
+def _facility_index(driver: WebDriver, timeout: int = 10, refresh: bool = False) -> Optional[dict]:
+    """Per-session index of the facility dropdown: {"labels": [...], "by_label": {normalized label: option index}}.
+
+    Built once per driver (opening the menu and reading every option in one script call) and kept on the
+    driver; refresh=True rebuilds it, e.g. after a selection found the options moved.
+    """
+    index = getattr(driver, "_facility_index", None)
+    if index is not None and not refresh:
+        return index
+    from automation.ui_selectors import UI_SELECTORS
+    options_css = UI_SELECTORS.get("facility_select", {}).get("options", "[role='option'], .composable-select__option")
+    if not _open_facility_dropdown(driver, timeout=timeout):
+        return None
+    labels: list[str] = []
+    end = time.time() + min(timeout, 4)
+    while time.time() < end:
+        try:
+            labels = [str(t) for t in (driver.execute_script(_FACILITY_OPTIONS_JS, options_css) or [])]
+        except Exception:
+            labels = []
+        if labels:
+            break
+        time.sleep(0.2)
+    try:
+        driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+    except Exception:
+        pass
+    if not labels:
+        return None
+    by_label: dict[str, int] = {}
+    for i, t in enumerate(labels):
+        by_label.setdefault(_normalize_label(t), i)
+    index = {"labels": labels, "by_label": by_label}
+    setattr(driver, "_facility_index", index)
+    LOGGER.info("Facility index built: %s options.", len(labels))
+    return index
+
+
+def _select_facility_via_index(driver: WebDriver, label_text: str, timeout: int = 10) -> Optional[str]:
+    """Select a facility in one script round trip using the session's facility index.
+
+    Matching mirrors _select_facility_by_text: exact label first, then contains; the selection is confirmed
+    only when the dropdown shows exactly the chosen option's label. The menu is opened with the strategy
+    that worked this session (see _open_facility_dropdown). Returns the selected facility's label, or None
+    when the fast path can't be used or didn't confirm the selection; the caller falls back to the element
+    path. A query missing from the index, or a selection that didn't take, rebuilds the index (the option
+    list can change during a long --watch session).
+    """
+    from automation.ui_selectors import UI_SELECTORS
+    sel = UI_SELECTORS.get("facility_select", {})
+    btn_css = sel.get("button")
+    if not btn_css:
+        return None
+    query = _normalize_label(label_text)
+    label = None
+    for refresh in (False, True):
+        index = _facility_index(driver, timeout=timeout, refresh=refresh)
+        if not index:
+            return None
+        by_label = index["by_label"]
+        label = query if query in by_label else next((lbl for lbl in by_label if query in lbl), None)
+        if label is not None:
+            break
+        LOGGER.info("Facility '%s' not in index%s. Available: %s", label_text, " after refresh" if refresh else "", index["labels"])
+    if label is None:
+        return None
+    result: dict = {}
+    for attempt in range(2):
+        try:
+            result = driver.execute_async_script(
+                _FACILITY_SELECT_JS,
+                btn_css,
+                sel.get("options", "[role='option'], .composable-select__option"),
+                sel.get("selection_text"),
+                by_label[label],
+                label,
+                getattr(driver, "_facility_open_strategy", None),
+                int(timeout * 1000),
+            ) or {}
+        except Exception:
+            LOGGER.debug("Indexed facility selection script failed.", exc_info=True)
+            return None
+        # The menu needs an opening strategy the script can't replay (keys, other triggers): open it the
+        # usual way, then let the script select from the open menu
+        if result.get("reason") != "closed" or attempt or not _open_facility_dropdown(driver, timeout=timeout):
+            break
+    if result.get("ok"):
+        LOGGER.info("Facility '%s' selected via index (selection='%s').", label_text, result.get("selection"))
+        return result.get("selection") or index["labels"][by_label[label]]
+    LOGGER.info("Indexed facility selection failed for '%s': %s", label_text, result.get("reason"))
+    if result.get("reason") in ("option-moved", "selection-not-updated"):
+        # Rebuilt on the next selection
+        setattr(driver, "_facility_index", None)
+    try:
+        driver.switch_to.active_element.send_keys(Keys.ESCAPE)
+    except Exception:
+        pass
+    return None
+
+
 def _select_facility_by_text(driver: WebDriver, label_text: str, timeout: int = 10) -> bool:
     """Open facility dropdown and select the option that matches the label text (case-insensitive contains).
 
+    Tries the one-round-trip indexed selection first; the element-by-element path below is the fallback.
     Returns True on selection success. Logs available options when selection fails.
     """
     target_text_norm = (label_text or "").strip().lower()
     if not target_text_norm:
         return False
+    # Already selected: one text read instead of opening the menu. Exact label only, so a short query
+    # ("North") never skips selection while a different facility containing it is current.
+    current_text = _get_current_facility_text(driver)
+    if current_text and _normalize_label(current_text) == _normalize_label(label_text):
+        LOGGER.info("Facility '%s' already selected; skipping.", label_text)
+        view_state(driver).facility = " ".join(current_text.split())
+        return True
+    selected = _select_facility_via_index(driver, label_text, timeout=timeout)
+    if selected:
+        view_state(driver).facility = " ".join(selected.split())
+        return True
 
     # Try opening quickly up to three times with short timeouts for responsiveness
     for attempt in range(1, 4):
@@ -1662,6 +2706,7 @@ def _select_facility_by_text(driver: WebDriver, label_text: str, timeout: int =
                     or target_text_norm in (_get_current_facility_text(d) or "").strip().lower()
                 )
             )
+            view_state(driver).facility = " ".join(_get_current_facility_text(driver).split()) or label_text
             return True
         except Exception:
             # Log current selection text and available options for diagnostics
@@ -1677,6 +2722,12 @@ def _select_facility_by_text(driver: WebDriver, label_text: str, timeout: int =
 def _get_available_hormone_centers(driver: WebDriver, timeout: int = 10, keyword: str = "hormone center") -> list[str]:
     """Return list of visible facility option texts containing the keyword (default: 'hormone center')."""
     centers: list[str] = []
+    index = _facility_index(driver, timeout=timeout)
+    if index:
+        for t in index["labels"]:
+            if t and keyword.lower() in t.lower() and t not in centers:
+                centers.append(t)
+        return centers
     if not _open_facility_dropdown(driver, timeout=timeout):
         return centers
     opts = _list_facility_options(driver, timeout=timeout)
@@ -1698,7 +2749,13 @@ def _get_available_hormone_centers(driver: WebDriver, timeout: int = 10, keyword
     return centers
 
 
-def run_for_each_hormone_center(driver: WebDriver, date_offset_days: int = -1, staging_dir: Optional[Path] = None) -> None:
+def run_for_each_hormone_center(
+    driver: WebDriver,
+    date_offset_days: int = -1,
+    staging_dir: Optional[Path] = None,
+    skip_click_schedule: bool = False,
+    processed_patients: Optional[set[str]] = None,
+) -> None:
     """Iterate each Hormone Center from the scheduler facilities dropdown and process patients for each.
 
     Steps per center:
@@ -1709,7 +2766,8 @@ def run_for_each_hormone_center(driver: WebDriver, date_offset_days: int = -1, s
     """
     # We'll navigate to Schedule per center iteration to ensure toolbar present
     # Ensure Schedule once upfront so the toolbar is present for the first selection
-    click_schedule(driver)
+    if not skip_click_schedule:
+        click_schedule(driver)
     centers = _get_available_hormone_centers(driver, timeout=12, keyword="hormone center")
     if not centers:
         LOGGER.info("No Hormone Center options found in facilities dropdown.")
@@ -1736,6 +2794,7 @@ def run_for_each_hormone_center(driver: WebDriver, date_offset_days: int = -1, s
                 staging_dir=staging_dir,
                 skip_click_schedule=True,
                 skip_tabs_and_date=True,
+                processed_patients=processed_patients,
             )
         except Exception:
             LOGGER.debug("Error while processing center '%s'", label, exc_info=True)
@@ -1746,6 +2805,8 @@ def run_for_named_hormone_centers(
     center_names: list[str],
     date_offset_days: int = -1,
     staging_dir: Optional[Path] = None,
+    skip_click_schedule: bool = False,
+    processed_patients: Optional[set[str]] = None,
 ) -> None:
     """Select and process one or more specific Hormone Center names.
 
@@ -1755,7 +2816,8 @@ def run_for_named_hormone_centers(
         LOGGER.info("No center names provided; nothing to do.")
         return
     # Ensure Schedule once upfront so the toolbar is present for the first selection
-    click_schedule(driver)
+    if not skip_click_schedule:
+        click_schedule(driver)
     # Step 2: Change the date as required (once for the entire run)
     select_relative_date_in_datepicker(driver, offset_days=date_offset_days)
 
@@ -1784,14 +2846,276 @@ def run_for_named_hormone_centers(
                 staging_dir=staging_dir,
                 skip_click_schedule=True,
                 skip_tabs_and_date=True,
+                processed_patients=processed_patients,
             )
         except Exception:
             LOGGER.debug("Error while processing requested center '%s'", name, exc_info=True)
 
+
+def run_for_date_range(
+    driver: WebDriver,
+    date_offsets: list[int],
+    center_names: Optional[list[str]] = None,
+    all_centers: bool = False,
+    staging_dir: Optional[Path] = None,
+) -> None:
+    """Backfill several days in one login session, looping date x facility.
+
+    date_offsets are relative to today (e.g. [-7, ..., -1]). The schedule view is opened once and the
+    date picker jumps straight to each day (falling back to shifting from the currently shown day).
+    Patients appearing on several days in the window are processed only once.
+    """
+    if not date_offsets:
+        LOGGER.info("No dates provided; nothing to do.")
+        return
+    processed: set[str] = set()
+    click_schedule(driver)
+    click_appointments_tab(driver)
+    current_offset = 0
+    for idx, offset in enumerate(date_offsets, start=1):
+        try:
+            # Patient flows leave the scheduler; come back before shifting the date again
+            if idx > 1:
+                click_schedule(driver)
+            LOGGER.info("Backfill date [%s/%s]: offset=%s", idx, len(date_offsets), offset)
+            target = date.today() + timedelta(days=offset)
+            if not select_date_in_datepicker(driver, target):
+                select_relative_date_in_datepicker(driver, offset_days=offset - current_offset)
+            current_offset = offset
+            if center_names:
+                run_for_named_hormone_centers(
+                    driver,
+                    center_names,
+                    date_offset_days=0,
+                    staging_dir=staging_dir,
+                    skip_click_schedule=True,
+                    processed_patients=processed,
+                )
+            elif all_centers:
+                run_for_each_hormone_center(
+                    driver,
+                    date_offset_days=0,
+                    staging_dir=staging_dir,
+                    skip_click_schedule=True,
+                    processed_patients=processed,
+                )
+            else:
+                navigate_after_login(
+                    driver,
+                    date_offset_days=0,
+                    staging_dir=staging_dir,
+                    skip_click_schedule=True,
+                    processed_patients=processed,
+                )
+        except Exception:
+            LOGGER.debug("Error while processing date offset %s", offset, exc_info=True)
+    LOGGER.info("Backfill complete | dates=%s | unique patients=%s", len(date_offsets), len(processed))
+
+
+def run_populate_phase(driver: WebDriver, staging_dir: Path) -> None:
+    """Write summaries for every patient in the run manifest whose intake was extracted but not yet populated.
+
+    Summary pages are opened straight from the hrefs recorded at harvest time, so no scheduler, facility
+    or date navigation is needed. Populated patients' files move to processed as in the full flow; a
+    partial or failed populate leaves them in staging, so the next populate run picks the patient up again.
+    """
+    manifest = get_run_manifest()
+    if manifest is None:
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] Populate phase needs a run manifest.")
+        return
+    pending = [(pid, entry) for pid, entry in manifest.pending(POPULATE) if entry.get("href")]
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [INFO] Populate phase: {len(pending)} patient(s) to write.")
+    catalog = get_catalog()
+    for idx, (patient_id, entry) in enumerate(pending, start=1):
+        if catalog is not None:
+            catalog.visit(patient_id, facility=entry.get("facility"), date=entry.get("date"), href=entry.get("href"))
+        deadline = patient_deadline(label=patient_id)
+        get_breaker_board().begin_patient()
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [PATIENT] {patient_id} | Start populate [{idx}/{len(pending)}]")
+        try:
+            status = _populate_summary(driver, patient_id, entry["href"], staging_dir / f"{patient_id}-intake-details.json", deadline)
+        except Exception as e:
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [ERROR] {patient_id} | Populate error: {e}")
+            manifest.stage(patient_id, POPULATE, "failed")
+            if catalog is not None:
+                catalog.stage(patient_id, POPULATE, "failed", detail=str(e))
+            continue
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [END] End populate idx={idx}, patient_id={patient_id} ({status})")
+        if status == OK:
+            _finish_patient(staging_dir, patient_id)
+        collect_network_stats(driver)
+        save_latency_store()
+
+
+def _load_watch_state(
+    state_path: Path, keep_days: int = 30
+) -> tuple[set[tuple[str, str]], dict[tuple[str, str], tuple[int, float]]]:
+    """Load persisted (date, patient_id) pairs and pending rechecks, dropping dates older than keep_days.
+
+    Rechecks map a pair whose flow didn't finish (no intake yet, summary not fully written) to
+    (attempts, epoch seconds of the next attempt).
+    """
+    cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+    raw = load_json(state_path, default={}) or {}
+    pairs = set()
+    for item in raw.get("processed", []) or []:
+        try:
+            day, pid = str(item[0]), str(item[1])
+        except Exception:
+            continue
+        if day >= cutoff:
+            pairs.add((day, pid))
+    rechecks: dict[tuple[str, str], tuple[int, float]] = {}
+    for item in raw.get("recheck", []) or []:
+        try:
+            day, pid, attempts, next_at = str(item[0]), str(item[1]), int(item[2]), float(item[3])
+        except Exception:
+            continue
+        if day >= cutoff and (day, pid) not in pairs:
+            rechecks[(day, pid)] = (attempts, next_at)
+    return pairs, rechecks
+
+
+def _save_watch_state(
+    state_path: Path,
+    processed: set[tuple[str, str]],
+    rechecks: Optional[dict[tuple[str, str], tuple[int, float]]] = None,
+) -> None:
+    data = {
+        "processed": sorted([list(p) for p in processed]),
+        "recheck": sorted([[day, pid, attempts, round(next_at, 1)] for (day, pid), (attempts, next_at) in (rechecks or {}).items()]),
+    }
+    try:
+        save_json_atomic(state_path, data)
+    except Exception:
+        LOGGER.warning("Failed to persist watch state to %s", state_path, exc_info=True)
+
+
+def run_watch(
+    driver: WebDriver,
+    interval_seconds: int,
+    center_names: Optional[list[str]] = None,
+    all_centers: bool = False,
+    date_offset_days: int = 0,
+    staging_dir: Optional[Path] = None,
+    state_path: Optional[Path] = None,
+    refresh_every: int = 10,
+    max_polls: Optional[int] = None,
+    recheck_seconds: int = 900,
+) -> None:
+    """Keep the session open and periodically process only newly arrived appointments.
+
+    Each poll re-reads the appointments table (per facility when centers are given) and runs the patient
+    flow only for (date, patient_id) pairs not yet in the persisted state file. When nothing changed a poll
+    is a single table read; the Schedule view is re-opened only after patient flows left it, and every
+    refresh_every polls to pick up server-side changes. Stops on Ctrl+C (or after max_polls).
+
+    A patient whose flow didn't finish (no intake yet, summary not fully written) is tried again after
+    recheck_seconds, doubling with every further miss up to 8x, instead of on every poll; the rechecks
+    are kept in the state file too.
+    """
+    state_path = state_path or (default_state_dir() / "watch-processed.json")
+    processed, rechecks = _load_watch_state(state_path)
+    LOGGER.info(
+        "Watch | interval=%ss | known pairs=%s | rechecks=%s | state=%s",
+        interval_seconds, len(processed), len(rechecks), state_path,
+    )
+    on_schedule = False
+    poll = 0
+    try:
+        while max_polls is None or poll < max_polls:
+            poll += 1
+            if not on_schedule or (refresh_every and poll % refresh_every == 0):
+                click_schedule(driver, force=True)
+                click_appointments_tab(driver)
+                ensure_filter_button_checked(driver)
+                on_schedule = True
+            # Follow the calendar: a watch running past midnight moves on to the new day
+            target = date.today() + timedelta(days=date_offset_days)
+            shown = _read_datepicker_date(driver)
+            if shown is None:
+                # Unreadable picker: shift once relative to today, as single runs do
+                if poll == 1:
+                    select_relative_date_in_datepicker(driver, offset_days=date_offset_days)
+            elif shown != target and not select_date_in_datepicker(driver, target):
+                LOGGER.info("Watch | could not select %s; retrying next poll.", target.isoformat())
+                on_schedule = False
+                time.sleep(interval_seconds)
+                continue
+            day_key = target.isoformat()
+            # The patient flows record this as the appointment date (manifest, catalog)
+            view_state(driver).date = day_key
+            centers: list[Optional[str]] = list(center_names or [])
+            if not centers and all_centers:
+                centers = list(_get_available_hormone_centers(driver, timeout=12, keyword="hormone center"))
+            if not centers:
+                centers = [None]
+            new_total = 0
+            for label in centers:
+                try:
+                    if not on_schedule:
+                        click_schedule(driver)
+                        on_schedule = True
+                    if label:
+                        if not _select_facility_by_text(driver, label, timeout=10):
+                            LOGGER.info("Watch | center '%s' not selectable; skipping this poll.", label)
+                            continue
+                        _wait_for_data_load(driver, timeout=20)
+                        click_appointments_tab(driver)
+                    links = print_patient_links_from_table(driver)
+                    new_links = []
+                    now = time.time()
+                    for href in links:
+                        pid = _extract_patient_id(href)
+                        if pid and (day_key, pid) not in processed and rechecks.get((day_key, pid), (0, 0.0))[1] <= now:
+                            new_links.append((href, pid))
+                    if not new_links:
+                        continue
+                    LOGGER.info("Watch | %s new appointment(s) on %s%s", len(new_links), day_key, f" at '{label}'" if label else "")
+                    new_total += len(new_links)
+                    for idx, (href, pid) in enumerate(new_links, start=1):
+                        on_schedule = False
+                        next_href = new_links[idx][0] if idx < len(new_links) else None
+                        if _process_patient(driver, href, idx, len(new_links), staging_dir=staging_dir, next_href=next_href):
+                            processed.add((day_key, pid))
+                            rechecks.pop((day_key, pid), None)
+                        else:
+                            # No intake yet (or summary not fully written): back off before the next attempt
+                            attempts = rechecks.get((day_key, pid), (0, 0.0))[0] + 1
+                            delay = recheck_seconds * min(2 ** (attempts - 1), 8)
+                            rechecks[(day_key, pid)] = (attempts, time.time() + delay)
+                            LOGGER.info("Watch | %s not finished (attempt %s); rechecking in %ss.", pid, attempts, delay)
+                        _save_watch_state(state_path, processed, rechecks)
+                    _discard_prefetched_timeline(driver)
+                except Exception:
+                    LOGGER.debug("Watch | error while polling center '%s'", label, exc_info=True)
+                    on_schedule = False
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [WATCH] Poll {poll} done | new={new_total} | next in {interval_seconds}s")
+            if max_polls is None or poll < max_polls:
+                time.sleep(interval_seconds)
+    except KeyboardInterrupt:
+        LOGGER.info("Watch stopped by user after %s poll(s).", poll)
+
 # --- Move generic handler and wrappers to top-level scope ---
-def populate_section_generic(driver, summary_text, section_key, timeout=15, debug_capture=None) -> bool:
+def _breaker_failure(breakers, deadline: Optional[Deadline], error: str, *names: str) -> None:
+    """Count a failure on the named circuits, unless the patient budget ran out.
+
+    A wait that the budget cut short says nothing about the UI, so it must not open breakers for the
+    patients that follow.
+    """
+    if deadline is not None and deadline.expired:
+        LOGGER.info("Not counting '%s' against %s: patient time budget exhausted.", error, ", ".join(names))
+        return
+    for name in names:
+        breakers.failure(name, error)
+
+
+def populate_section_generic(driver, summary_text, section_key, timeout=15, debug_capture=None, deadline=None) -> bool:
     """
     Generic handler to populate a summary into a UI section using selectors from UI_SELECTORS.
+    Waits are limited by deadline (per-patient budget) when given. The section and each of its selectors
+    have a circuit breaker: once one keeps failing, the section is skipped (apart from periodic probes)
+    instead of paying the full wait for every patient.
     """
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
@@ -1809,7 +3133,16 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
     if not summary_text.strip():
         print(f"[GENERIC] {section_key}: Skipped, summary is empty.")
         return False
-    wait = WebDriverWait(driver, timeout + 10)
+    if deadline is not None and deadline.expired:
+        print(f"[GENERIC] {section_key}: Skipped, patient time budget exhausted.")
+        return False
+    breakers = get_breaker_board()
+    section_circuit = f"section:{section_key}"
+    textarea_role = "textarea_candidates" if "textarea_candidates" in selectors else "textarea"
+    selector_circuits = [f"selector:{section_key}.{role}" for role in ("add_button", textarea_role, "save_button")]
+    if not breakers.allow(section_circuit, *selector_circuits):
+        print(f"[GENERIC] {section_key}: Skipped, circuit open after repeated failures.")
+        return False
     _dismiss_any_popups(driver)
     # --- Robust section/add/edit button search ---
     section_elems = driver.find_elements(By.CSS_SELECTOR, selectors["section_container"])
@@ -1872,6 +3205,8 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
                 break
     if not found_btn:
         print(f"[GENERIC] {section_key}: Could not find any visible/enabled add or edit button in any section. Capturing debug artifacts.")
+        _breaker_failure(breakers, deadline, "no add/edit button", f"selector:{section_key}.add_button")
+        _breaker_failure(breakers, deadline, "no add/edit button", section_circuit)
         if debug_capture:
             debug_capture(driver, f"{section_key}-no-add-or-edit-btn")
         return False
@@ -1883,6 +3218,7 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
             driver.execute_script("arguments[0].click();", found_btn)
         except Exception:
             print(f"[GENERIC] {section_key}: Could not click button. Skipping population.")
+            _breaker_failure(breakers, deadline, "add/edit button click failed", section_circuit)
             if debug_capture:
                 debug_capture(driver, f"{section_key}-click-fail")
             return False
@@ -1892,7 +3228,7 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
         for css_sel in selectors["textarea_candidates"]:
             try:
                 print(f"[GENERIC] {section_key}: Searching for textarea candidate: {css_sel}")
-                textarea = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, css_sel)))
+                textarea = timed_wait(driver, f"section.{section_key}.textarea", timeout + 10, EC.visibility_of_element_located((By.CSS_SELECTOR, css_sel)), deadline=deadline)
                 print(f"[GENERIC] {section_key}: Textarea found: {css_sel}")
                 if textarea:
                     break
@@ -1902,15 +3238,19 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
     else:
         try:
             print(f"[GENERIC] {section_key}: Searching for textarea: {selectors['textarea']}")
-            textarea = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, selectors["textarea"])))
+            textarea = timed_wait(driver, f"section.{section_key}.textarea", timeout + 10, EC.visibility_of_element_located((By.CSS_SELECTOR, selectors["textarea"])), deadline=deadline)
             print(f"[GENERIC] {section_key}: Textarea found: {selectors['textarea']}")
         except Exception:
             print(f"[GENERIC] {section_key}: Textarea not found. Skipping population.")
+            _breaker_failure(breakers, deadline, "textarea not found", f"selector:{section_key}.textarea")
+            _breaker_failure(breakers, deadline, "textarea not found", section_circuit)
             if debug_capture:
                 debug_capture(driver, f"{section_key}-no-textarea")
             return False
     if not textarea:
         print(f"[GENERIC] {section_key}: Textarea not found. Skipping population.")
+        _breaker_failure(breakers, deadline, "textarea not found", f"selector:{section_key}.{textarea_role}")
+        _breaker_failure(breakers, deadline, "textarea not found", section_circuit)
         if debug_capture:
             debug_capture(driver, f"{section_key}-no-textarea")
         return False
@@ -1927,6 +3267,7 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
         driver.execute_script("arguments[0].blur();", textarea)
     except Exception as e:
         print(f"[GENERIC] {section_key}: Failed to fill textarea: {e}")
+        _breaker_failure(breakers, deadline, "failed to fill textarea", section_circuit)
         if debug_capture:
             debug_capture(driver, f"{section_key}-sendkeys-fail")
         return False
@@ -1934,11 +3275,13 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
     _dismiss_any_popups(driver)
     try:
         print(f"[GENERIC] {section_key}: Searching for save button: {selectors['save_button']}")
-        save_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selectors["save_button"])))
+        save_btn = timed_wait(driver, f"section.{section_key}.save", timeout + 10, EC.element_to_be_clickable((By.CSS_SELECTOR, selectors["save_button"])), deadline=deadline)
         print(f"[GENERIC] {section_key}: Save button found: {selectors['save_button']}")
         save_btn.click()
     except Exception as e:
         print(f"[GENERIC] {section_key}: Save button not found: {e}")
+        _breaker_failure(breakers, deadline, "save button not found", f"selector:{section_key}.save_button")
+        _breaker_failure(breakers, deadline, "save button not found", section_circuit)
         if debug_capture:
             debug_capture(driver, f"{section_key}-no-save-btn")
         return False
@@ -1951,20 +3294,21 @@ def populate_section_generic(driver, summary_text, section_key, timeout=15, debu
             _wait_for_data_load(driver, timeout=5)
         except Exception:
             pass
+    breakers.success(section_circuit, *selector_circuits)
     print(f"[GENERIC] Summary population complete for section '{section_key}'.")
     return True
 
-def _populate_social_history(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "social_history", timeout)
-    return populate_section_generic(driver, summary_text, "social_history", timeout)
-    return populate_section_generic(driver, summary_text, "social_history", timeout)
+def _populate_social_history(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "social_history", timeout, deadline=deadline)
+    return populate_section_generic(driver, summary_text, "social_history", timeout, deadline=deadline)
+    return populate_section_generic(driver, summary_text, "social_history", timeout, deadline=deadline)
 
-def _populate_ongoing_medical_problems(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout)
+def _populate_ongoing_medical_problems(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout, deadline=deadline)
 
-def _populate_major_events(driver, summary_text, timeout=15) -> bool:
-    return populate_section_generic(driver, summary_text, "major_events", timeout)
-    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout)
+def _populate_major_events(driver, summary_text, timeout=15, deadline=None) -> bool:
+    return populate_section_generic(driver, summary_text, "major_events", timeout, deadline=deadline)
+    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout, deadline=deadline)
     # TODO: Implement family history summary builder
     return ""
     # TODO: Implement social history summary builder
@@ -1973,8 +3317,8 @@ def _populate_major_events(driver, summary_text, timeout=15) -> bool:
     return ""
     # TODO: Implement ongoing medical problems summary builder
     return ""
-    return populate_section_generic(driver, summary_text, "major_events", timeout)
-    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout)
+    return populate_section_generic(driver, summary_text, "major_events", timeout, deadline=deadline)
+    return populate_section_generic(driver, summary_text, "ongoing_medical_problems", timeout, deadline=deadline)
     # TODO: Implement family history summary builder
     return ""
     # TODO: Implement social history summary builder
@@ -1983,7 +3327,7 @@ def _populate_major_events(driver, summary_text, timeout=15) -> bool:
     return ""
     # TODO: Implement ongoing medical problems summary builder
     return ""
-    return populate_section_generic(driver, summary_text, "major_events", timeout)
+    return populate_section_generic(driver, summary_text, "major_events", timeout, deadline=deadline)
 
     try:
         rows = table.find_elements(By.CSS_SELECTOR, "tbody tr")
@@ -2011,27 +3355,29 @@ def _populate_major_events(driver, summary_text, timeout=15) -> bool:
     return False
 
 
-def _click_first_intake_document_type(driver: WebDriver, timeout: int = 20) -> bool:
+# First document-type cell in the timeline events table whose text contains 'intake' (case-insensitive)
+_INTAKE_ROW_XPATH = (
+    "//*[@data-element='timeline-events-table']"
+    "//*[ @data-element='document-type'"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' text-color-link ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' text-truncate ')"
+    " and contains(translate(normalize-space(string(.)), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'intake')"
+    "][1]"
+)
+
+
+def _click_first_intake_document_type(driver: WebDriver, timeout: int = 20, name: str = "intake", deadline: Optional[Deadline] = None) -> bool:
     """Within timeline events table, find the first element with
     data-element="document-type" and classes "text-color-link text-truncate"
     whose text contains 'intake' (case-insensitive), then click it.
 
+    timeout is the ceiling for the adaptive waits named after name.
     Returns True if clicked; else False.
     """
-    wait = WebDriverWait(driver, timeout)
     # Ensure table exists
-    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "[data-element='timeline-events-table']")))
-    # XPath to find first matching element inside the table
-    intake_xpath = (
-        "//*[@data-element='timeline-events-table']"
-        "//*[ @data-element='document-type'"
-        " and contains(concat(' ', normalize-space(@class), ' '), ' text-color-link ')"
-        " and contains(concat(' ', normalize-space(@class), ' '), ' text-truncate ')"
-        " and contains(translate(normalize-space(string(.)), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'intake')"
-        "][1]"
-    )
+    timed_wait(driver, f"{name}.table", timeout, EC.presence_of_element_located((By.CSS_SELECTOR, "[data-element='timeline-events-table']")), deadline=deadline)
     try:
-        el = wait.until(EC.element_to_be_clickable((By.XPATH, intake_xpath)))
+        el = timed_wait(driver, f"{name}.row", timeout, EC.element_to_be_clickable((By.XPATH, _INTAKE_ROW_XPATH)), deadline=deadline)
     except TimeoutException:
         return False
     try:
@@ -2042,18 +3388,23 @@ def _click_first_intake_document_type(driver: WebDriver, timeout: int = 20) -> b
         el.click()
     except Exception:
         driver.execute_script("arguments[0].click();", el)
-    _wait_for_data_load(driver, timeout=30)
+    _wait_for_data_load(driver, timeout=30, name="document", deadline=deadline)
     return True
 
 
-def _download_intake_document_if_available(driver: WebDriver, timeout: int = 15, staging_dir: Optional[Path] = None, patient_id: Optional[str] = None) -> Optional[Path]:
+def _download_intake_document_if_available(
+    driver: WebDriver,
+    timeout: int = 15,
+    staging_dir: Optional[Path] = None,
+    patient_id: Optional[str] = None,
+    deadline: Optional[Deadline] = None,
+) -> Optional[Path]:
     """Click the download button for the intake document if present.
 
     Looks for [data-element='download-doc-btn'] and attempts to click it. Returns True if a click was triggered.
     """
-    wait = WebDriverWait(driver, timeout)
     try:
-        btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-element='download-doc-btn']")))
+        btn = timed_wait(driver, "download.button", timeout, EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-element='download-doc-btn']")), deadline=deadline)
     except TimeoutException:
         return None
     # Clean Downloads of old intake*.pdf files (case insensitive) before triggering a new download
@@ -2077,7 +3428,7 @@ def _download_intake_document_if_available(driver: WebDriver, timeout: int = 15,
         driver.execute_script("arguments[0].click();", btn)
     # Wait for the download to complete and move it to staging if provided
     try:
-        downloaded = _wait_for_intake_pdf(downloads_dir, max_wait=40)
+        downloaded = _wait_for_intake_pdf(downloads_dir, max_wait=40, deadline=deadline)
         if downloaded and staging_dir:
             try:
                 staging_dir.mkdir(parents=True, exist_ok=True)
@@ -2112,9 +3463,14 @@ def _cleanup_old_intake_pdfs(downloads_dir: Path) -> None:
                 continue
 
 
-def _wait_for_intake_pdf(downloads_dir: Path, max_wait: int = 40) -> Optional[Path]:
-    """Wait until an intake*.pdf appears in Downloads (and is not a temp .crdownload)."""
-    end = time.time() + max_wait
+def _wait_for_intake_pdf(downloads_dir: Path, max_wait: int = 40, deadline: Optional[Deadline] = None) -> Optional[Path]:
+    """Wait until an intake*.pdf appears in Downloads (and is not a temp .crdownload).
+
+    max_wait is the ceiling; the effective wait adapts to recently observed download times and is
+    limited by deadline's remaining budget.
+    """
+    start = time.time()
+    end = start + clamp_timeout(adaptive_timeout("download.intake_pdf", max_wait), deadline)
     candidate: Optional[Path] = None
     while time.time() < end:
         pdfs = [p for p in downloads_dir.glob("*.pdf")
@@ -2124,6 +3480,7 @@ def _wait_for_intake_pdf(downloads_dir: Path, max_wait: int = 40) -> Optional[Pa
             latest_pdf = max(pdfs, key=lambda p: p.stat().st_mtime)
             crdl = latest_pdf.with_suffix(latest_pdf.suffix + ".crdownload")
             if not crdl.exists():
+                record_latency("download.intake_pdf", time.time() - start)
                 return latest_pdf
         time.sleep(0.5)
     return candidate
@@ -2195,7 +3552,7 @@ def _dismiss_any_popups(driver: WebDriver, timeout: int = 5) -> int:
     return True
 
 
-def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int = 15) -> bool:
+def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int = 15, deadline=None) -> bool:
     """Open social/behavioral health editor, populate, save.
 
     Uses button [data-element='behavioral-health-field-add-button'] and expects a textarea analogous to family history field.
@@ -2203,6 +3560,15 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
     """
     if not summary_text.strip():
         return False
+    if deadline is not None:
+        if deadline.expired:
+            return False
+        timeout = max(1, int(deadline.clamp(timeout)))
+    breakers = get_breaker_board()
+    circuits = ("section:social_history", "selector:social_history.add_button", "selector:social_history.textarea", "selector:social_history.save_button")
+    if not breakers.allow(*circuits):
+        LOGGER.info("SocialHistory | action=skipped | reason=circuit-open")
+        return False
     wait = WebDriverWait(driver, timeout)
     # Dismiss any popups before starting
     _dismiss_any_popups(driver)
@@ -2284,6 +3650,8 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
         except Exception:
             editing_mode_entered = False
     if not editing_mode_entered:
+        _breaker_failure(breakers, deadline, "no add button or existing item", "selector:social_history.add_button")
+        _breaker_failure(breakers, deadline, "could not open editor", "section:social_history")
         return False
 
     # Try social specific textarea first (placeholder selector guess); fallback to family-health-history-text-area
@@ -2301,6 +3669,8 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
         except Exception:
             continue
     if not textarea:
+        _breaker_failure(breakers, deadline, "textarea not found", "selector:social_history.textarea")
+        _breaker_failure(breakers, deadline, "textarea not found", "section:social_history")
         return False
     _dismiss_any_popups(driver)
     try:
@@ -2376,6 +3746,8 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
             len(summary_text),
             btn_html,
         )
+        _breaker_failure(breakers, deadline, "save button missing or disabled", "selector:social_history.save_button")
+        _breaker_failure(breakers, deadline, "save button missing or disabled", "section:social_history")
         return False
     try:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", save_btn)
@@ -2401,6 +3773,7 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
         save_selector_used,
         len(summary_text),
     )
+    breakers.success(*circuits)
     # Post-save stabilization without fixed sleep
     try:
         WebDriverWait(driver, 5).until(
@@ -2551,4 +3924,3 @@ def _populate_social_history(driver: WebDriver, summary_text: str, timeout: int
             snippet,
         )
     return True
-
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import ctypes
+import io
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # parallel path needs pdfium to split and rasterize; callers fall back to one extractor run
+    np = None
+    pdfium = None
+    pdfium_c = None
+
+# Worker-side state: pages rasterized by the worker, keyed by the single-page PDF the extractor is given
+_PRERENDERED: dict[str, list] = {}
+_ORIGINAL_CONVERT = None
+# Worker-side render target, reused for every page and grown to the largest page seen
+_RENDER_BUFFER = None
+
+# Parent-side pool, kept for the whole run so workers load the extractor (and OCR models) once
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_KEY: Optional[tuple[int, str]] = None
+
+
+def available() -> bool:
+    return pdfium is not None and np is not None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB: ru_maxrss on POSIX, the peak working set on Windows.
+
+    On Windows psutil's peak_wset is used when installed, else GetProcessMemoryInfo directly. None when
+    neither works (psutil only reports a peak on Windows; elsewhere its rss is current).
+    """
+    if os.name == "nt":
+        try:
+            import psutil
+            peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+            return peak / 2**20 if peak else None
+        except ImportError:
+            return _windows_peak_working_set_mb()
+        except Exception:
+            return None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+
+def _windows_peak_working_set_mb() -> Optional[float]:
+    """PeakWorkingSetSize of this process via psapi's GetProcessMemoryInfo (Windows without psutil)."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        get_info.restype = wintypes.BOOL
+        if not get_info(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / 2**20
+    except Exception:
+        return None
+
+
+def resolve_workers(configured: int) -> int:
+    """configured <= 0 means one worker per core."""
+    if configured > 0:
+        return configured
+    return os.cpu_count() or 1
+
+
+def _key(path) -> str:
+    return os.path.normcase(os.path.abspath(str(path)))
+
+
+def _convert_from_path(pdf_path, *args, **kwargs):
+    """Stand-in for pdf2image.convert_from_path: hands back the page this worker already rendered."""
+    images = _PRERENDERED.get(_key(pdf_path))
+    if images is not None:
+        return list(images)
+    return _ORIGINAL_CONVERT(pdf_path, *args, **kwargs)
+
+
+def _init_worker(repo_path: str) -> None:
+    global _ORIGINAL_CONVERT
+    sys.path.insert(0, repo_path)
+    try:
+        import pdf2image
+        import pdf2image.pdf2image as pdf2image_impl
+        _ORIGINAL_CONVERT = pdf2image.convert_from_path
+        # Patch before the extractor is imported so its "from pdf2image import convert_from_path" binds to ours
+        pdf2image.convert_from_path = _convert_from_path
+        pdf2image_impl.convert_from_path = _convert_from_path
+    except Exception:
+        LOGGER.warning("Could not install pre-rendered page hook; pages will be rasterized by pdf2image.", exc_info=True)
+    try:
+        import extractor  # noqa: F401  # warm up once per worker
+    except Exception:
+        LOGGER.warning("Extractor import failed in OCR worker (repo %s).", repo_path, exc_info=True)
+
+
+def _render(page, dpi: int):
+    """Render page into the worker's reusable buffer; the returned RGB image is the only copy made."""
+    global _RENDER_BUFFER
+    from PIL import Image
+
+    scale = dpi / 72.0
+    width = int(page.get_width() * scale + 0.5)
+    height = int(page.get_height() * scale + 0.5)
+    stride = width * 4
+    size = stride * height
+    if _RENDER_BUFFER is None or _RENDER_BUFFER.nbytes < size:
+        _RENDER_BUFFER = np.empty(size, dtype=np.uint8)
+    view = _RENDER_BUFFER[:size]
+    bitmap = pdfium_c.FPDFBitmap_CreateEx(
+        width, height, pdfium_c.FPDFBitmap_BGRx, view.ctypes.data_as(ctypes.c_void_p), stride
+    )
+    try:
+        pdfium_c.FPDFBitmap_FillRect(bitmap, 0, 0, width, height, 0xFFFFFFFF)
+        # Reversed byte order gives RGBX, which PIL can read in place
+        pdfium_c.FPDF_RenderPageBitmap(
+            bitmap, page.raw, 0, 0, width, height, 0, pdfium_c.FPDF_ANNOT | pdfium_c.FPDF_REVERSE_BYTE_ORDER
+        )
+    finally:
+        pdfium_c.FPDFBitmap_Destroy(bitmap)
+    return Image.frombuffer("RGBX", (width, height), view, "raw", "RGBX", stride, 1).convert("RGB")
+
+
+def _extract_page(
+    index: int, page_pdf: str, output_json: str, dpi: int, submitted: float
+) -> tuple[int, Optional[dict], str, dict]:
+    """Worker job: rasterize one single-page PDF at dpi and run the extractor on it.
+
+    Returns (index, data, log, stats); stats carries wall-clock timestamps and the worker's peak RSS so
+    the parent can report dispatch overhead and memory per document.
+    """
+    stats = {"started": time.time(), "submitted": submitted}
+    log = io.StringIO()
+    data: Optional[dict] = None
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        pdf = None
+        try:
+            pdf = pdfium.PdfDocument(page_pdf)
+            page = pdf[0]
+            t0 = time.perf_counter()
+            image = _render(page, dpi)
+            stats["render_s"] = time.perf_counter() - t0
+            page.close()
+            _PRERENDERED[_key(page_pdf)] = [image]
+            from extractor import run_extractor_from_config  # type: ignore
+            data = run_extractor_from_config(pdf_path=page_pdf, output_path=output_json) or {}
+        except Exception as e:
+            print(f"Extractor run failed for page {index + 1}: {e}")
+            data = None
+        finally:
+            _PRERENDERED.pop(_key(page_pdf), None)
+            if pdf is not None:
+                pdf.close()
+    stats["peak_rss_mb"] = peak_rss_mb()
+    stats["finished"] = time.time()
+    return index, data, log.getvalue(), stats
+
+
+def _get_pool(workers: int, repo_path: Path) -> ProcessPoolExecutor:
+    global _POOL, _POOL_KEY
+    key = (workers, str(repo_path))
+    if _POOL is not None and _POOL_KEY != key:
+        shutdown_pool()
+    if _POOL is None:
+        LOGGER.info("Starting OCR pool with %s worker(s).", workers)
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(str(repo_path),))
+        _POOL_KEY = key
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_KEY
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+    _POOL = None
+    _POOL_KEY = None
+
+
+atexit.register(shutdown_pool)
+
+
+def extract_pages(
+    pdf_path: Path,
+    indices: list[int],
+    repo_path: Path,
+    scratch_dir: Path,
+    workers: int,
+    dpi: int,
+) -> dict[int, dict]:
+    """Run the extractor on each page in indices (0-based) across the pool.
+
+    Every page is split into its own PDF under scratch_dir, rasterized at dpi and extracted in a worker.
+    Returns {index: extractor data} for the pages that succeeded; worker logs are printed in page order
+    (into the caller's extractor log), followed by a line with render time, dispatch overhead (time jobs
+    and results spent queued or in transit) and peak RSS. Missing indices failed and are left to the caller.
+    """
+    from automation.pdf_text import write_page_subset
+
+    jobs = []
+    for index in indices:
+        page_pdf = write_page_subset(pdf_path, [index], scratch_dir / f"page-{index + 1:03d}.pdf")
+        jobs.append((index, str(page_pdf), str(scratch_dir / f"page-{index + 1:03d}.json"), dpi))
+
+    results: dict[int, dict] = {}
+    logs: dict[int, str] = {}
+    render_s = ipc_s = 0.0
+    worker_peak = 0.0
+    wall_start = time.perf_counter()
+    try:
+        pool = _get_pool(workers, repo_path)
+        futures = [pool.submit(_extract_page, *job, time.time()) for job in jobs]
+        for fut in as_completed(futures):
+            index, data, log, stats = fut.result()
+            received = time.time()
+            logs[index] = log
+            render_s += stats.get("render_s", 0.0)
+            ipc_s += max(0.0, stats["started"] - stats["submitted"]) + max(0.0, received - stats["finished"])
+            worker_peak = max(worker_peak, stats.get("peak_rss_mb") or 0.0)
+            if data is not None:
+                results[index] = data
+    except BrokenProcessPool as e:
+        LOGGER.warning("OCR pool broke while extracting %s: %s", pdf_path.name, e)
+        print(f"OCR pool broke: {e}")
+        shutdown_pool()
+    for index in sorted(logs):
+        print(f"--- page {index + 1} ---")
+        print(logs[index].rstrip())
+    parent_peak = peak_rss_mb()
+    summary = (
+        f"pages={len(jobs)} ok={len(results)} wall={time.perf_counter() - wall_start:.1f}s "
+        f"render={render_s:.1f}s dispatch={ipc_s:.2f}s "
+        f"peak_rss parent={parent_peak or 0:.0f}MB worker={worker_peak:.0f}MB"
+    )
+    print(f"OCR pool | {summary}")
+    LOGGER.info("OCR pool | %s | %s", pdf_path.name, summary)
+    return results
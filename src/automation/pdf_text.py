@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import ctypes
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # fast path is optional; everything goes to OCR without it
+    pdfium = None
+    pdfium_c = None
+
+# Section headings on the intake forms are printed in capitals, e.g. "FAMILY HISTORY"
+_HEADING_RE = re.compile(r"[A-Z0-9 /&()',\-]{4,80}")
+_QA_RE = re.compile(r"^(?P<q>[^:?]{2,120}[:?])\s+(?P<a>\S.*)$")
+_TICKED = ("☒", "☑", "✓", "✔", "■", "[x]", "[X]", "(x)", "(X)")
+_UNTICKED = ("☐", "□", "[ ]", "( )")
+
+
+@dataclass
+class PageRoute:
+    """How one page is extracted: from its AcroForm fields, its text layer, or by OCR."""
+
+    index: int
+    route: str  # form | text | ocr
+    chars: int = 0
+    fields: int = 0
+    sections: list[dict] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return f"page {self.index + 1}: route={self.route} chars={self.chars} fields={self.fields} sections={len(self.sections)}"
+
+
+def available() -> bool:
+    return pdfium is not None
+
+
+def _is_heading(line: str) -> bool:
+    return bool(_HEADING_RE.fullmatch(line)) and sum(c.isalpha() for c in line) >= 3
+
+
+def _checkbox(line: str) -> Optional[dict]:
+    for mark in _TICKED:
+        if line.startswith(mark):
+            return {"label": line[len(mark):].strip(), "status": "ticked"}
+    for mark in _UNTICKED:
+        if line.startswith(mark):
+            return {"label": line[len(mark):].strip(), "status": "unticked"}
+    return None
+
+
+def _section(sections: dict[str, dict], name: str) -> dict:
+    if name not in sections:
+        sections[name] = {"section": name, "questions": [], "checkboxes": []}
+    return sections[name]
+
+
+def _sections_from_text(text: str, sections: dict[str, dict]) -> None:
+    """Split text-layer lines into the extractor's section/questions/checkboxes structure."""
+    current: Optional[str] = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if _is_heading(line):
+            current = line
+            continue
+        if current is None:
+            continue
+        cb = _checkbox(line)
+        if cb and cb["label"]:
+            _section(sections, current)["checkboxes"].append(cb)
+            continue
+        m = _QA_RE.match(line)
+        # Blank printed answer lines ("Name: ________") are not answers
+        if m and re.search(r"[A-Za-z0-9]", m.group("a")):
+            _section(sections, current)["questions"].append(
+                {"question": m.group("q").rstrip(":").strip(), "answer": m.group("a").strip()}
+            )
+
+
+def _utf16(fn, *args) -> str:
+    size = fn(*args, None, 0)
+    if size <= 2:
+        return ""
+    buf = ctypes.create_string_buffer(size)
+    fn(*args, ctypes.cast(buf, ctypes.POINTER(pdfium_c.FPDF_WCHAR)), size)
+    return buf.raw[: size - 2].decode("utf-16-le", errors="ignore")
+
+
+def _heading_positions(textpage, text: str) -> list[tuple[float, str]]:
+    """(top y, heading) for each heading line on the page, lowest first (PDF y grows upwards)."""
+    positions = []
+    for line in {ln.strip() for ln in text.splitlines() if _is_heading(ln.strip())}:
+        try:
+            searcher = textpage.search(line, match_case=True)
+            occ = searcher.get_next()
+            if occ:
+                positions.append((textpage.get_charbox(occ[0])[3], line))
+        except Exception:
+            continue
+    return sorted(positions)
+
+
+def _sections_from_form(pdf, page, textpage, text: str, sections: dict[str, dict]) -> int:
+    """Add filled AcroForm widgets on page to the section whose heading sits above them; returns the field count."""
+    form = pdf.formenv.raw if getattr(pdf, "formenv", None) is not None else None
+    if form is None:
+        return 0
+    headings = _heading_positions(textpage, text)
+    count = 0
+    for i in range(pdfium_c.FPDFPage_GetAnnotCount(page.raw)):
+        annot = pdfium_c.FPDFPage_GetAnnot(page.raw, i)
+        if not annot:
+            continue
+        try:
+            if pdfium_c.FPDFAnnot_GetSubtype(annot) != pdfium_c.FPDF_ANNOT_WIDGET:
+                continue
+            count += 1
+            rect = pdfium_c.FS_RECTF()
+            pdfium_c.FPDFAnnot_GetRect(annot, ctypes.byref(rect))
+            # Nearest heading above the widget
+            heading = next((h for y, h in headings if y >= rect.top), "FORM FIELDS")
+            label = _utf16(pdfium_c.FPDFAnnot_GetFormFieldAlternateName, form, annot) or \
+                _utf16(pdfium_c.FPDFAnnot_GetFormFieldName, form, annot).split(".")[-1].replace("_", " ")
+            ftype = pdfium_c.FPDFAnnot_GetFormFieldType(form, annot)
+            if ftype in (pdfium_c.FPDF_FORMFIELD_CHECKBOX, pdfium_c.FPDF_FORMFIELD_RADIOBUTTON):
+                status = "ticked" if pdfium_c.FPDFAnnot_IsChecked(form, annot) else "unticked"
+                _section(sections, heading)["checkboxes"].append({"label": label.strip(), "status": status})
+            else:
+                value = _utf16(pdfium_c.FPDFAnnot_GetFormFieldValue, form, annot).strip()
+                if value:
+                    _section(sections, heading)["questions"].append({"question": label.strip(), "answer": value})
+        finally:
+            pdfium_c.FPDFPage_CloseAnnot(annot)
+    return count
+
+
+def route_pages(pdf_path: Path, min_text_chars: int = 200) -> list[PageRoute]:
+    """Decide per page whether its text layer / form fields are enough or it needs OCR.
+
+    A page is taken from its form fields or text only when that yields at least one section with content;
+    image-only pages, and pages whose text layer is just a header/footer, go to OCR.
+    """
+    routes: list[PageRoute] = []
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        try:
+            pdf.init_forms()
+        except Exception:
+            LOGGER.debug("PDF has no form environment.", exc_info=True)
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range() or ""
+                sections: dict[str, dict] = {}
+                fields = _sections_from_form(pdf, page, textpage, text, sections)
+                chars = len(text.strip())
+                if chars >= min_text_chars or fields:
+                    _sections_from_text(text, sections)
+                useful = [s for s in sections.values() if s["questions"] or s["checkboxes"]]
+                if useful:
+                    route = "form" if fields else "text"
+                else:
+                    route = "ocr"
+                routes.append(PageRoute(index, route, chars=chars, fields=fields, sections=useful))
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+    return routes
+
+
+def page_count(pdf_path: Path) -> int:
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def write_page_subset(pdf_path: Path, indices: list[int], dest: Path) -> Path:
+    """Write a PDF holding only the given pages (0-based, in order)."""
+    src = pdfium.PdfDocument(str(pdf_path))
+    out = pdfium.PdfDocument.new()
+    try:
+        out.import_pages(src, pages=list(indices))
+        out.save(str(dest))
+    finally:
+        out.close()
+        src.close()
+    return dest
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from automation.state import load_json, save_json_atomic
+
+LOGGER = logging.getLogger(__name__)
+
+HARVEST = "harvest"
+EXTRACT = "extract"
+POPULATE = "populate"
+ALL = "all"
+PHASES = (HARVEST, EXTRACT, POPULATE, ALL)
+OK = "ok"
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class RunManifest:
+    """What each phase of a run has done per patient, kept in Processing/<run>/manifest.json.
+
+    One entry per patient id with the summary href, facility and date it was found under, and a status per
+    phase (harvest: ok/no_intake, extract: the extraction outcome, populate: ok/partial/failed/no_json),
+    plus the names of the files created for it in staging. The phases read it to find their work, so any phase can be
+    rerun on its own and picks up where it stopped.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        data = load_json(path, default={}) or {}
+        self.created: str = data.get("created") or _now()
+        self.patients: dict[str, dict] = data.get("patients") or {}
+
+    def get(self, patient_id: str) -> dict:
+        return dict(self.patients.get(patient_id) or {})
+
+    def update(self, patient_id: str, **fields) -> None:
+        with self._lock:
+            entry = self.patients.setdefault(patient_id, {})
+            entry.update({k: v for k, v in fields.items() if v is not None})
+            entry["updated"] = _now()
+            self._save()
+
+    def add_artifacts(self, patient_id: str, *names: str) -> None:
+        """Record files created for the patient in staging (by name), so finishing it never scans the folder."""
+        with self._lock:
+            entry = self.patients.setdefault(patient_id, {})
+            artifacts = entry.setdefault("artifacts", [])
+            for name in names:
+                if name and name not in artifacts:
+                    artifacts.append(name)
+            entry["updated"] = _now()
+            self._save()
+
+    def stage(self, patient_id: str, phase: str, status: str, **fields) -> None:
+        self.update(patient_id, **{phase: status}, **fields)
+
+    def pending(self, phase: str) -> list[tuple[str, dict]]:
+        """Patients whose previous phase succeeded but phase itself hasn't, in the order they were found."""
+        previous = {EXTRACT: HARVEST, POPULATE: EXTRACT}.get(phase)
+        return [
+            (pid, dict(entry))
+            for pid, entry in self.patients.items()
+            if entry.get(phase) != OK and (previous is None or entry.get(previous) == OK)
+        ]
+
+    def counts(self, phase: str) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.patients.values():
+            status = entry.get(phase) or "pending"
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def _save(self) -> None:
+        try:
+            save_json_atomic(self.path, {"created": self.created, "patients": self.patients})
+        except Exception:
+            LOGGER.warning("Failed to save run manifest %s", self.path, exc_info=True)
+
+
+# Manifest of the current run; None outside a run (e.g. helpers used on their own)
+_MANIFEST: Optional[RunManifest] = None
+
+
+def configure_run_manifest(path: Path) -> RunManifest:
+    global _MANIFEST
+    _MANIFEST = RunManifest(path)
+    return _MANIFEST
+
+
+def get_run_manifest() -> Optional[RunManifest]:
+    return _MANIFEST
+
+
+def latest_run_dir(processing_root: Path) -> Optional[Path]:
+    """Newest Processing/<timestamp> directory that has a manifest, for phases run without --run-dir."""
+    try:
+        runs = sorted((p for p in processing_root.iterdir() if (p / MANIFEST_NAME).exists()), key=lambda p: p.name)
+    except OSError:
+        return None
+    return runs[-1] if runs else None
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    """Encrypt/decrypt bytes for the current Windows user with DPAPI (CryptProtectData)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class DATA_BLOB(ctypes.Structure):
+        _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+    buf = ctypes.create_string_buffer(data, len(data))
+    blob_in = DATA_BLOB(len(data), ctypes.cast(buf, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DATA_BLOB()
+    crypt32 = ctypes.windll.crypt32  # type: ignore[attr-defined]
+    fn = crypt32.CryptProtectData if protect else crypt32.CryptUnprotectData
+    # CRYPTPROTECT_UI_FORBIDDEN = 0x1
+    if not fn(ctypes.byref(blob_in), None, None, None, None, 0x1, ctypes.byref(blob_out)):
+        raise OSError("DPAPI call failed")
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)  # type: ignore[attr-defined]
+
+
+def _protect(data: bytes) -> bytes:
+    if sys.platform == "win32":
+        return b"dpapi:" + base64.b64encode(_dpapi(data, protect=True))
+    return b"plain:" + base64.b64encode(data)
+
+
+def _unprotect(data: bytes) -> bytes:
+    scheme, _, payload = data.partition(b":")
+    raw = base64.b64decode(payload)
+    if scheme == b"dpapi":
+        return _dpapi(raw, protect=False)
+    return raw
+
+
+@dataclass
+class SessionStore:
+    """On-disk store of cookies and localStorage from a logged-in session, keyed by user and site.
+
+    Files are encrypted with DPAPI for the current user on Windows and written owner-only (0600)
+    elsewhere. Entries older than max_age_hours, or whose cookies have all expired, are treated as stale.
+    """
+
+    directory: Path
+    max_age_hours: float = 12.0
+
+    def _path(self, username: str, site_url: str) -> Path:
+        site = urlparse(site_url).netloc.lower() or site_url
+        key = hashlib.sha256(f"{(username or '').strip().lower()}|{site}".encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{key}.session"
+
+    def save(self, driver: WebDriver, username: str, site_url: str) -> bool:
+        try:
+            cookies = driver.get_cookies()
+            local_storage = driver.execute_script(
+                "var o = {}; for (var i = 0; i < window.localStorage.length; i++) {"
+                " var k = window.localStorage.key(i); o[k] = window.localStorage.getItem(k); } return o;"
+            ) or {}
+            payload = {
+                "saved_at": time.time(),
+                "url": driver.current_url,
+                "cookies": cookies,
+                "local_storage": local_storage,
+            }
+            path = self._path(username, site_url)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(_protect(json.dumps(payload).encode("utf-8")))
+            os.replace(tmp, path)
+            LOGGER.info("Saved session (%s cookies, %s localStorage keys) to %s", len(cookies), len(local_storage), path)
+            return True
+        except Exception:
+            LOGGER.warning("Failed to save session state.", exc_info=True)
+            return False
+
+    def load(self, username: str, site_url: str) -> Optional[dict]:
+        """Return the stored session if it is still fresh, else None."""
+        path = self._path(username, site_url)
+        if not path.exists():
+            return None
+        try:
+            payload = json.loads(_unprotect(path.read_bytes()).decode("utf-8"))
+        except Exception:
+            LOGGER.warning("Stored session unreadable; ignoring %s", path, exc_info=True)
+            return None
+        now = time.time()
+        age_h = (now - float(payload.get("saved_at") or 0)) / 3600.0
+        if age_h > self.max_age_hours:
+            LOGGER.info("Stored session is %.1fh old (max %.1fh); full login required.", age_h, self.max_age_hours)
+            return None
+        cookies = payload.get("cookies") or []
+        live = [c for c in cookies if not c.get("expiry") or float(c["expiry"]) > now]
+        if not live:
+            LOGGER.info("Stored session cookies expired; full login required.")
+            return None
+        payload["cookies"] = live
+        return payload
+
+    def restore(self, driver: WebDriver, username: str, site_url: str) -> bool:
+        """Load the stored cookies/localStorage into the current browser. Caller verifies the login."""
+        payload = self.load(username, site_url)
+        if not payload:
+            return False
+        # Cookies can only be set for the domain currently loaded
+        driver.get(site_url)
+        added = 0
+        for c in payload.get("cookies") or []:
+            cookie = {k: v for k, v in c.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+            if "expiry" in cookie:
+                cookie["expiry"] = int(cookie["expiry"])
+            if cookie.get("sameSite") not in (None, "Strict", "Lax", "None"):
+                cookie.pop("sameSite", None)
+            try:
+                driver.add_cookie(cookie)
+                added += 1
+            except Exception:
+                LOGGER.debug("Skipped cookie %s for domain %s", cookie.get("name"), cookie.get("domain"))
+        try:
+            driver.execute_script(
+                "var o = arguments[0]; for (var k in o) { window.localStorage.setItem(k, o[k]); }",
+                payload.get("local_storage") or {},
+            )
+        except Exception:
+            LOGGER.debug("Failed to restore localStorage.", exc_info=True)
+        LOGGER.info("Restored stored session (%s cookies).", added)
+        return added > 0
+
+    def clear(self, username: str, site_url: str) -> None:
+        try:
+            self._path(username, site_url).unlink(missing_ok=True)
+        except Exception:
+            LOGGER.debug("Failed to remove stored session.", exc_info=True)
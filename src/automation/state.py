@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+
+def default_state_dir() -> Path:
+    """Return the repo-level directory for state that persists across runs (<repo>/.state)."""
+    return Path(__file__).resolve().parents[2] / ".state"
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Read a JSON state file; return default when it's missing or unreadable."""
+    try:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8") or "null")
+    except Exception:
+        LOGGER.warning("Ignoring unreadable state file: %s", path, exc_info=True)
+    return default
+
+
+def save_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON to a temp file next to path and os.replace it in, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
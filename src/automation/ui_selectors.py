@@ -53,6 +53,16 @@ UI_SELECTORS = {
         "listbox": "[role='listbox']",
         "options": "[role='option'], .composable-select__option"
     },
+    # Scheduler toolbar: date picker (direct date jump)
+    "date_picker": {
+        "button": "#date-picker-button",
+        # Text input inside the opened picker popover, when the picker offers one
+        "input": ".datepicker input, .date-picker input, [data-element='date-picker-input'], input[type='date']",
+        # Calendar day cells; matched by data-date/aria-label against the target date
+        "day_cells": "[data-date], .datepicker td, .date-picker td, [role='gridcell']",
+        "prev_month": "[data-element='date-picker-prev-month'], .datepicker .prev, [aria-label*='Previous month']",
+        "next_month": "[data-element='date-picker-next-month'], .datepicker .next, [aria-label*='Next month']"
+    },
     # Scheduler tabs (agenda/appointments view)
     "schedule_tabs": {
         "appointments": "[data-element='scheduler-tab-0']"
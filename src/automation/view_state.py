@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEDULE = "schedule"
+TIMELINE = "timeline"
+SUMMARY = "summary"
+
+
+@dataclass
+class ViewState:
+    """Where the browser is believed to be, tracked by the navigation helpers.
+
+    view is schedule/timeline/summary (None = unknown). date and facility describe the scheduler and
+    survive leaving it (PF keeps them when Schedule is reopened). Helpers consult this to skip
+    transitions whose target is already active, after a cheap DOM assertion.
+    """
+
+    view: Optional[str] = None
+    date: Optional[str] = None
+    facility: Optional[str] = None
+
+
+def view_state(driver: WebDriver) -> ViewState:
+    state = getattr(driver, "_view_state", None)
+    if state is None:
+        state = ViewState()
+        setattr(driver, "_view_state", state)
+    return state
+
+
+def set_view(driver: WebDriver, view: Optional[str]) -> None:
+    view_state(driver).view = view
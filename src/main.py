@@ -8,12 +8,57 @@ from datetime import datetime
 
 import os
 import time
-from automation.browser import build_edge_driver, quit_driver, EdgeConfig
+from automation.browser import build_edge_driver, quit_driver, EdgeConfig, get_default_edge_user_data_dir, snapshot_profile_template, report_network_stats
 import logging
 from automation.login import LoginAutomation, LoginSelectors, Selector
-from automation.navigation import navigate_after_login, run_for_each_hormone_center, run_for_named_hormone_centers
-
-
+from automation.session_store import SessionStore
+from automation.state import default_state_dir
+from automation.latency import configure_latency_store, save_latency_store
+from automation.deadline import BudgetSettings, configure_budgets
+from automation.circuit import BreakerSettings, configure_breakers, report_breakers
+from automation.api import ApiSettings, configure_api
+from automation.navigation import navigate_after_login, run_for_each_hormone_center, run_for_named_hormone_centers, run_for_date_range, run_watch, configure_timeline_prefetch, configure_phase, run_populate_phase
+from automation.extraction import run_batch
+from automation.catalog import configure_catalog, finish_catalog, get_catalog
+from automation.run_manifest import ALL, EXTRACT, MANIFEST_NAME, OK, PHASES, POPULATE, RunManifest, configure_run_manifest, latest_run_dir
+
+
+
+
+def _print_circuit_report() -> None:
+    lines = report_breakers()
+    if lines:
+        print("Circuit breakers tripped this run (section/selector skipped after repeated failures):")
+        for line in lines:
+            print(f"  {line}")
+
+
+def _run_extract_phase(staging_dir: Path, config_path: Path, manifest: RunManifest) -> int:
+    """Extract every PDF harvested into staging_dir (no browser) and record the outcomes in the run manifest."""
+    by_pdf = {entry.get("pdf"): pid for pid, entry in manifest.patients.items() if entry.get("pdf")}
+    catalog = get_catalog()
+    if catalog is not None:
+        for pid, entry in manifest.patients.items():
+            catalog.visit(pid, facility=entry.get("facility"), date=entry.get("date"), href=entry.get("href"))
+
+    def _record(pdf_path: Path, outcome) -> None:
+        pid = by_pdf.get(pdf_path.name, pdf_path.stem)
+        manifest.stage(pid, EXTRACT, outcome.status)
+        outputs = (pdf_path.with_name(f"{pdf_path.stem}-intake-details.json"), pdf_path.with_name(f"{pdf_path.stem}-intake-log.txt"))
+        manifest.add_artifacts(pid, *(p.name for p in outputs if p.exists()))
+        if catalog is not None:
+            catalog.stage(pid, EXTRACT, outcome.status, outcome.seconds, outcome.detail)
+            for path in outputs:
+                if path.exists():
+                    catalog.artifact(pid, path)
+
+    failed = run_batch(staging_dir, config_path=config_path, on_outcome=_record)
+    # Intakes whose JSON was already up to date weren't re-run
+    for pid, _entry in manifest.pending(EXTRACT):
+        if (staging_dir / f"{pid}-intake-details.json").exists():
+            manifest.stage(pid, EXTRACT, OK)
+    print(f"Extract phase done | {manifest.counts(EXTRACT)}")
+    return 1 if failed else 0
 
 
 def load_config(config_path: Path) -> configparser.ConfigParser:
@@ -51,10 +96,36 @@ def selectors_from_config(cfg: configparser.ConfigParser) -> LoginSelectors:
     )
 
 
+def parse_day_offsets(spec: str) -> list[int]:
+    """Parse '--days' style 'A..B' (e.g. '-7..-1') into an inclusive list of day offsets relative to today."""
+    try:
+        start_s, end_s = spec.split("..", 1)
+        start, end = int(start_s.strip()), int(end_s.strip())
+    except ValueError:
+        raise SystemExit(f"Invalid --days value '{spec}'; expected START..END, e.g. -7..-1")
+    if start > end:
+        raise SystemExit(f"Invalid --days value '{spec}'; START must not be after END")
+    return list(range(start, end + 1))
+
+
+def parse_date_range(spec: str) -> list[int]:
+    """Parse '--date-range' style 'YYYY-MM-DD..YYYY-MM-DD' into an inclusive list of day offsets relative to today."""
+    try:
+        start_s, end_s = spec.split("..", 1)
+        start = datetime.strptime(start_s.strip(), "%Y-%m-%d").date()
+        end = datetime.strptime(end_s.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise SystemExit(f"Invalid --date-range value '{spec}'; expected YYYY-MM-DD..YYYY-MM-DD")
+    if start > end:
+        raise SystemExit(f"Invalid --date-range value '{spec}'; START must not be after END")
+    today = datetime.now().date()
+    return list(range((start - today).days, (end - today).days + 1))
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Automate login using Edge with default profile.")
-    parser.add_argument("--username", required=True, help="Login username")
-    parser.add_argument("--password", required=True, help="Login password")
+    parser.add_argument("--username", help="Login username (required unless --snapshot-profile-template)")
+    parser.add_argument("--password", help="Login password (required unless --snapshot-profile-template)")
     parser.add_argument("--config", default="config/settings.ini", help="Path to INI config file")
     parser.add_argument("--headless", action="store_true", help="Run Edge in headless mode")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
@@ -66,6 +137,26 @@ def main(argv: list[str] | None = None) -> int:
         dest="hormone_centers",
         help="Select one or more Hormone Centers by name (case-insensitive contains). Repeat flag to pass multiple.",
     )
+    date_group = parser.add_mutually_exclusive_group()
+    date_group.add_argument(
+        "--date-range",
+        help="Backfill an inclusive range of dates in one session, e.g. 2025-01-06..2025-01-12",
+    )
+    date_group.add_argument(
+        "--days",
+        help="Backfill an inclusive range of day offsets relative to today in one session, e.g. -7..-1",
+    )
+    parser.add_argument(
+        "--watch",
+        type=int,
+        metavar="INTERVAL",
+        help="Keep the session open and re-check the appointments table every INTERVAL seconds, processing only new arrivals",
+    )
+    parser.add_argument(
+        "--no-session-store",
+        action="store_true",
+        help="Do not restore or save the authenticated session (cookies/localStorage); always do a full login",
+    )
     parser.add_argument(
         "--force-real-profile",
         action="store_true",
@@ -76,6 +167,42 @@ def main(argv: list[str] | None = None) -> int:
         action="store_true",
         help="Before launching, kill any running msedge.exe processes to unlock the Default profile (Windows only)",
     )
+    parser.add_argument(
+        "--profile-template",
+        metavar="DIR",
+        help="Headless runs start from a clone of this profile template (see --snapshot-profile-template)",
+    )
+    parser.add_argument(
+        "--snapshot-profile-template",
+        metavar="DIR",
+        help="Snapshot the real (trusted) Edge profile into DIR as a template, then exit. Close Edge first.",
+    )
+    parser.add_argument(
+        "--block-images",
+        action="store_true",
+        help="Block image requests and disable image loading (faster page loads, less memory)",
+    )
+    parser.add_argument(
+        "--page-load-strategy",
+        choices=["normal", "eager", "none"],
+        help="Return from navigations at load (normal), DOMContentLoaded (eager) or immediately (none); steps wait for the elements they need",
+    )
+    parser.add_argument(
+        "--attach",
+        metavar="HOST:PORT",
+        help="Attach to an Edge already running with --remote-debugging-port instead of launching one",
+    )
+    parser.add_argument(
+        "--phase",
+        choices=PHASES,
+        default=ALL,
+        help="harvest: only download intake PDFs; extract: only extract staged PDFs (no browser); populate: only write summaries from extracted JSON; all: everything per patient (default)",
+    )
+    parser.add_argument(
+        "--run-dir",
+        metavar="DIR",
+        help="Resume an earlier Processing/<timestamp> run instead of starting a new one (extract/populate default to the newest run; harvest/all always start a new run without it)",
+    )
     parser.add_argument(
         "--user-data-dir",
         help="Override Edge user-data-dir (e.g., %LOCALAPPDATA%/Microsoft/Edge/User Data)",
@@ -86,6 +213,8 @@ def main(argv: list[str] | None = None) -> int:
     )
 
     args = parser.parse_args(argv)
+    if not args.snapshot_profile_template and args.phase != EXTRACT and not (args.username and args.password):
+        parser.error("--username and --password are required")
 
     # Configure logging early so helper modules using LOGGER emit to console when --verbose
     if args.verbose:
@@ -102,6 +231,10 @@ def main(argv: list[str] | None = None) -> int:
     # Optional run settings
     post_actions_wait = 0
     date_offset_days = -1
+    adaptive_timeouts = True
+    budgets = BudgetSettings()
+    breaker_settings = BreakerSettings()
+    prefetch_timeline = False
     if cfg.has_section("run"):
         try:
             post_actions_wait = cfg["run"].getint("wait_after_actions_seconds", fallback=0)
@@ -111,20 +244,105 @@ def main(argv: list[str] | None = None) -> int:
             date_offset_days = cfg["run"].getint("date_offset_days", fallback=-1)
         except Exception:
             date_offset_days = -1
+        try:
+            adaptive_timeouts = cfg["run"].getboolean("adaptive_timeouts", fallback=True)
+        except Exception:
+            adaptive_timeouts = True
+        try:
+            # 0 or unset = no budget
+            budgets.patient_seconds = cfg["run"].getfloat("patient_budget_seconds", fallback=0) or None
+            budgets.facility_seconds = cfg["run"].getfloat("facility_budget_seconds", fallback=0) or None
+            budgets.shed_below_seconds = cfg["run"].getfloat("shed_below_seconds", fallback=budgets.shed_below_seconds)
+            optional = cfg["run"].get("optional_sections", fallback=None)
+            if optional is not None:
+                budgets.optional_sections = tuple(s.strip() for s in optional.split(",") if s.strip())
+        except Exception:
+            print("Invalid time budget settings in [run]; running without budgets.")
+            budgets = BudgetSettings()
+        try:
+            # 0 = breakers off
+            breaker_settings.failure_threshold = cfg["run"].getint("circuit_breaker_failures", fallback=breaker_settings.failure_threshold)
+            breaker_settings.probe_every_patients = cfg["run"].getint("circuit_breaker_probe_every", fallback=breaker_settings.probe_every_patients)
+            breaker_settings.enabled = breaker_settings.failure_threshold > 0
+        except Exception:
+            print("Invalid circuit breaker settings in [run]; using defaults.")
+            breaker_settings = BreakerSettings()
+        try:
+            prefetch_timeline = cfg["run"].getboolean("prefetch_next_timeline", fallback=False)
+        except Exception:
+            prefetch_timeline = False
+    # Wait sites learn their timeouts from latencies observed in earlier runs (constants stay the ceiling)
+    configure_latency_store(default_state_dir() / "latency.json", enabled=adaptive_timeouts)
+    configure_budgets(budgets)
+    configure_breakers(breaker_settings)
+    configure_timeline_prefetch(prefetch_timeline)
+    # Optional backend endpoints for the intake lookup (DOM path when unset)
+    if cfg.has_section("api"):
+        try:
+            api = cfg["api"]
+            configure_api(ApiSettings(
+                timeline_documents_url=api.get("timeline_documents_url", fallback="") or None,
+                documents_path=api.get("documents_path", fallback=""),
+                document_type_field=api.get("document_type_field", fallback="documentType"),
+                document_id_field=api.get("document_id_field", fallback="id"),
+                download_url_field=api.get("download_url_field", fallback="downloadUrl"),
+                download_url_template=api.get("download_url_template", fallback="") or None,
+                auth_token_storage_key=api.get("auth_token_storage_key", fallback="") or None,
+                timeout_seconds=api.getfloat("timeout_seconds", fallback=15.0),
+            ))
+        except Exception:
+            print("Invalid [api] settings; using the timeline UI for intake lookup.")
 
     if not base_url:
         raise SystemExit("Missing 'url' in [site] section of config.")
 
+    # Optional multi-date backfill (validated before launching the browser)
+    date_offsets: list[int] = []
+    if args.date_range:
+        date_offsets = parse_date_range(args.date_range)
+    elif args.days:
+        date_offsets = parse_day_offsets(args.days)
+    if args.watch is not None:
+        if date_offsets:
+            raise SystemExit("--watch cannot be combined with --date-range/--days.")
+        if args.watch <= 0:
+            raise SystemExit("--watch INTERVAL must be a positive number of seconds.")
+
     selectors = selectors_from_config(cfg)
 
     # Optional driver/path and profile settings from [browser] section or env var
     driver_path = None
     user_data_dir = None
     profile_dir = None
+    debugger_address = None
+    profile_template = None
+    profile_template_caches = False
+    blocked_urls: list[str] = []
+    block_images = False
     if cfg.has_section("browser"):
         driver_path = cfg["browser"].get("driver_path", fallback=None)
         user_data_dir = cfg["browser"].get("user_data_dir", fallback=None)
         profile_dir = cfg["browser"].get("profile_directory", fallback=None)
+        debugger_address = cfg["browser"].get("debugger_address", fallback=None) or None
+        profile_template = cfg["browser"].get("profile_template", fallback=None) or None
+        try:
+            profile_template_caches = cfg["browser"].getboolean("profile_template_caches", fallback=False)
+        except ValueError:
+            profile_template_caches = False
+        raw_blocked = cfg["browser"].get("blocked_urls", fallback="") or ""
+        blocked_urls = [u.strip() for u in raw_blocked.replace("\n", ",").split(",") if u.strip()]
+        try:
+            block_images = cfg["browser"].getboolean("block_images", fallback=False)
+        except ValueError:
+            block_images = False
+    block_images = block_images or args.block_images
+    page_load_strategy = "normal"
+    if cfg.has_section("browser"):
+        page_load_strategy = (cfg["browser"].get("page_load_strategy", fallback="normal") or "normal").strip().lower()
+    if args.page_load_strategy:
+        page_load_strategy = args.page_load_strategy
+    if page_load_strategy not in ("normal", "eager", "none"):
+        raise SystemExit(f"Invalid page_load_strategy '{page_load_strategy}'; use normal, eager or none.")
     driver_path = driver_path or os.environ.get("MSEDGEDRIVER_PATH")
 
     # CLI overrides
@@ -132,6 +350,56 @@ def main(argv: list[str] | None = None) -> int:
         user_data_dir = args.user_data_dir
     if args.profile_dir:
         profile_dir = args.profile_dir
+    if args.profile_template:
+        profile_template = args.profile_template
+
+    if args.snapshot_profile_template:
+        try:
+            snapshot_profile_template(
+                user_data_dir or get_default_edge_user_data_dir(),
+                profile_dir or "Default",
+                args.snapshot_profile_template,
+            )
+        except Exception as exc:
+            print(f"Profile template snapshot failed: {exc}")
+            return 1
+        print(f"Profile template written to {args.snapshot_profile_template}")
+        return 0
+
+    # Prepare Processing/<timestamp>/staging and processed, anchored at repo root. --run-dir resumes an earlier
+    # run; the extract and populate phases default to the newest run that has a manifest.
+    processing_root = Path(__file__).resolve().parent.parent / "Processing"
+    if args.run_dir:
+        run_dir = Path(args.run_dir)
+    elif args.phase in (EXTRACT, POPULATE):
+        run_dir = latest_run_dir(processing_root)
+        if run_dir is None:
+            raise SystemExit(f"No earlier run with a {MANIFEST_NAME} under {processing_root}; pass --run-dir.")
+    else:
+        run_dir = processing_root / datetime.now().strftime("%Y%m%d-%H%M")
+    staging_dir = run_dir / "staging"
+    processed_dir = run_dir / "processed"
+    try:
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        processed_dir.mkdir(parents=True, exist_ok=True)
+        print(f"Processing run directory: {run_dir} (phase: {args.phase})")
+    except Exception:
+        print(f"Unable to create Processing directories at {run_dir}")
+    manifest = configure_run_manifest(run_dir / MANIFEST_NAME)
+    configure_phase(args.phase)
+    # Cross-run index of runs, patients, stage outcomes and artifacts (python -m automation.catalog)
+    configure_catalog(run_dir, args.phase)
+    if args.phase == EXTRACT:
+        rc = _run_extract_phase(staging_dir, Path(args.config), manifest)
+        finish_catalog("ok" if rc == 0 else "failed")
+        return rc
+
+    if args.attach:
+        debugger_address = args.attach
+    if debugger_address:
+        print(f"Attaching to running Edge at {debugger_address}; profile and headless options are ignored.")
+        # Never kill the browser we are about to attach to
+        args.kill_edge = False
 
     # If forcing real profile while headless, switch to UI to avoid known instability
     if args.force_real_profile and args.headless:
@@ -159,7 +427,26 @@ def main(argv: list[str] | None = None) -> int:
         user_data_dir=user_data_dir,
         profile_directory=profile_dir or "Default",
         suppress_browser_logs=not args.verbose,
+        debugger_address=debugger_address,
+        profile_template=profile_template,
+        profile_template_caches=profile_template_caches,
+        blocked_urls=blocked_urls,
+        block_images=block_images,
+        page_load_strategy=page_load_strategy,
     )
+    # Optional persisted session (cookies/localStorage) to skip the login form on startup
+    session_store = None
+    if not args.no_session_store and cfg.has_section("session") and cfg["session"].getboolean("enabled", fallback=False):
+        try:
+            store_dir = cfg["session"].get("directory", fallback="") or str(default_state_dir() / "sessions")
+            session_store = SessionStore(
+                directory=Path(store_dir),
+                max_age_hours=cfg["session"].getfloat("max_age_hours", fallback=12.0),
+            )
+        except Exception:
+            print("Invalid [session] settings; continuing without the session store.")
+            session_store = None
+
     driver = build_edge_driver(edge_cfg)
 
     # Set up file logging to repo_root/log.txt when verbose, so diagnostics persist to disk
@@ -187,22 +474,7 @@ def main(argv: list[str] | None = None) -> int:
         pass
 
     try:
-        LoginAutomation(driver, base_url, selectors).login(args.username, args.password)
-
-        # Prepare Processing/<timestamp>/staging and processed, anchored at repo root
-        script_dir = Path(__file__).resolve().parent
-        repo_root = script_dir.parent
-        processing_root = repo_root / "Processing"
-        ts = datetime.now().strftime("%Y%m%d-%H%M")
-        run_dir = processing_root / ts
-        staging_dir = run_dir / "staging"
-        processed_dir = run_dir / "processed"
-        try:
-            staging_dir.mkdir(parents=True, exist_ok=True)
-            processed_dir.mkdir(parents=True, exist_ok=True)
-            print(f"Processing run directory: {run_dir}")
-        except Exception:
-            print(f"Unable to create Processing directories at {run_dir}")
+        LoginAutomation(driver, base_url, selectors, session_store=session_store).login(args.username, args.password)
 
         # Determine facilities list from CLI or config
         config_facilities: list[str] = []
@@ -216,7 +488,29 @@ def main(argv: list[str] | None = None) -> int:
         except Exception:
             config_facilities = []
 
-        if args.hormone_centers:
+        if args.phase == POPULATE:
+            run_populate_phase(driver, staging_dir)
+        elif args.watch:
+            watch_centers = args.hormone_centers or ([] if args.all_hormone_centers else config_facilities)
+            run_watch(
+                driver,
+                args.watch,
+                center_names=watch_centers or None,
+                all_centers=bool(args.all_hormone_centers and not args.hormone_centers),
+                date_offset_days=date_offset_days,
+                staging_dir=staging_dir,
+            )
+        elif date_offsets:
+            # Same facility precedence as single-day runs, applied to every date in the range
+            range_centers = args.hormone_centers or ([] if args.all_hormone_centers else config_facilities)
+            run_for_date_range(
+                driver,
+                date_offsets,
+                center_names=range_centers or None,
+                all_centers=bool(args.all_hormone_centers and not args.hormone_centers),
+                staging_dir=staging_dir,
+            )
+        elif args.hormone_centers:
             run_for_named_hormone_centers(driver, args.hormone_centers, date_offset_days=date_offset_days, staging_dir=staging_dir)
         elif args.all_hormone_centers:
             run_for_each_hormone_center(driver, date_offset_days=date_offset_days, staging_dir=staging_dir)
@@ -229,9 +523,17 @@ def main(argv: list[str] | None = None) -> int:
             time.sleep(post_actions_wait)
     except Exception as exc:
         print(f"Automation failed: {exc}")
+        finish_catalog("failed")
+        save_latency_store()
+        report_network_stats(driver)
+        _print_circuit_report()
         if not args.keep_open:
             quit_driver(driver)
         return 1
+    finish_catalog("ok")
+    save_latency_store()
+    report_network_stats(driver)
+    _print_circuit_report()
     if args.keep_open:
         print("--keep-open specified; leaving the browser running.")
     else: